@@ -1,127 +1,316 @@
-import spacy
-from spacy.language import Language
-from spacy.tokens import Doc
-from spacy.matcher import Matcher, PhraseMatcher
-from typing import List, Dict
+from typing import TYPE_CHECKING, Callable, List, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
 from dataclasses import dataclass
 import re
+import sys
 import logging
-from collections import defaultdict
-import fitz  # PyMuPDF
+from bisect import bisect_right
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from pathlib import Path
+from gazetteer import Gazetteer, GazetteerHit
+from page_furniture import FurnitureBlock, PageFurniture
+from pin_directory import PinDirectory, PinInfo
+from pipeline_metrics import PipelineMetrics
+from result_cache import ResultCache
+from rule_pack import RulePack
+
+# spaCy and PyMuPDF are imported where they are first needed, so importing this
+# module stays cheap for text-only use and short-lived workers.
+if TYPE_CHECKING:
+    from spacy.matcher import Matcher, PhraseMatcher
+    from spacy.tokens import Doc
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Pipeline components that _extract_components never reads. Only `ner` is
+# needed, and in en_core_web_sm it carries its own tok2vec layer.
+NER_ONLY_EXCLUDE = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+# Bump whenever component, confidence or region rules change so cached results are invalidated
+RULES_VERSION = "5"
+
+# Default prefilter threshold. A block with no street keyword scores 0 and every
+# other block scores at least 1, so the default only skips blocks that could
+# never pass validation (it needs a street); raise it to skip more.
+PREFILTER_THRESHOLD = 1.0
+
+# Returns the whole pos..endpos span as group 1
+_SPAN_PATTERN = re.compile(r'(.*)', re.DOTALL)
+
+# A street or building suffix within two words after a place name, as in "Goa Street",
+# "Maha Lakshmi Road" or "Bengal Chemicals Road"; matched at the end of the name
+_STREET_NAME_TAIL_PATTERN = re.compile(
+    r'(?:\s+[A-Za-z.]+){0,2}?\s+(?:Road|Street|Lane|Avenue|Marg|Path|Highway|Expressway|House|Bhavan|Bhawan'
+    r'|Building|Tower|Chambers|Complex|Plaza|Mall|Society|Apartment|Heights)s?\b', re.I)
+
+class SuffixAnchoredPattern:
+    """Linear-time equivalent of re.search(r'\b([<prefix_class>]+<suffix>)', text, flags).
+
+    The plain regex retries the unbounded prefix class from every word boundary and
+    backtracks over the whole run each time, which is quadratic on long blocks without
+    separators. Here every suffix position is found in one forward scan, and each maximal
+    run of prefix characters is checked once: the leftmost match starts at the run's first
+    word boundary and (greedy prefix) ends at the last suffix that starts inside the run.
+    """
+
+    def __init__(self, prefix_class: str, suffix: str, flags: int = 0):
+        self.run_pattern = re.compile(f'[{prefix_class}]+', flags)
+        self.suffix_pattern = re.compile(suffix, flags)
+        self.anchor_pattern = re.compile(f'(?=(?:{suffix}))', flags)
+
+    def search(self, text: str) -> Optional[re.Match]:
+        anchors = [m.start() for m in self.anchor_pattern.finditer(text)]
+        if not anchors:
+            return None
+
+        for run in self.run_pattern.finditer(text):
+            run_start, run_end = run.span()
+
+            # Last suffix start the prefix run can reach
+            idx = bisect_right(anchors, run_end) - 1
+            if idx < 0 or anchors[idx] <= run_start:
+                continue
+
+            start = next((i for i in range(run_start, anchors[idx]) if self._is_boundary(text, i)), None)
+            if start is None:
+                continue
+
+            end = self.suffix_pattern.match(text, anchors[idx]).end()
+            return _SPAN_PATTERN.match(text, start, end)
+
+        return None
+
+    @staticmethod
+    def _is_boundary(text: str, i: int) -> bool:
+        """Same test as \b at position i"""
+        before = i > 0 and (text[i - 1].isalnum() or text[i - 1] == '_')
+        after = i < len(text) and (text[i].isalnum() or text[i] == '_')
+        return before != after
+
+# Generic patterns that typically indicate a new address, combined into one
+# alternation so each line is scanned once. Searched with pos/endpos on the
+# original text; (?<!\S) stands in for (?:^|\s) on a stripped line.
+_ADDRESS_INDICATOR_PATTERN = re.compile('|'.join([
+    r'\b\d{6}\b',  # PIN code
+    r'\b\d+[A-Za-z]?,\s*[A-Za-z\s]+',  # Street number followed by text
+    r'\b[A-Za-z]+[\s-]+(?:Complex|Plaza|Towers|Building|Street|Road|Lane|Avenue)\b',  # Common address elements
+    r'(?<!\S)(?:Floor|Level|Block|Sector|Phase)\s+[A-Za-z0-9-]+\b'  # Common building/area elements
+]), re.I)
+_NON_SPACE_PATTERN = re.compile(r'\S')
+_PIN_LIKE_PATTERN = re.compile(r'\b\d{3}\s?\d{3}\b')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_SEPARATOR_PATTERN = re.compile(r'[,\s]*,[,\s]*')
+
+class BlockSpan(NamedTuple):
+    """An address block: cleaned text plus its [start, end) character span in the source"""
+    page: int
+    start: int
+    end: int
+    text: str
+    # Part of a header/footer repeated across the pages of a PDF
+    letterhead: bool = False
+
+# Components that take few distinct values; interned so millions of matches share them
+_CATEGORICAL_COMPONENTS = ('city', 'state')
+
+@dataclass(slots=True)
 class AddressMatch:
     """Data class to store extracted address information"""
     raw_text: str
     components: Dict[str, str]
     confidence_score: float
     region: str
+    # Span of the block in the source text (for PDFs, the pages joined with "\n")
+    char_start: Optional[int] = None
+    char_end: Optional[int] = None
+    # Label (name@version) of the rule pack that produced the match
+    rule_pack: Optional[str] = None
+    # Found in a header/footer repeated across pages (extracted once, not per page)
+    letterhead: bool = False
 
 class IndianAddressExtractor:
-    """Enhanced Indian address extraction using spaCy with comprehensive state and city data"""
+    """Enhanced Indian address extraction using spaCy with comprehensive state and city data.
+
+    With engine="regex" spaCy is never imported and no model is loaded. Components,
+    confidence, region and formatting use exactly the same rules; the only difference
+    is the city NER fallback. Where neither the city regexes nor the PIN directory
+    provide a city, the spaCy engine takes the first unused GPE entity, while the regex
+    engine leaves the city empty, so such blocks fail validation and are dropped. Every
+    regex-engine result is therefore also a spaCy-engine result, with identical fields.
+    """
     
-    def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.info("Downloading spaCy model...")
-            spacy.cli.download("en_core_web_sm")
-            self.nlp = spacy.load("en_core_web_sm")
-        
-        self.matcher = Matcher(self.nlp.vocab)
-        self.phrase_matcher = PhraseMatcher(self.nlp.vocab)
+    def __init__(self, lazy_ner: bool = False, pin_directory: Optional[PinDirectory] = None,
+                 cache: Optional[ResultCache] = None, model: str = "en_core_web_sm",
+                 engine: str = "spacy", metrics: Optional[PipelineMetrics] = None,
+                 prefilter_threshold: Optional[float] = PREFILTER_THRESHOLD,
+                 rule_pack: Optional[RulePack] = None):
+        if engine not in ("spacy", "regex"):
+            raise ValueError(f"Unknown engine: {engine!r} (expected 'spacy' or 'regex')")
+        self.engine = engine
+
+        # With lazy_ner the model is loaded with NER only, and it runs only
+        # for blocks where none of the city regexes matched.
+        self.lazy_ner = lazy_ner or engine == "regex"
+        # Validates PIN codes and backfills state/city; defaults to the bundled prefix table
+        self.pin_directory = pin_directory or PinDirectory.bundled()
+
+        if engine == "regex":
+            self.nlp = None
+            self.model_version = "regex"
+        else:
+            self.nlp = self._load_model(model, NER_ONLY_EXCLUDE if lazy_ner else [])
+            meta = self.nlp.meta
+            self.model_version = f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}"
+
+        # Optional per-block result cache. NER entities are cached under the model
+        # version alone, so a rules change does not cost another spaCy pass.
+        self.cache = cache
         
-        # Enhanced regional information
-        self.regional_info = {
-            'north_india': {
-                'states': ['Delhi', 'Haryana', 'Punjab', 'Uttar Pradesh', 'Uttarakhand', 'Himachal Pradesh', 'Jammu and Kashmir', 'Leh', 'Ladakh'],
-                'cities': ['Delhi', 'New Delhi', 'Gurgaon', 'Noida', 'Chandigarh', 'Lucknow', 'Kanpur', 'Varanasi', 'Prayagraj'
-                          'Dehradun', 'Shimla', 'Srinagar', 'Jammu', 'Leh', 'Agra', 'Meerut', 'Ludhiana', 'Amritsar'],
-                'terms': ['chowk', 'bazaar', 'gali', 'mohalla', 'nagar', 'vihar', 'kunj', 'puram']
-            },
-            'south_india': {
-                'states': ['Karnataka', 'Tamil Nadu', 'Kerala', 'Andhra Pradesh', 'Telangana', 'Puducherry'],
-                'cities': ['Bangalore', 'Chennai', 'Hyderabad', 'Kochi', 'Thiruvananthapuram', 'Mysuru', 'Coimbatore', 
-                          'Madurai', 'Visakhapatnam', 'Vijayawada', 'Mangalore', 'Kozhikode', 'Thrissur', 'Warangal'],
-                'terms': ['main', 'cross', 'circle', 'nilaya', 'halli', 'nagar', 'colony', 'layout']
-            },
-            'west_india': {
-                'states': ['Maharashtra', 'Gujarat', 'Goa', 'Rajasthan'],
-                'cities': ['Mumbai', 'Pune', 'Ahmedabad', 'Vadodara', 'Panaji', 'Jaipur', 'Nagpur', 'Nashik', 
-                          'Surat', 'Rajkot', 'Margao', 'Jodhpur', 'Udaipur', 'Thane', 'Navi Mumbai', 'Borivali'],
-                'terms': ['society', 'pada', 'wadi', 'chawl', 'villa', 'apartment', 'heights', 'towers']
-            },
-            'east_india': {
-                'states': ['West Bengal', 'Odisha', 'Bihar', 'Assam', 'Sikkim', 'Meghalaya', 'Tripura', 
-                          'Manipur', 'Nagaland', 'Arunachal Pradesh', 'Mizoram'],
-                'cities': ['Kolkata', 'Bhubaneswar', 'Patna', 'Guwahati', 'Gangtok', 'Shillong', 'Agartala', 
-                          'Imphal', 'Kohima', 'Itanagar', 'Aizawl', 'Cuttack', 'Siliguri'],
-                'terms': ['para', 'sarani', 'bagan', 'ghat', 'tola', 'chowk', 'path', 'lane']
-            }
-        }
+        # Built on first access; extraction itself does not use them
+        self._matcher = None
+        self._phrase_matcher = None
         
-        self.address_markers = [
-            "registered office", "corporate office", "branch office", "head office",
-            "regional office", "manufacturing unit", "plant", "warehouse", "godown",
-            "for correspondence", "residing at", "located at", "situated at",
-            "address:", "office:", "residence:", "unit:", "plot no", "door no",
-            "having its office at", "r/o", "s/o", "d/o", "w/o", "c/o",
-            "limited", "ltd", "towers", "plaza", "highway", "department", "division",
-            "mail stop", "floor", "building", "complex", "centre", "center",
-            "landmark", "near", "beside", "opposite", "adjacent to",
-            "next to", "behind", "front of", "above", "below", "cross", "junction",
-            "gali", "marg", "nagar", "colony", "society", "chowk", "road no"
-]
+        # Place data, markers and validation phrases; swapped as a whole by use_rule_pack
+        self.rule_pack = rule_pack or RulePack.default()
         
         self._load_address_components()
-        self._add_address_patterns()
+
+        # Blocks scoring below the threshold skip spaCy and the component regexes; None disables it
+        self.prefilter_threshold = prefilter_threshold
+
+        # Per-stage timing and counters; None leaves the pipeline uninstrumented
+        self.metrics = None
+        if metrics is not None:
+            metrics.attach(self)
+
+    def use_rule_pack(self, rule_pack: RulePack) -> None:
+        """Switch to another compiled rule pack; the spaCy model is kept.
+
+        The switch is a single assignment, so blocks are processed with either the
+        old or the new pack. Call it between extraction calls (as workers do between
+        tasks) so every result of a call comes from one pack.
+        """
+        if rule_pack is not self.rule_pack:
+            self.rule_pack = rule_pack
+            self._phrase_matcher = None
+
+    @property
+    def rules_version(self) -> str:
+        """Version of everything that determines a block's result, used in cache keys"""
+        return (f"{RULES_VERSION}:{self.rule_pack.fingerprint}:{self.pin_directory.fingerprint}:"
+                f"{self.model_version}")
+
+    @property
+    def gazetteer(self) -> Gazetteer:
+        return self.rule_pack.gazetteer
+
+    @property
+    def regional_info(self) -> Dict:
+        return self.rule_pack.regional_info
+
+    @property
+    def states(self) -> Dict:
+        return self.rule_pack.state_variants
+
+    @property
+    def major_cities(self) -> Tuple[str, ...]:
+        return self.rule_pack.major_cities
+
+    @property
+    def address_markers(self) -> Tuple[str, ...]:
+        return self.rule_pack.address_markers
+
+    @property
+    def marker_pattern(self) -> re.Pattern:
+        return self.rule_pack.marker_pattern
+
+    @contextmanager
+    def profile(self) -> Iterator[PipelineMetrics]:
+        """Collect stage timings and counters for the calls made inside the with block"""
+        owned = self.metrics is None
+        if owned:
+            PipelineMetrics().attach(self)
+        try:
+            with self.metrics.profile() as profile:
+                yield profile
+        finally:
+            if owned:
+                self.metrics.detach(self)
+
+    @staticmethod
+    def _load_model(model: str, exclude: List[str]):
+        """Load a spaCy pipeline by package name or from a saved (e.g. pre-pruned) pipeline directory"""
+        import spacy
+
+        try:
+            return spacy.load(model, exclude=exclude)
+        except OSError:
+            if model != "en_core_web_sm":
+                raise
+            logger.info("Downloading spaCy model...")
+            spacy.cli.download("en_core_web_sm")
+            return spacy.load("en_core_web_sm", exclude=exclude)
+
+    def _require_nlp(self) -> None:
+        if self.nlp is None:
+            raise RuntimeError("spaCy matchers are not available with engine='regex'")
+
+    @property
+    def matcher(self) -> "Matcher":
+        if self._matcher is None:
+            self._require_nlp()
+            from spacy.matcher import Matcher
+            self._matcher = Matcher(self.nlp.vocab)
+            self._add_address_patterns()
+        return self._matcher
+
+    @property
+    def phrase_matcher(self) -> "PhraseMatcher":
+        if self._phrase_matcher is None:
+            self._require_nlp()
+            from spacy.matcher import PhraseMatcher
+            phrase_matcher = PhraseMatcher(self.nlp.vocab)
+
+            # PhraseMatcher matches on ORTH, so tokenizing the patterns is enough
+            state_patterns = list(self.nlp.tokenizer.pipe(
+                text for state_vars in self.states.values() for text in state_vars))
+            phrase_matcher.add("STATE", state_patterns)
+
+            city_patterns = list(self.nlp.tokenizer.pipe(self.major_cities))
+            phrase_matcher.add("CITY", city_patterns)
+            self._phrase_matcher = phrase_matcher
+        return self._phrase_matcher
     
     def _load_address_components(self):
         """Load enhanced address components and patterns"""
         self.pin_pattern = r'\b\d{6}\b'  # Indian PIN Code (6 digits)
         self.zip_pattern = r'\b\d{5}(-\d{4})?\b'  # US ZIP code pattern
 
-        self.states = {
-            "Maharashtra": ["Maharashtra", "MH", "Maha"],
-            "Delhi": ["Delhi", "New Delhi", "NCR", "DL", "National Capital Territory"],
-            "Karnataka": ["Karnataka", "KA", "Kar"],
-            "Tamil Nadu": ["Tamil Nadu", "Tamilnadu", "TN"],
-            "West Bengal": ["West Bengal", "WB", "Bengal"],
-            "Uttar Pradesh": ["Uttar Pradesh", "UP", "U.P.", "Purvanchal"],
-            "Gujarat": ["Gujarat", "GJ"],
-            "Rajasthan": ["Rajasthan", "RJ"],
-            "Madhya Pradesh": ["Madhya Pradesh", "MP", "M.P."],
-            "Andhra Pradesh": ["Andhra Pradesh", "AP"],
-            "Telangana": ["Telangana", "TG", "TS"],
-            "Bihar": ["Bihar", "BR"],
-            "Punjab": ["Punjab", "PB"],
-            "Haryana": ["Haryana", "HR"],
-            "Odisha": ["Odisha", "Orissa", "OD"],
-            "Kerala": ["Kerala", "KL"],
-            "Jharkhand": ["Jharkhand", "JH"],
-            "Assam": ["Assam", "AS"],
-            "Chhattisgarh": ["Chhattisgarh", "CG", "C.G."],
-            "Goa": ["Goa", "GA"]
-        }
-        
-        self.major_cities = [
-        "Mumbai", "Pune", "Delhi", "Bangalore", "Chennai", "Hyderabad",
-        "Kolkata", "Ahmedabad", "Jaipur", "Lucknow", "Surat", "Bhopal",
-        "Indore", "Nagpur", "Visakhapatnam", "Patna", "Chandigarh",
-        "Coimbatore", "Thane", "Vadodara", "Ludhiana", "Agra", "Nashik"
-    ]
-
-        state_patterns = [self.nlp(text) 
-                         for state_vars in self.states.values() 
-                         for text in state_vars]
-        self.phrase_matcher.add("STATE", state_patterns)
-        
-        city_patterns = [self.nlp(city) for city in self.major_cities]
-        self.phrase_matcher.add("CITY", city_patterns)
+        # Component patterns, tried in order. The open-ended prefix patterns use
+        # SuffixAnchoredPattern so long blocks cannot trigger heavy backtracking.
+        self.building_patterns = [
+            SuffixAnchoredPattern(r'A-Za-z0-9\s\.-', r'(?:Tower|Chambers|Plaza|Bhavan|Centre|Complex|Towers|Society|Apartment|Edge|Building|House|Mall|Park|Villa|Heights|Exchange|Stock)s?\b', re.I),
+            re.compile(r'\b(P\.?\s*J\.?\s*Towers)\b', re.I),
+            SuffixAnchoredPattern(r'\w\s', r'\s+Stock\s+Exchange\b', re.I)
+        ]
+
+        self.street_patterns = [
+            SuffixAnchoredPattern(r'\w\s\.-', r'(?:Street|Road|Lane|Avenue|Boulevard|Highway|Marg|Path|Way|Expressway|Cross|Main|Circle|Block|Towers)s?\b', re.I),
+            re.compile(r'\b(\d+\s*(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth)\s*Street)\b', re.I),
+            re.compile(r'\b(Dalal\s+Street)\b', re.I),
+            re.compile(r'\b(Lyons\s+Range)\b', re.I)
+        ]
+        # Matches wherever any street pattern could; keep the two in sync
+        self.street_hint_pattern = re.compile(
+            r'(?:Street|Road|Lane|Avenue|Boulevard|Highway|Marg|Path|Way|Expressway|Cross|Main|Circle|Block|Towers)s?\b'
+            r'|\bLyons\s+Range\b', re.I)
+
+        self.area_patterns = [
+            SuffixAnchoredPattern(r'A-Za-z\s()-', r'(?:Area|Block|Sector|Phase|Colony|Nagar|Extension|Enclave|Complex|East|West|North|South|[EWNS])\b(?:\s*[\(\)][EWNS][)\)])?', re.I),
+            re.compile(r'\b(Bandra-Kurla\s+Complex)\b', re.I),
+            re.compile(r'\b(Dept\.?\s*of\s*Corporate\s*Services)\b', re.I)
+        ]
     
     def _add_address_patterns(self):
         """Add enhanced patterns for Indian address components"""
@@ -150,101 +339,88 @@ class IndianAddressExtractor:
 
 
     
-    def _extract_components(self, doc: Doc) -> Dict[str, str]:
-        def is_likely_valid_address(components):
-            # More comprehensive validation
-            min_required_components = ['city', 'street']
-            
-            # Ensure we have at least 2 key components
-            if sum(1 for key in min_required_components if key in components) < 2:
-                return False
-            
-            # Suspicious phrases to avoid
-            suspicious_phrases = [
-                'shall be final',
-                'are involved',
-                'difference is in',
-                'dates fixed for',
-                'hearing of a case',
-                'where the main',
-                'not be questioned'
-            ]
-            
-            # Combine all component values
-            full_text = ' '.join(components.values()).lower()
-            
-            # Check if any suspicious phrase is in the full text
-            if any(phrase in full_text for phrase in suspicious_phrases):
-                return False
-            
-            # Additional length checks
-            if len(full_text) < 10 or len(full_text) > 300:
-                return False
-            
-            # Expanded city validation
-            valid_cities = set([
-                'mumbai', 'delhi', 'bangalore', 'hyderabad', 'chennai', 
-                'kolkata', 'pune', 'ahmedabad', 'surat', 'jaipur',
-                'bandra', 'u.s.a.', 'washington', 'new york', 
-                'bandra-kurla', 'east', 'west'
-            ])
-            
-            if 'city' in components:
-                city = components['city'].lower()
-                if city == 'india':
-                    return False
-                if city not in valid_cities and len(city) < 2:
-                    return False
-            
+    def _extract_components(self, doc: Union["Doc", str]) -> Dict[str, str]:
+        """Extract address components from a parsed Doc or a raw block.
+
+        A raw string is only run through spaCy if the NER city fallback is needed.
+        """
+        raw_text = doc if isinstance(doc, str) else doc.text
+        components = self._match_components(raw_text)
+
+        # Fallback to NER for city (not available with the regex engine)
+        if not components.get('city') and self.nlp is not None:
+            if isinstance(doc, str):
+                doc = self.nlp(doc)
+            self._apply_ner_city(components, self._gpe_texts(doc))
+
+        return self._finalize_components(components)
+
+    def _prefilter_score(self, block: str) -> float:
+        """Cheap estimate of how address-like a block is, without spaCy.
+
+        0 without a street keyword (no street component is possible, so the block
+        cannot validate); otherwise 1, plus 1 for a PIN-like number, 1 for a known
+        city or state, 0.5 for an address marker and 0.5 for an address-like length.
+        """
+        if not self.street_hint_pattern.search(block):
+            return 0.0
+        score = 1.0
+        if _PIN_LIKE_PATTERN.search(block):
+            score += 1.0
+        if self.gazetteer.has_place(self.gazetteer.scan(' '.join(block.split()))):
+            score += 1.0
+        if self.marker_pattern.search(block):
+            score += 0.5
+        if 20 <= len(block) <= 300:
+            score += 0.5
+        return score
+
+    def _passes_prefilter(self, block: str) -> bool:
+        if self.prefilter_threshold is None or self._prefilter_score(block) >= self.prefilter_threshold:
             return True
+        if self.metrics is not None:
+            self.metrics.count('blocks_prefiltered')
+        return False
 
+    def _match_components(self, raw_text: str) -> Dict[str, str]:
+        """Run the regex component stages on a raw block"""
         # Initialize components
         components = defaultdict(str)
         
         # Normalize text
-        text = ' '.join(doc.text.split())
+        text = ' '.join(raw_text.split())
+
+        # Place names in the block; they pick the PIN among several candidates
+        hits = self._place_hits(text)
+        city = self.gazetteer.component_city(text, hits)
+        named_states = self.gazetteer.place_names(hits, 'state')
+        named_cities = self.gazetteer.place_names(hits, 'city')
+
+        # The block's city for now: the component-stage city or the first one named
+        block_city = city or next(iter(named_cities), None)
 
         # Enhanced PIN code extraction
-        postal_match = re.search(r'\b\d{3}\s*\d{3}\b', text)
-        if postal_match:
-            components['postal_code'] = postal_match.group(0).replace(" ", "")
+        pin, pin_info = self._match_postal_code(text, block_city, named_cities, named_states)
+        if pin_info:
+            components['postal_code'] = pin
 
         # Enhanced building/complex extraction
-        building_patterns = [
-            r'\b([A-Za-z0-9\s\.-]+(?:Tower|Chambers|Plaza|Bhavan|Centre|Complex|Towers|Society|Apartment|Edge|Building|House|Mall|Park|Villa|Heights|Exchange|Stock)s?)\b',
-            r'\b(P\.?\s*J\.?\s*Towers)\b',
-            r'\b([\w\s]+\s+Stock\s+Exchange)\b'
-        ]
-        
-        for pattern in building_patterns:
-            building_match = re.search(pattern, text, re.I)
+        for pattern in self.building_patterns:
+            building_match = pattern.search(text)
             if building_match:
                 components['building'] = building_match.group(1).strip()
                 break
 
         # Enhanced street extraction
-        street_patterns = [
-            r'\b([\w\s\.-]+(?:Street|Road|Lane|Avenue|Boulevard|Highway|Marg|Path|Way|Expressway|Cross|Main|Circle|Block|Towers)s?)\b',
-            r'\b(\d+\s*(?:First|Second|Third|Fourth|Fifth|Sixth|Seventh|Eighth|Ninth|Tenth)\s*Street)\b',
-            r'\b(Dalal\s+Street)\b',
-            r'\b(Lyons\s+Range)\b'
-        ]
-        
-        for pattern in street_patterns:
-            street_match = re.search(pattern, text, re.I)
+        for pattern in self.street_patterns:
+            street_match = pattern.search(text)
             if street_match:
                 components['street'] = street_match.group(1).strip()
                 break
 
         # Enhanced area/locality extraction
-        area_patterns = [
-            r'\b([A-Za-z\s()-]+(?:Area|Block|Sector|Phase|Colony|Nagar|Extension|Enclave|Complex|East|West|North|South|[EWNS])\b(?:\s*[\(\)][EWNS][)\)])?)',
-            r'\b(Bandra-Kurla\s+Complex)\b',
-            r'\b(Dept\.?\s*of\s*Corporate\s*Services)\b'
-        ]
-        
-        for pattern in area_patterns:
-            area_match = re.search(pattern, text, re.I)
+        for pattern in self.area_patterns:
+            area_match = pattern.search(text)
             if area_match:
                 area = area_match.group(1).strip()
                 area = re.sub(r'\(\s*([EWNS])\s*\)', r' (\1)', area)
@@ -252,25 +428,155 @@ class IndianAddressExtractor:
                 break
 
         # Enhanced city extraction
-        city_patterns = [
-            r'\b(Mumbai|Delhi|Bangalore|Hyderabad|Chennai|Kolkata|Pune|Ahmedabad|Surat|Jaipur|Bandra|Washington|New York)\b',
-            r'\b(U\.?S\.?A\.?)\b',
-            r'\b(Bandra-Kurla)\b'
-        ]
-        
-        for pattern in city_patterns:
-            city_match = re.search(pattern, text, re.I)
-            if city_match:
-                components['city'] = city_match.group(1).strip()
+        if city:
+            components['city'] = city
+
+        # A state named in the block wins over the PIN's; a district from the PIN directory
+        # saves the NER fallback
+        state = self._block_state(named_states, block_city, pin_info)
+        if state:
+            components['state'] = state
+        if pin_info and not components.get('city') and pin_info.district:
+            components['city'] = pin_info.district
+
+        # Then any known, aliased or misspelled city/state name, as its canonical name
+        if not components.get('city') or not components.get('state'):
+            city, fuzzy_state = self.rule_pack.places.resolve(text, hits)
+            if fuzzy_state and not components.get('state'):
+                components['state'] = fuzzy_state
+            named_state = state if named_states else fuzzy_state
+            if (city and not components.get('city')
+                    and self._city_agrees(city, named_state, pin_info, exact=city in named_cities)):
+                components['city'] = city
+
+        return components
+
+    def _place_hits(self, text: str) -> List[GazetteerHit]:
+        """Gazetteer hits of a block, without the state of a name that is part of a street or
+        building name ("Goa Street"); the hit itself stays, so the fuzzy pass skips it too"""
+        return [GazetteerHit(hit.start, hit.end, tuple(entry for entry in hit.entries if entry.kind != 'state'))
+                if any(entry.kind == 'state' for entry in hit.entries) and _STREET_NAME_TAIL_PATTERN.match(text, hit.end)
+                else hit
+                for hit in self.gazetteer.scan(text)]
+
+    def _match_postal_code(self, text: str, city: Optional[str], cities: List[str],
+                           states: List[str]) -> Tuple[Optional[str], Optional[PinInfo]]:
+        """The block's PIN code and its directory entry, or (None, None).
+
+        Reference and invoice numbers are often allocated PINs too. Of the candidates,
+        the last one agreeing with the block's city (the first one named) is taken, else the
+        last one agreeing with any city or state named in it, else the last one, since the
+        PIN ends an address.
+        """
+        found: Tuple[Optional[str], Optional[PinInfo]] = (None, None)
+        found_score = -1
+        for postal_match in re.finditer(r'\b\d{3}\s*\d{3}\b', text):
+            pin = postal_match.group(0).replace(" ", "")
+            pin_info = self.pin_directory.lookup(pin)
+            if not pin_info:
+                continue
+            if city and self._pin_agrees(pin_info, [city], ()):
+                score = 2
+            else:
+                score = 1 if self._pin_agrees(pin_info, cities, states) else 0
+            if score >= found_score:
+                found, found_score = (pin, pin_info), score
+        return found
+
+    def _pin_agrees(self, pin_info: PinInfo, cities: Iterable[str], states: Iterable[str]) -> bool:
+        """Whether a PIN's district or state is that of one of the cities, or one of the states"""
+        gazetteer = self.gazetteer
+        pin_state = gazetteer.canonical_state(pin_info.state)
+        district = pin_info.district.lower()
+        return (pin_state in states
+                or any(city.lower() == district or gazetteer.state_of_city(city) == pin_state for city in cities))
+
+    def _block_state(self, states: List[str], city: Optional[str], pin_info: Optional[PinInfo]) -> Optional[str]:
+        """The state of a block from the states named in it and its PIN.
+
+        A named state agreeing with the PIN, else the PIN's state if the block's city
+        agrees with it, else the last named state (addresses end with it); the PIN
+        only backfills the state of a block naming none. Without a PIN, a known city's
+        own state wins, since a state name may be part of a locality ("Bengal Chemicals").
+        """
+        if not states:
+            return pin_info.state if pin_info else None
+        if not pin_info:
+            return (self.gazetteer.state_of_city(city) if city else None) or states[-1]
+        pin_state = self.gazetteer.canonical_state(pin_info.state)
+        if pin_state in states or (city and self._pin_agrees(pin_info, [city], ())):
+            return pin_state
+        return states[-1]
+
+    def _city_agrees(self, city: str, state: Optional[str], pin_info: Optional[PinInfo], exact: bool) -> bool:
+        """False when a city lies in another state than the one named in the block or its PIN's.
+
+        A city whose state is unknown is compared by region. So is a city named exactly
+        against a prefix_only PIN, whose state is that of a whole sorting district; a
+        misspelled one must match even that state, so "Nagaur 341001" is not Nagpur.
+        """
+        checks = [(state, True)] if state else []
+        if pin_info:
+            checks.append((pin_info.state, not (exact and pin_info.prefix_only)))
+        city_state = self.gazetteer.state_of_city(city)
+        for other, by_state in checks:
+            if city_state and by_state:
+                if self.gazetteer.canonical_state(other) != city_state:
+                    return False
+            elif not self._region_agrees(other, city):
+                return False
+        return True
+
+    def _region_agrees(self, state: Optional[str], city: str) -> bool:
+        """False when a city name points to a different region than the state"""
+        if not state:
+            return True
+        state_region = self.gazetteer.region_of('state', state)
+        city_region = self.gazetteer.region_of('city', city)
+        return not state_region or not city_region or state_region == city_region
+
+    @staticmethod
+    def _gpe_texts(doc: "Doc") -> List[str]:
+        return [ent.text for ent in doc.ents if ent is not None and ent.label_ == 'GPE']
+
+    def _apply_ner_city(self, components: Dict[str, str], gpe_texts: List[str]) -> None:
+        """Fill in the city from the first GPE entity not already used by another component"""
+        for gpe in gpe_texts:
+            if not any(gpe.lower() in v.lower() for v in components.values()):
+                components['city'] = gpe
                 break
-        
-        # Fallback to NER for city
-        if not components.get('city'):
-            for ent in doc.ents:
-                if ent is not None and ent.label_ == 'GPE':
-                    if not any(ent.text.lower() in v.lower() for v in components.values()):
-                        components['city'] = ent.text
-                        break
+
+    def _finalize_components(self, components: Dict[str, str]) -> Dict[str, str]:
+        """Clean matched components and validate them as an address"""
+        rule_pack = self.rule_pack
+
+        def is_likely_valid_address(components):
+            # More comprehensive validation
+            min_required_components = ['city', 'street']
+            
+            # Ensure we have at least 2 key components
+            if sum(1 for key in min_required_components if key in components) < 2:
+                return False
+            
+            # Combine all component values
+            full_text = ' '.join(components.values()).lower()
+            
+            # Check if any suspicious phrase is in the full text
+            if any(phrase in full_text for phrase in rule_pack.suspicious_phrases):
+                return False
+            
+            # Additional length checks
+            if len(full_text) < 10 or len(full_text) > 300:
+                return False
+            
+            if 'city' in components:
+                city = components['city'].lower()
+                if city == 'india':
+                    return False
+                if city not in rule_pack.valid_cities and len(city) < 2:
+                    return False
+            
+            return True
 
         # Clean components
         for key in list(components.keys()):
@@ -284,10 +590,18 @@ class IndianAddressExtractor:
 
         # Final validation
         if is_likely_valid_address(components):
-            return dict(components)
+            return self._intern_components(components)
         
         return {}
 
+    @staticmethod
+    def _intern_components(components: Dict[str, str]) -> Dict[str, str]:
+        """Copy components into a plain dict with interned keys and categorical values"""
+        return {
+            sys.intern(key): sys.intern(value) if key in _CATEGORICAL_COMPONENTS else value
+            for key, value in components.items()
+        }
+
     def _clean_text(self, text: str) -> str:
         text = re.sub(r'\s+', ' ', text)
         text = re.sub(r'[,\t•⚫]+', ',', text)
@@ -296,105 +610,374 @@ class IndianAddressExtractor:
 
     def _extract_address_block(self, text: str) -> List[str]:
         """Extract address blocks using generic patterns and contextual clues"""
-        blocks = []
-        current_block = []
-        
-        # Split text into lines and clean each line
-        lines = [line.strip() for line in text.split('\n')]
-        
-        # Generic patterns that typically indicate a new address
-        address_indicators = [
-            r'\b\d{6}\b',  # PIN code
-            r'\b\d+[A-Za-z]?,\s*[A-Za-z\s]+',  # Street number followed by text
-            r'\b[A-Za-z]+[\s-]+(?:Complex|Plaza|Towers|Building|Street|Road|Lane|Avenue)\b',  # Common address elements
-            r'(?:^|\s)(?:Floor|Level|Block|Sector|Phase)\s+[A-Za-z0-9-]+\b'  # Common building/area elements
-        ]
-        
-        for line in lines:
-            if not line:
-                if current_block:
-                    blocks.append(' '.join(current_block))
-                    current_block = []
-                continue
-            
-            # Check if line likely starts a new address
-            has_address_indicator = any(re.search(pattern, line, re.I) for pattern in address_indicators)
-            
-            # Start new block if current line has address indicators and previous block exists
-            if has_address_indicator and current_block and not any(re.search(pattern, current_block[-1], re.I) for pattern in address_indicators):
-                blocks.append(' '.join(current_block))
-                current_block = []
-            
-            current_block.append(line)
-        
-        if current_block:
-            blocks.append(' '.join(current_block))
-        
-        # Clean and normalize blocks
-        cleaned_blocks = []
-        for block in blocks:
-            # Remove excessive whitespace and normalize separators
-            cleaned = re.sub(r'\s+', ' ', block)
-            cleaned = re.sub(r'[,\s]*,[,\s]*', ', ', cleaned)
-            cleaned = cleaned.strip(' ,')
-            if cleaned:
-                cleaned_blocks.append(cleaned)
-        
-        return cleaned_blocks
+        return [span.text for span in self._iter_block_spans([(1, text)])]
+
+    def _iter_block_spans(self, chunks: Iterable[Tuple[int, str]]) -> Iterator[BlockSpan]:
+        """Segment (page, text) chunks into address blocks in a single pass.
+
+        Chunks are treated as joined with "\n", which is how offsets are counted. Lines
+        are located with str.find and never copied; a block's text is built once, when
+        it is complete. A block's page is the page of its first line, and blocks may
+        run across chunk boundaries.
+        """
+        offset = 0  # Offset of the current chunk in the joined text
+        parts = []  # (chunk, start, end) of each line in the open block
+        block_page = block_start = block_end = None
+        last_has_indicator = False
+
+        for page, chunk in chunks:
+            pos = 0
+            while True:
+                newline = chunk.find('\n', pos)
+                line_end = len(chunk) if newline == -1 else newline
+
+                first = _NON_SPACE_PATTERN.search(chunk, pos, line_end)
+                if first is None:
+                    # Blank line ends the current block
+                    if parts:
+                        text = self._clean_block(parts)
+                        if text:
+                            yield BlockSpan(block_page, block_start, block_end, text)
+                        parts = []
+                else:
+                    start = first.start()
+                    end = line_end
+                    while chunk[end - 1].isspace():
+                        end -= 1
+
+                    # Start new block if this line has address indicators and the previous one did not
+                    has_indicator = _ADDRESS_INDICATOR_PATTERN.search(chunk, start, end) is not None
+                    if has_indicator and parts and not last_has_indicator:
+                        text = self._clean_block(parts)
+                        if text:
+                            yield BlockSpan(block_page, block_start, block_end, text)
+                        parts = []
+
+                    if not parts:
+                        block_page, block_start = page, offset + start
+                    parts.append((chunk, start, end))
+                    block_end = offset + end
+                    last_has_indicator = has_indicator
+
+                if newline == -1:
+                    break
+                pos = newline + 1
+
+            offset += len(chunk) + 1
+
+        if parts:
+            text = self._clean_block(parts)
+            if text:
+                yield BlockSpan(block_page, block_start, block_end, text)
+
+    def _clean_block(self, parts: List[Tuple[str, int, int]]) -> str:
+        """Join a block's lines, removing excessive whitespace and normalizing separators"""
+        block = ' '.join(chunk[start:end] for chunk, start, end in parts)
+        block = _WHITESPACE_PATTERN.sub(' ', block)
+        block = _SEPARATOR_PATTERN.sub(', ', block)
+        return block.strip(' ,')
 
     def _detect_region(self, text: str, components: Dict[str, str]) -> str:
-        text_lower = text.lower()
-        
         if 'state' in components:
-            state = components['state']
-            for region, info in self.regional_info.items():
-                if any(s.lower() in state.lower() for s in info['states']):
-                    return region
+            region = self.gazetteer.region_of('state', components['state'])
+            if region:
+                return region
         
         if 'city' in components:
-            city = components['city'].lower()
-            for region, info in self.regional_info.items():
-                if any(c.lower() in city for c in info['cities']):
-                    return region
-        
-        for region, info in self.regional_info.items():
-            if any(term in text_lower for term in info['terms']):
+            region = self.gazetteer.region_of('city', components['city'])
+            if region:
                 return region
         
-        return 'unknown'
+        # Same text the component stage scanned, so the gazetteer reuses its hits
+        return self.gazetteer.region_of_terms(self.gazetteer.scan(' '.join(text.split()))) or 'unknown'
+
+    def extract_addresses(self, text: str, min_confidence: float = 0.3, max_results: Optional[int] = None,
+                          stop_at_confidence: Optional[float] = None) -> List[AddressMatch]:
+        """Extract the addresses in text, in order of appearance.
 
-    def extract_addresses(self, text: str, min_confidence: float = 0.3) -> List[AddressMatch]:
+        max_results stops after that many distinct addresses, and stop_at_confidence
+        after the first address scoring at least that; later blocks are never
+        segmented or parsed.
+        """
         try:
             addresses = []
-            blocks = self._extract_address_block(text)
-            
-            for block in blocks:
-                try:
-                    doc = self.nlp(block)
-                    components = self._extract_components(doc)
-                    
-                    confidence = self._calculate_confidence(components, block)
-                    
-                    if confidence >= min_confidence:
-                        region = self._detect_region(block, components)
-                        match = AddressMatch(
-                            raw_text=block,
-                            components=components,
-                            confidence_score=confidence,
-                            region=region
-                        )
-                        addresses.append(match)
-                
-                except Exception as e:
-                    logger.warning(f"Error processing block: {block[:50]}... Error: {str(e)}")
-                    continue
+            limited = max_results is not None or stop_at_confidence is not None
+            seen_texts = set()
             
+            for span in self._iter_block_spans([(1, text)]):
+                match = self._process_block(span.text, min_confidence)
+                if match:
+                    match.char_start, match.char_end = span.start, span.end
+                    addresses.append(match)
+                    if limited:
+                        seen_texts.add(self._normalize_block(match.raw_text))
+                        if _limit_reached(len(seen_texts), match.confidence_score, max_results, stop_at_confidence):
+                            break
+
+            if self.metrics is not None:
+                self.metrics.count('blocks_accepted', len(addresses))
             return self._deduplicate_addresses(addresses)
             
         except Exception as e:
             logger.error(f"Error in address extraction: {str(e)}")
+            if self.metrics is not None:
+                self.metrics.record_error('extract')
             return []
 
+    def extract_addresses_batch(self, texts: Iterable[str], min_confidence: float = 0.3,
+                                batch_size: int = 256, n_process: int = 1,
+                                return_exceptions: bool = False) -> List[Union[List[AddressMatch], Exception]]:
+        """Extract addresses from many documents, pooling their blocks into nlp.pipe calls.
+
+        Returns one list of AddressMatch per input text, in input order. If the pooled
+        pass fails, each document is retried on its own, so one bad document does not
+        empty the others. A document that still fails is logged and gets [], or with
+        return_exceptions its exception.
+        """
+        texts = list(texts)
+        results: List[Union[List[AddressMatch], Exception, None]] = [None] * len(texts)
+        # Block spans of every document that could be segmented
+        spans: Dict[int, List[BlockSpan]] = {}
+        for doc_idx, text in enumerate(texts):
+            try:
+                spans[doc_idx] = list(self._iter_block_spans([(1, text)]))
+            except Exception as e:
+                self._log_document_error(e)
+                results[doc_idx] = e if return_exceptions else []
+
+        try:
+            matched = self._match_documents(spans, min_confidence, batch_size, n_process)
+        except Exception as e:
+            logger.warning(f"Error in batch address extraction, retrying {len(spans)} documents "
+                           f"one at a time. Error: {str(e)}")
+            matched = {}
+            for doc_idx, doc_spans in spans.items():
+                try:
+                    matched.update(self._match_documents({doc_idx: doc_spans}, min_confidence,
+                                                         batch_size, n_process))
+                except Exception as e:
+                    self._log_document_error(e)
+                    results[doc_idx] = e if return_exceptions else []
+
+        for doc_idx, addresses in matched.items():
+            results[doc_idx] = addresses
+        return results
+
+    def _match_documents(self, spans: Dict[int, List[BlockSpan]], min_confidence: float,
+                         batch_size: int, n_process: int) -> Dict[int, List[AddressMatch]]:
+        """Match the block spans of several documents in one pooled pass; raises on any failure"""
+        # (document index, span) for every block of every document
+        pooled = [(doc_idx, span) for doc_idx, doc_spans in spans.items() for span in doc_spans]
+        matches = self._match_blocks([span.text for _, span in pooled], min_confidence,
+                                     batch_size, n_process)
+        results = {doc_idx: [] for doc_idx in spans}
+        for (doc_idx, span), match in zip(pooled, matches):
+            if match:
+                match.char_start, match.char_end = span.start, span.end
+                results[doc_idx].append(match)
+
+        if self.metrics is not None:
+            self.metrics.count('blocks_accepted', sum(map(len, results.values())))
+        return {doc_idx: self._deduplicate_addresses(addresses) for doc_idx, addresses in results.items()}
+
+    def _log_document_error(self, error: Exception) -> None:
+        """Log a document or row that failed on its own"""
+        logger.error(f"Error in address extraction: {str(error)}")
+        if self.metrics is not None:
+            self.metrics.record_error('extract')
+
+    def normalize_addresses(self, texts: Iterable[object], min_confidence: float = 0.3,
+                            batch_size: int = 256, n_process: int = 1,
+                            return_exceptions: bool = False) -> List[Union[AddressMatch, Exception, None]]:
+        """Parse texts that are each already one address, skipping block segmentation.
+
+        Returns one AddressMatch per text, in input order, or None where the text
+        does not score as an address. Whitespace and separators are cleaned as for
+        a block, so raw_text may differ from the input. None and NaN are empty rows,
+        and other non-strings are parsed as their str(). As in extract_addresses_batch,
+        a failed pooled pass is retried row by row; a row that still fails is logged
+        and gets None, or with return_exceptions its exception.
+        """
+        texts = list(texts)
+        results: List[Union[AddressMatch, Exception, None]] = [None] * len(texts)
+        blocks: Dict[int, str] = {}
+        for i, value in enumerate(texts):
+            try:
+                text = _row_text(value)
+                blocks[i] = self._clean_block([(text, 0, len(text))])
+            except Exception as e:
+                self._log_document_error(e)
+                results[i] = e if return_exceptions else None
+
+        try:
+            matched = dict(zip(blocks, self._match_blocks(list(blocks.values()), min_confidence,
+                                                          batch_size, n_process)))
+        except Exception as e:
+            logger.warning(f"Error in address normalization, retrying {len(blocks)} rows one at a time. "
+                           f"Error: {str(e)}")
+            matched = {}
+            for i, block in blocks.items():
+                try:
+                    matched[i] = self._match_blocks([block], min_confidence, batch_size, n_process)[0]
+                except Exception as e:
+                    self._log_document_error(e)
+                    results[i] = e if return_exceptions else None
+
+        for i, match in matched.items():
+            results[i] = match
+        if self.metrics is not None:
+            # Each text is one block; segmentation, which counts blocks_seen elsewhere, is skipped
+            self.metrics.count('blocks_seen', len(texts))
+            self.metrics.count('blocks_accepted', sum(1 for match in matched.values() if match))
+        return results
+
+    def _match_blocks(self, blocks: List[str], min_confidence: float = 0.3,
+                      batch_size: int = 256, n_process: int = 1) -> List[Optional[AddressMatch]]:
+        """Run component extraction and scoring on many blocks, pooling them into nlp.pipe calls"""
+        # Blocks worth analysing; the rest are scored with no components
+        candidates = [i for i, block in enumerate(blocks) if block and self._passes_prefilter(block)]
+
+        if self.cache is not None:
+            analyses = dict(zip(candidates, self._analyze_blocks_cached(
+                [blocks[i] for i in candidates], batch_size, n_process)))
+            matches = []
+            for i, block in enumerate(blocks):
+                if i not in analyses:
+                    matches.append(self._build_match(block, {}, min_confidence) if block else None)
+                    continue
+                components, confidence, region = analyses[i]
+                matches.append(AddressMatch(
+                    raw_text=block,
+                    components=self._intern_components(components),
+                    confidence_score=confidence,
+                    region=sys.intern(region),
+                    rule_pack=self.rule_pack.label
+                ) if confidence >= min_confidence else None)
+            return matches
+
+        component_lists = [{} for _ in blocks]
+        if self.lazy_ner:
+            # Regex stages first; only blocks still missing a city go through spaCy
+            matched = {i: self._match_components(blocks[i]) for i in candidates}
+            pending = [i for i in candidates
+                       if not matched[i].get('city') and self.nlp is not None]
+            docs = self.nlp.pipe((blocks[i] for i in pending),
+                                 batch_size=batch_size, n_process=n_process) if pending else []
+            for i, doc in zip(pending, docs):
+                self._apply_ner_city(matched[i], self._gpe_texts(doc))
+            for i in candidates:
+                component_lists[i] = self._finalize_components(matched[i])
+        elif candidates:
+            docs = self.nlp.pipe((blocks[i] for i in candidates),
+                                 batch_size=batch_size, n_process=n_process)
+            for i, doc in zip(candidates, docs):
+                component_lists[i] = self._extract_components(doc)
+
+        matches = []
+        for block, components in zip(blocks, component_lists):
+            try:
+                matches.append(self._build_match(block, components, min_confidence) if block else None)
+            except Exception as e:
+                logger.warning(f"Error processing block: {block[:50]}... Error: {str(e)}")
+                if self.metrics is not None:
+                    self.metrics.record_error('process_block')
+                matches.append(None)
+        return matches
+
+    def _process_block(self, block: str, min_confidence: float = 0.3) -> Optional[AddressMatch]:
+        """Run component extraction and scoring on a single block"""
+        try:
+            if not self._passes_prefilter(block):
+                return self._build_match(block, {}, min_confidence)
+
+            if self.cache is not None:
+                components, confidence, region = self._analyze_blocks_cached([block])[0]
+                if confidence < min_confidence:
+                    return None
+                return AddressMatch(
+                    raw_text=block,
+                    components=self._intern_components(components),
+                    confidence_score=confidence,
+                    region=sys.intern(region),
+                    rule_pack=self.rule_pack.label
+                )
+
+            doc = block if self.lazy_ner else self.nlp(block)
+            components = self._extract_components(doc)
+            return self._build_match(block, components, min_confidence)
+        except Exception as e:
+            logger.warning(f"Error processing block: {block[:50]}... Error: {str(e)}")
+            if self.metrics is not None:
+                self.metrics.record_error('process_block')
+            return None
+
+    def _analyze_blocks_cached(self, blocks: List[str], batch_size: int = 256,
+                               n_process: int = 1) -> List[list]:
+        """Return [components, confidence, region] per block, computing only cache misses.
+
+        Results are keyed on the normalized block (as used by _deduplicate_addresses),
+        so blocks differing only in case or spacing share one entry. NER runs only for
+        missed blocks with no regex city whose entities are not cached either.
+        """
+        keys = [ResultCache.make_key('result', self.rules_version, self._normalize_block(block))
+                for block in blocks]
+        analyses = [self.cache.get('result', key) for key in keys]
+
+        # Compute each missing key once, even if it repeats within this call
+        first_by_key = {}
+        for i, analysis in enumerate(analyses):
+            if analysis is None:
+                first_by_key.setdefault(keys[i], i)
+        missing = list(first_by_key.values())
+
+        matched = {i: self._match_components(blocks[i]) for i in missing}
+        gpe_texts = {}
+        to_parse = []
+        for i in missing:
+            if matched[i].get('city') or self.nlp is None:
+                continue
+            ner_key = ResultCache.make_key('ner', self.model_version, blocks[i])
+            cached = self.cache.get('ner', ner_key)
+            if cached is None:
+                to_parse.append((i, ner_key))
+            else:
+                gpe_texts[i] = cached
+
+        docs = self.nlp.pipe((blocks[i] for i, _ in to_parse), batch_size=batch_size,
+                             n_process=n_process) if to_parse else []
+        for (i, ner_key), doc in zip(to_parse, docs):
+            gpe_texts[i] = self._gpe_texts(doc)
+            self.cache.put('ner', ner_key, gpe_texts[i])
+
+        for i in missing:
+            components = matched[i]
+            if i in gpe_texts:
+                self._apply_ner_city(components, gpe_texts[i])
+            components = self._finalize_components(components)
+            analysis = [components, self._calculate_confidence(components, blocks[i]),
+                        self._detect_region(blocks[i], components)]
+            self.cache.put('result', keys[i], analysis)
+            analyses[i] = analysis
+
+        return [analysis if analysis is not None else analyses[first_by_key[key]]
+                for analysis, key in zip(analyses, keys)]
+
+    def _build_match(self, block: str, components: Dict[str, str],
+                     min_confidence: float) -> Optional[AddressMatch]:
+        """Score a block's components and wrap them in an AddressMatch if confident enough"""
+        confidence = self._calculate_confidence(components, block)
+        if confidence < min_confidence:
+            return None
+
+        region = self._detect_region(block, components)
+        return AddressMatch(
+            raw_text=block,
+            components=components,
+            confidence_score=confidence,
+            region=region,
+            rule_pack=self.rule_pack.label
+        )
+
     def _calculate_confidence(self, components: Dict[str, str], text: str) -> float:
         """Calculate confidence score using generic criteria"""
         score = 0.0
@@ -431,13 +1014,18 @@ class IndianAddressExtractor:
         seen_texts = set()
         
         for addr in addresses:
-            normalized_text = re.sub(r'\s+', ' ', addr.raw_text.lower())
+            normalized_text = self._normalize_block(addr.raw_text)
             if normalized_text not in seen_texts:
                 seen_texts.add(normalized_text)
                 unique_addresses.append(addr)
         
         return unique_addresses
 
+    @staticmethod
+    def _normalize_block(text: str) -> str:
+        """Normalization used to decide whether two blocks are the same address"""
+        return re.sub(r'\s+', ' ', text.lower())
+
     def format_address(self, address_match: AddressMatch) -> str:
         """Format address using a generic approach"""
         try:
@@ -475,38 +1063,218 @@ class IndianAddressExtractor:
             logger.error(f"Error formatting address: {str(e)}")
             return address_match.raw_text
 
-def process_pdf_for_addresses(pdf_path: str) -> List[Dict]:
-    """Process PDF file and extract addresses with improved accuracy"""
-    try:
-        with fitz.open(pdf_path) as pdf:
-            pdf_text = ""
-            for page in pdf:
-                pdf_text += page.get_text() + "\n"
+def _row_text(value: object) -> str:
+    """Text of one table cell: '' for None and NaN, str() of other non-strings"""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'replace')
+    return value if isinstance(value, str) else str(value)
+
+def _limit_reached(found: int, confidence: float, max_results: Optional[int],
+                   stop_at_confidence: Optional[float]) -> bool:
+    """Whether an early-terminating scan can stop after an address with this confidence"""
+    return ((max_results is not None and found >= max_results) or
+            (stop_at_confidence is not None and confidence >= stop_at_confidence))
+
+def _selected_pages(page_count: int, page_range: Optional[Tuple[int, int]] = None,
+                    max_pages: Optional[int] = None) -> range:
+    """0-based indexes of the pages to read: 1-based inclusive page_range, capped at max_pages"""
+    first, last = page_range or (1, page_count)
+    if first < 1 or last < first:
+        raise ValueError(f"Invalid page range: {page_range}")
+    last = min(last, page_count)
+    if max_pages is not None:
+        last = min(last, first - 1 + max_pages)
+    return range(first - 1, max(last, first - 1))
 
+def _iter_pdf_pages(pdf, progress: Optional[Callable[[int, int], None]] = None,
+                    pages: Optional[range] = None,
+                    furniture: Optional[PageFurniture] = None) -> Iterator[Tuple[int, str, List[FurnitureBlock]]]:
+    """Yield (page number, text, furniture blocks) triples, reading one page at a time;
+    the furniture blocks are blanked out of the text"""
+    if pages is None:
+        pages = range(pdf.page_count)
+    if furniture is None:
+        furniture = PageFurniture()
+    for index in pages:
+        text, removed = furniture.page_text(pdf[index])
+        if progress is not None:
+            progress(index + 1, pages.stop)
+        yield index + 1, text, removed
+
+def _iter_page_spans(extractor: IndianAddressExtractor,
+                     pages: Iterable[Tuple[int, str, List[FurnitureBlock]]]) -> Iterator[BlockSpan]:
+    """Segment (page number, text, furniture blocks) triples into address blocks.
+
+    Each distinct furniture block is segmented once, at its first copy, and its
+    blocks are flagged as letterhead and merged into the stream at that position.
+    Later copies are blanked out of the text, so they are never matched again.
+    """
+    pending = deque()  # Letterhead spans not yet yielded, in order
+    seen = set()
+
+    def chunks() -> Iterator[Tuple[int, str]]:
+        offset = 0  # Offset of the page in the pages joined with "\n"
+        for page, text, removed in pages:
+            for block in removed:
+                if block.text in seen:
+                    if extractor.metrics is not None:
+                        extractor.metrics.count('repeated_blocks_skipped')
+                    continue
+                seen.add(block.text)
+                shift = offset + block.start
+                for span in extractor._iter_block_spans([(page, block.text)]):
+                    pending.append(span._replace(start=span.start + shift, end=span.end + shift, letterhead=True))
+            offset += len(text) + 1
+            yield page, text
+
+    for span in extractor._iter_block_spans(chunks()):
+        while pending and pending[0].start < span.start:
+            yield pending.popleft()
+        yield span
+    yield from pending
+
+def iter_addresses_from_pdf(pdf_path: Union[str, bytes], extractor: Optional[IndianAddressExtractor] = None,
+                            min_confidence: float = 0.3,
+                            progress: Optional[Callable[[int, int], None]] = None,
+                            max_results: Optional[int] = None, stop_at_confidence: Optional[float] = None,
+                            max_pages: Optional[int] = None,
+                            page_range: Optional[Tuple[int, int]] = None,
+                            skip_repeated: bool = True) -> Iterator[Dict]:
+    """Stream addresses from a PDF page by page, yielding each one as soon as it is final.
+
+    pdf_path may also be the PDF's bytes (e.g. an upload). Only the current page, the
+    unfinished block and the dedup keys are held in memory. progress, if given, is
+    called with (page number, last page to read) as each page is read.
+
+    page_range (first, last), 1-based and inclusive, and max_pages limit the pages
+    read; char_start/char_end are then offsets into the selected pages joined with
+    newlines. The scan stops reading pages after max_results addresses, or after
+    the first one scoring at least stop_at_confidence.
+
+    With skip_repeated, headers and footers repeated across pages (see
+    page_furniture.py) are parsed once, at their first copy, and flagged with
+    'letterhead'; their other copies are skipped. Detection samples pages from
+    the whole selection, so it is skipped when max_results or stop_at_confidence
+    is given.
+    """
+    import fitz  # PyMuPDF
+
+    if extractor is None:
         extractor = IndianAddressExtractor()
-        
-        addresses = extractor.extract_addresses(pdf_text)
 
-        formatted_addresses = []
-        seen_addresses = set()
-        
-        for addr in addresses:
-            formatted = extractor.format_address(addr)
-            
-            if len(addr.components) < 2:
-                continue
-                
-            if formatted not in seen_addresses:
-                seen_addresses.add(formatted)
-                formatted_addresses.append({
-                    'formatted': formatted,
-                    'raw': addr.raw_text,
-                    'confidence': addr.confidence_score,
-                    'region': addr.region,
-                    'components': addr.components
-                })
-
-        return formatted_addresses
+    if isinstance(pdf_path, bytes):
+        pdf = fitz.open(stream=pdf_path, filetype="pdf")
+    else:
+        pdf = fitz.open(pdf_path)
+
+    with pdf:
+        selected = None
+        if max_pages is not None or page_range is not None:
+            selected = _selected_pages(pdf.page_count, page_range, max_pages)
+        furniture = None
+        if skip_repeated and max_results is None and stop_at_confidence is None:
+            furniture = PageFurniture.detect(pdf, selected)
+        pages = _iter_pdf_pages(pdf, progress, selected, furniture)
+        if extractor.metrics is not None:
+            pages = extractor.metrics.timed_iter('pdf_text', pages, count='pages')
+        spans = _iter_page_spans(extractor, pages)
+        yield from _iter_address_records(extractor, spans, min_confidence, max_results, stop_at_confidence)
+
+def iter_addresses_from_text(text: str, extractor: Optional[IndianAddressExtractor] = None,
+                             min_confidence: float = 0.3, max_results: Optional[int] = None,
+                             stop_at_confidence: Optional[float] = None) -> Iterator[Dict]:
+    """Yield the same address dicts as iter_addresses_from_pdf for plain text (page is always 1)"""
+    if extractor is None:
+        extractor = IndianAddressExtractor()
+
+    spans = extractor._iter_block_spans([(1, text)])
+    yield from _iter_address_records(extractor, spans, min_confidence, max_results, stop_at_confidence)
+
+def _iter_address_records(extractor: IndianAddressExtractor, spans: Iterable[BlockSpan],
+                          min_confidence: float, max_results: Optional[int] = None,
+                          stop_at_confidence: Optional[float] = None) -> Iterator[Dict]:
+    """Turn block spans into deduplicated, formatted address dicts"""
+    records = _dedupe_records(_iter_candidate_records(extractor, spans, min_confidence))
+    if max_results is None and stop_at_confidence is None:
+        return records
+    return _iter_until_limit(records, max_results, stop_at_confidence)
+
+def _iter_until_limit(records: Iterable[Dict], max_results: Optional[int],
+                      stop_at_confidence: Optional[float]) -> Iterator[Dict]:
+    """Pass records through until the limit is reached, without pulling any further"""
+    for found, record in enumerate(records, 1):
+        yield record
+        if _limit_reached(found, record['confidence'], max_results, stop_at_confidence):
+            return
+
+def _iter_candidate_records(extractor: IndianAddressExtractor, spans: Iterable[BlockSpan],
+                            min_confidence: float) -> Iterator[Dict]:
+    """Address dicts for every accepted block, before deduplication.
+
+    'formatted' is None for blocks with fewer than two components; those are never
+    emitted, but still take part in deduplication by raw text.
+    """
+    for span in spans:
+        addr = extractor._process_block(span.text, min_confidence)
+        if addr is None:
+            continue
+        addr.char_start, addr.char_end = span.start, span.end
+        addr.letterhead = span.letterhead
+        if extractor.metrics is not None:
+            extractor.metrics.count('blocks_accepted')
+
+        yield {
+            'formatted': extractor.format_address(addr) if len(addr.components) >= 2 else None,
+            'raw': addr.raw_text,
+            'confidence': addr.confidence_score,
+            'region': addr.region,
+            'rule_pack': addr.rule_pack,
+            'letterhead': addr.letterhead,
+            'components': addr.components,
+            'page': span.page,
+            'char_start': span.start,
+            'char_end': span.end
+        }
+
+def _dedupe_records(records: Iterable[Dict]) -> Iterator[Dict]:
+    """Drop repeated blocks (by normalized raw text), incomplete ones and repeated formatted addresses"""
+    seen_blocks = set()
+    seen_addresses = set()
+
+    for record in records:
+        normalized_text = IndianAddressExtractor._normalize_block(record['raw'])
+        if normalized_text in seen_blocks:
+            continue
+        seen_blocks.add(normalized_text)
+
+        formatted = record['formatted']
+        if formatted is None or formatted in seen_addresses:
+            continue
+        seen_addresses.add(formatted)
+
+        yield record
+
+def process_pdf_for_addresses(pdf_path: str, workers: int = 1, max_results: Optional[int] = None,
+                              stop_at_confidence: Optional[float] = None, max_pages: Optional[int] = None,
+                              page_range: Optional[Tuple[int, int]] = None,
+                              skip_repeated: bool = True) -> List[Dict]:
+    """Process PDF file and extract addresses with improved accuracy.
+
+    With workers > 1, page ranges are processed in parallel (see parallel_pdf.py);
+    the result is the same list in the same order. The early-termination options
+    (see iter_addresses_from_pdf) read from the first selected page onwards in this
+    process, so they ignore workers. skip_repeated parses headers and footers
+    repeated across pages only once (see iter_addresses_from_pdf).
+    """
+    try:
+        limits = {'max_results': max_results, 'stop_at_confidence': stop_at_confidence,
+                  'max_pages': max_pages, 'page_range': page_range}
+        if workers > 1 and not any(value is not None for value in limits.values()):
+            from parallel_pdf import extract_pdf_parallel
+            return extract_pdf_parallel(pdf_path, workers, skip_repeated=skip_repeated)
+        return list(iter_addresses_from_pdf(pdf_path, skip_repeated=skip_repeated, **limits))
 
     except Exception as e:
         logger.error(f"Error processing PDF: {str(e)}")
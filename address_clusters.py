@@ -0,0 +1,299 @@
+"""Near-duplicate clustering of extracted addresses, within a document or across a corpus.
+
+Exact deduplication keeps "Plot No 5, MIDC, Andheri (E), Mumbai 400093" and
+"Plot 5 MIDC Andheri East Mumbai-400093" apart. Here each address is reduced
+to canonical tokens (lowercased, abbreviations expanded, PIN digits joined),
+which already makes those two identical, and then to a MinHash signature.
+Locality-sensitive hashing of the signature bands finds candidate clusters
+with a few index lookups per address, so the cost is linear in the number of
+addresses, with no pairwise comparison:
+
+    with AddressClusterIndex('clusters.db') as index:
+        for record in records:
+            assignment = index.add_record(record)
+            print(assignment.cluster_id, assignment.representative)
+
+The index is a SQLite file (in memory by default), so cluster ids stay stable
+across runs and corpora. A JSONL file written by batch_extract.py can be
+clustered with
+
+    python address_clusters.py addresses.jsonl --index clusters.db -o clustered.jsonl
+"""
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+import numpy
+
+logger = logging.getLogger(__name__)
+
+# Signature layout: NUM_PERM hash functions split into BANDS bands of NUM_PERM // BANDS rows
+NUM_PERM = 64
+BANDS = 16
+# Estimated Jaccard similarity of canonical tokens needed to join a cluster
+THRESHOLD = 0.7
+
+# Mersenne prime for the MinHash permutations; a * h + b stays below 2**64 for 32-bit h
+_PRIME = (1 << 31) - 1
+
+_ABBREVIATIONS = {
+    'rd': 'road', 'st': 'street', 'ln': 'lane', 'ave': 'avenue', 'hwy': 'highway',
+    'bldg': 'building', 'apt': 'apartment', 'apts': 'apartments', 'flr': 'floor', 'fl': 'floor',
+    'sec': 'sector', 'ph': 'phase', 'nr': 'near', 'opp': 'opposite', 'ext': 'extension',
+    'e': 'east', 'w': 'west', 'n': 'north', 's': 'south',
+    'bombay': 'mumbai', 'bengaluru': 'bangalore', 'calcutta': 'kolkata', 'madras': 'chennai',
+    'gurugram': 'gurgaon',
+}
+# Tokens that do not help tell two addresses apart
+_STOP_TOKENS = {'no', 'nos', 'number', 'the', 'of', 'at', 'and', 'india', 'address', 'regd', 'registered', 'office'}
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+# Dotted initialisms such as "M.I.D.C." or "M. G." are collapsed into one token
+_INITIALISM_PATTERN = re.compile(r'\b(?:[a-z]\.\s?){2,}')
+_SPLIT_PIN_PATTERN = re.compile(r'\b([1-9]\d{2})\s+(\d{3})\b')
+_PIN_PATTERN = re.compile(r'^[1-9]\d{5}$')
+
+
+class ClusterAssignment(NamedTuple):
+    cluster_id: int
+    representative: str
+    # Estimated similarity to the cluster's founding address (1.0 for a new cluster)
+    similarity: float
+    is_new: bool
+
+
+def canonical_tokens(text: str) -> List[str]:
+    """Lowercased word tokens with abbreviations expanded and uninformative words removed"""
+    text = _INITIALISM_PATTERN.sub(lambda m: m.group(0).replace('.', '').replace(' ', '') + ' ', text.lower())
+    text = _SPLIT_PIN_PATTERN.sub(r'\1\2', text)
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text):
+        token = _ABBREVIATIONS.get(token, token)
+        if token not in _STOP_TOKENS:
+            tokens.append(token)
+    return tokens
+
+
+def _stable_hash(data: bytes, size: int = 8, signed: bool = False) -> int:
+    # Python's hash() is salted per process; the index must hash identically across runs
+    return int.from_bytes(hashlib.blake2b(data, digest_size=size).digest(), 'little', signed=signed)
+
+
+class MinHasher:
+    """MinHash signatures over token sets, identical across processes and runs"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        self.num_perm = num_perm
+        self.a = numpy.array([_stable_hash(f'{seed}:a:{i}'.encode()) % (_PRIME - 1) + 1 for i in range(num_perm)],
+                             dtype=numpy.uint64)[:, None]
+        self.b = numpy.array([_stable_hash(f'{seed}:b:{i}'.encode()) % _PRIME for i in range(num_perm)],
+                             dtype=numpy.uint64)[:, None]
+        self._token_hashes: Dict[str, int] = {}
+
+    def _hash_token(self, token: str) -> int:
+        value = self._token_hashes.get(token)
+        if value is None:
+            if len(self._token_hashes) >= 1_000_000:
+                self._token_hashes.clear()
+            value = self._token_hashes[token] = _stable_hash(token.encode('utf-8'), 4)
+        return value
+
+    def signature(self, tokens: Iterable[str]) -> numpy.ndarray:
+        hashes = numpy.array([self._hash_token(token) for token in set(tokens)], dtype=numpy.uint64)
+        return ((self.a * hashes + self.b) % _PRIME).min(axis=1).astype(numpy.uint32)
+
+
+class AddressClusterIndex:
+    """Assigns addresses to near-duplicate clusters, persisted in SQLite"""
+
+    def __init__(self, db_path: str = ':memory:', threshold: float = THRESHOLD,
+                 num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = 1, commit_every: int = 1000):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.commit_every = commit_every
+        self.hasher = MinHasher(num_perm, seed)
+        self._pending_writes = 0
+
+        self._db = sqlite3.connect(db_path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS clusters (
+                id INTEGER PRIMARY KEY, representative TEXT NOT NULL, confidence REAL NOT NULL,
+                size INTEGER NOT NULL, pin TEXT NOT NULL, numbers TEXT NOT NULL, signature BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS exact_keys (key TEXT PRIMARY KEY, cluster_id INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS bands (key INTEGER PRIMARY KEY, cluster_id INTEGER NOT NULL);
+        """)
+        # Signatures are only comparable when built with the same parameters
+        params = json.dumps({'num_perm': num_perm, 'bands': bands, 'seed': seed})
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+        if row is None:
+            self._db.execute("INSERT INTO meta (key, value) VALUES ('params', ?)", (params,))
+        elif row[0] != params:
+            raise ValueError(f"Cluster index {db_path} was built with {row[0]}, not {params}")
+        self._db.commit()
+
+    def __enter__(self) -> 'AddressClusterIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _band_keys(self, signature: numpy.ndarray) -> List[int]:
+        rows = self.rows
+        return [_stable_hash(bytes([band]) + signature[band * rows:(band + 1) * rows].tobytes(), signed=True)
+                for band in range(self.bands)]
+
+    @staticmethod
+    def _compatible(pin: str, numbers: Set[str], cluster_pin: str, cluster_numbers: str) -> bool:
+        """Different PINs, or house numbers that are not a subset of each other, mean different addresses"""
+        if pin and cluster_pin and pin != cluster_pin:
+            return False
+        other = set(cluster_numbers.split())
+        return numbers <= other or other <= numbers
+
+    def add(self, text: str, postal_code: str = '', confidence: float = 0.0) -> ClusterAssignment:
+        """Assign one address (raw or formatted text) to a cluster, creating one if nothing is close"""
+        tokens = canonical_tokens(text)
+        pin = postal_code.replace(' ', '') or next((t for t in tokens if _PIN_PATTERN.match(t)), '')
+        numbers = {t for t in tokens if t != pin and any(c.isdigit() for c in t)}
+        exact_key = pin + '|' + ' '.join(sorted(set(tokens)))
+
+        row = self._db.execute("SELECT cluster_id FROM exact_keys WHERE key = ?", (exact_key,)).fetchone()
+        if row is not None:
+            return self._count_write(self._join(row[0], text, confidence, 1.0, []))
+
+        signature = self.hasher.signature(tokens) if tokens else None
+        band_keys = self._band_keys(signature) if tokens else []
+        best_id, best_similarity = None, 0.0
+        if band_keys:
+            candidates = [cluster_id for (cluster_id,) in self._db.execute(
+                f"SELECT DISTINCT cluster_id FROM bands WHERE key IN ({','.join('?' * len(band_keys))})", band_keys)]
+            if candidates:
+                query = f"SELECT id, pin, numbers, signature FROM clusters WHERE id IN ({','.join('?' * len(candidates))})"
+                for cluster_id, cluster_pin, cluster_numbers, cluster_signature in self._db.execute(query, candidates):
+                    if not self._compatible(pin, numbers, cluster_pin, cluster_numbers):
+                        continue
+                    similarity = float(numpy.mean(signature == numpy.frombuffer(cluster_signature, dtype=numpy.uint32)))
+                    if best_id is None or similarity > best_similarity or \
+                            (similarity == best_similarity and cluster_id < best_id):
+                        best_id, best_similarity = cluster_id, similarity
+
+        if best_id is not None and best_similarity >= self.threshold:
+            assignment = self._join(best_id, text, confidence, best_similarity, band_keys)
+        else:
+            cursor = self._db.execute(
+                "INSERT INTO clusters (representative, confidence, size, pin, numbers, signature) VALUES (?, ?, 1, ?, ?, ?)",
+                (text, confidence, pin, ' '.join(sorted(numbers)),
+                 signature.tobytes() if signature is not None else b''))
+            assignment = ClusterAssignment(cursor.lastrowid, text, 1.0, True)
+            self._index(assignment.cluster_id, band_keys)
+        self._db.execute("INSERT OR IGNORE INTO exact_keys (key, cluster_id) VALUES (?, ?)",
+                         (exact_key, assignment.cluster_id))
+        return self._count_write(assignment)
+
+    def _count_write(self, assignment: ClusterAssignment) -> ClusterAssignment:
+        """Count one add() as a buffered write, committing every commit_every of them"""
+        self._pending_writes += 1
+        if self._pending_writes >= self.commit_every:
+            self.flush()
+        return assignment
+
+    def _join(self, cluster_id: int, text: str, confidence: float, similarity: float,
+              band_keys: List[int]) -> ClusterAssignment:
+        # The most confident member represents the cluster; ties keep the earlier one
+        self._db.execute("UPDATE clusters SET size = size + 1, "
+                         "representative = CASE WHEN ? > confidence THEN ? ELSE representative END, "
+                         "confidence = MAX(confidence, ?) WHERE id = ?",
+                         (confidence, text, confidence, cluster_id))
+        self._index(cluster_id, band_keys)
+        representative = self._db.execute("SELECT representative FROM clusters WHERE id = ?",
+                                          (cluster_id,)).fetchone()[0]
+        return ClusterAssignment(cluster_id, representative, similarity, False)
+
+    def _index(self, cluster_id: int, band_keys: List[int]) -> None:
+        """Point the member's buckets at its cluster, so later variants of it are found too"""
+        self._db.executemany("INSERT OR IGNORE INTO bands (key, cluster_id) VALUES (?, ?)",
+                             [(key, cluster_id) for key in band_keys])
+
+    def add_record(self, record: Dict) -> ClusterAssignment:
+        """Cluster an address dict from process_pdf_for_addresses or batch_extract.py"""
+        return self.add(record['raw'], record['components'].get('postal_code', ''), record['confidence'])
+
+    def add_match(self, match) -> ClusterAssignment:
+        """Cluster an AddressMatch"""
+        return self.add(match.raw_text, match.components.get('postal_code', ''), match.confidence_score)
+
+    def representative(self, cluster_id: int) -> Optional[str]:
+        row = self._db.execute("SELECT representative FROM clusters WHERE id = ?", (cluster_id,)).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, int]:
+        clusters, addresses = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clusters").fetchone()
+        return {'clusters': clusters, 'addresses': addresses}
+
+    def flush(self) -> None:
+        """Commit buffered writes"""
+        if self._db is not None and self._pending_writes:
+            try:
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error writing cluster index: {str(e)}")
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+
+def cluster_addresses(addresses: Iterable, index: Optional[AddressClusterIndex] = None) -> List[ClusterAssignment]:
+    """Cluster AddressMatch objects or address dicts, e.g. those of one document.
+
+    Uses a fresh in-memory index unless one is given.
+    """
+    owned = index is None
+    if owned:
+        index = AddressClusterIndex()
+    try:
+        return [index.add_record(address) if isinstance(address, dict) else index.add_match(address)
+                for address in addresses]
+    finally:
+        if owned:
+            index.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Add near-duplicate cluster ids to batch_extract.py JSONL output")
+    parser.add_argument('input', help="JSONL file written by batch_extract.py")
+    parser.add_argument('-o', '--output', required=True, help="JSONL output with cluster_id and cluster_representative")
+    parser.add_argument('--index', default=':memory:', help="Persistent SQLite cluster index (reused across runs)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="Minimum estimated similarity")
+    args = parser.parse_args(argv)
+
+    with AddressClusterIndex(args.index, args.threshold) as index, \
+            open(args.input, encoding='utf-8') as src, open(args.output, 'w', encoding='utf-8') as out:
+        for line in src:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            assignment = index.add_record(record)
+            record['cluster_id'] = assignment.cluster_id
+            record['cluster_representative'] = assignment.representative
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        stats = index.stats()
+    print(f"{stats['addresses']} addresses in {stats['clusters']} clusters written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""Queryable on-disk index of extracted addresses.
+
+Corpus runs write flat JSONL or CSV, which has to be scanned again for every
+question. AddressIndex keeps address records in a SQLite file instead, with
+B-tree indexes on postal code, city, state and region, and an FTS5 full-text
+index over the raw address text. Every address links back to its source
+document and page:
+
+    with AddressIndex('addresses.db') as index:
+        index.add_records(records, source='filing.pdf')
+        index.search(postal_code='400051')
+        index.documents(postal_code='400051', text='Bandra Kurla Complex', any_of=True)
+
+batch_extract.py fills an index as it runs with --index. A JSONL file written
+by batch_extract.py can be loaded and then queried with
+
+    python address_index.py load addresses.jsonl --index addresses.db
+    python address_index.py query addresses.db --pin 400051 --text "bandra kurla complex" --any --documents
+
+Writes are batched into transactions of commit_every rows. Indexing a source
+again replaces its earlier addresses, so a document re-processed after an
+interrupted run is never counted twice.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from address_table import COMPONENT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Stored per address, in table order: the record fields, then its components
+_RECORD_FIELDS = ['page', 'char_start', 'char_end', 'formatted', 'raw', 'confidence', 'region', 'rule_pack',
+                  'letterhead']
+_FIELDS = _RECORD_FIELDS + COMPONENT_FIELDS
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+    CREATE TABLE IF NOT EXISTS addresses (
+        id INTEGER PRIMARY KEY, source_id INTEGER NOT NULL,
+        page INTEGER, char_start INTEGER, char_end INTEGER, formatted TEXT, raw TEXT NOT NULL,
+        confidence REAL NOT NULL, region TEXT COLLATE NOCASE, rule_pack TEXT, letterhead INTEGER NOT NULL,
+        building TEXT, street TEXT, area TEXT, city TEXT COLLATE NOCASE, state TEXT COLLATE NOCASE,
+        postal_code TEXT);
+    CREATE INDEX IF NOT EXISTS addresses_source ON addresses (source_id);
+    CREATE INDEX IF NOT EXISTS addresses_postal_code ON addresses (postal_code);
+    CREATE INDEX IF NOT EXISTS addresses_city ON addresses (city);
+    CREATE INDEX IF NOT EXISTS addresses_state ON addresses (state);
+    CREATE INDEX IF NOT EXISTS addresses_region ON addresses (region);
+    -- External content table: the text is stored once, in addresses
+    CREATE VIRTUAL TABLE IF NOT EXISTS address_text USING fts5(raw, content='addresses', content_rowid='id');
+    CREATE TRIGGER IF NOT EXISTS addresses_delete AFTER DELETE ON addresses BEGIN
+        INSERT INTO address_text (address_text, rowid, raw) VALUES ('delete', old.id, old.raw);
+    END;
+"""
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def _phrase(text: str) -> str:
+    """FTS5 query for the words of text, in order ("Bandra-Kurla Complex" -> "bandra kurla complex")"""
+    words = _WORD_PATTERN.findall(text)
+    if not words:
+        raise ValueError(f"No words to search for in {text!r}")
+    return '"' + ' '.join(words) + '"'
+
+
+class AddressIndex:
+    """Address records in SQLite, searchable by PIN, city, state, region and text"""
+
+    def __init__(self, db_path: str = ':memory:', commit_every: int = 10_000):
+        self.commit_every = commit_every
+        self._pending_writes = 0
+        # Sources already cleared of earlier addresses by this writer
+        self._source_ids: Dict[str, int] = {}
+
+        self._db = sqlite3.connect(db_path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def __enter__(self) -> 'AddressIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _source_id(self, path: str) -> int:
+        """Id of a source, removing the addresses it had from an earlier run the first time it is seen"""
+        source_id = self._source_ids.get(path)
+        if source_id is None:
+            row = self._db.execute("SELECT id FROM sources WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                source_id = self._db.execute("INSERT INTO sources (path) VALUES (?)", (path,)).lastrowid
+            else:
+                source_id = row[0]
+                self._db.execute("DELETE FROM addresses WHERE source_id = ?", (source_id,))
+            self._source_ids[path] = source_id
+        return source_id
+
+    def add_records(self, records: Iterable[Dict], source: str = '') -> int:
+        """Add record dicts as produced by iter_addresses_from_pdf/_text or batch_extract.py; returns the count.
+
+        A record's own 'source' takes precedence over source.
+        """
+        rows = []
+        for record in records:
+            components = record['components']
+            rows.append((self._source_id(record.get('source', source)),
+                         record.get('page'), record.get('char_start'), record.get('char_end'),
+                         record.get('formatted'), record['raw'], record['confidence'], record['region'],
+                         record.get('rule_pack'), int(record.get('letterhead', False)),
+                         *(components.get(field) for field in COMPONENT_FIELDS)))
+        self._insert(rows)
+        return len(rows)
+
+    def add_matches(self, matches: Iterable, extractor=None, source: str = '') -> int:
+        """Add AddressMatch objects, formatting them with extractor if one is given"""
+        source_id = self._source_id(source)
+        rows = [(source_id, None, match.char_start, match.char_end,
+                 extractor.format_address(match) if extractor is not None else None,
+                 match.raw_text, match.confidence_score, match.region, match.rule_pack, int(match.letterhead),
+                 *(match.components.get(field) for field in COMPONENT_FIELDS))
+                for match in matches]
+        self._insert(rows)
+        return len(rows)
+
+    def _insert(self, rows: List[Tuple]) -> None:
+        if not rows:
+            return
+        self._db.executemany(
+            f"INSERT INTO addresses (source_id, {', '.join(_FIELDS)}) VALUES ({', '.join('?' * (len(_FIELDS) + 1))})",
+            rows)
+        # Inside the write transaction the new rows hold the highest ids. Indexing their
+        # text in one statement is about three times faster than a trigger per row.
+        last = self._db.execute("SELECT MAX(id) FROM addresses").fetchone()[0]
+        self._db.execute("INSERT INTO address_text (rowid, raw) SELECT id, raw FROM addresses WHERE id > ?",
+                         (last - len(rows),))
+        self._pending_writes += len(rows)
+        if self._pending_writes >= self.commit_every:
+            self.flush()
+
+    @staticmethod
+    def _conditions(text: Optional[str], match: Optional[str], postal_code: Optional[str], city: Optional[str],
+                    state: Optional[str], region: Optional[str], source: Optional[str]) -> Tuple[List[str], List]:
+        conditions, params = [], []
+        for column, value in (('postal_code', postal_code), ('city', city), ('state', state), ('region', region)):
+            if value is not None:
+                conditions.append(f"a.{column} = ?")
+                params.append(value)
+        if source is not None:
+            conditions.append("a.source_id = (SELECT id FROM sources WHERE path = ?)")
+            params.append(source)
+        for query in ([_phrase(text)] if text is not None else []) + ([match] if match is not None else []):
+            conditions.append("a.id IN (SELECT rowid FROM address_text WHERE address_text MATCH ?)")
+            params.append(query)
+        return conditions, params
+
+    def _where(self, any_of: bool, **filters) -> Tuple[str, List]:
+        conditions, params = self._conditions(**filters)
+        if not conditions:
+            return '', params
+        return ' WHERE ' + (' OR ' if any_of else ' AND ').join(conditions), params
+
+    def search(self, text: Optional[str] = None, postal_code: Optional[str] = None, city: Optional[str] = None,
+               state: Optional[str] = None, region: Optional[str] = None, source: Optional[str] = None,
+               match: Optional[str] = None, any_of: bool = False, limit: Optional[int] = 100) -> List[Dict]:
+        """Addresses matching every given filter (any of them with any_of), as record dicts with 'source'.
+
+        city, state and region ignore case. text matches its words as a phrase, in
+        the raw address text; match takes a raw FTS5 query (e.g. 'bandra* NOT east').
+        """
+        where, params = self._where(any_of, text=text, match=match, postal_code=postal_code, city=city,
+                                    state=state, region=region, source=source)
+        sql = (f"SELECT s.path, {', '.join('a.' + field for field in _FIELDS)} "
+               f"FROM addresses a JOIN sources s ON s.id = a.source_id{where}")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        records = []
+        for row in self._db.execute(sql, params):
+            record = {'source': row[0], **dict(zip(_RECORD_FIELDS, row[1:]))}
+            record['letterhead'] = bool(record['letterhead'])
+            components = zip(COMPONENT_FIELDS, row[1 + len(_RECORD_FIELDS):])
+            record['components'] = {field: value for field, value in components if value is not None}
+            records.append(record)
+        return records
+
+    def documents(self, text: Optional[str] = None, postal_code: Optional[str] = None, city: Optional[str] = None,
+                  state: Optional[str] = None, region: Optional[str] = None, match: Optional[str] = None,
+                  any_of: bool = False) -> List[Tuple[str, int, List[int]]]:
+        """(source, matching addresses, their pages) for every source with an address matching the filters"""
+        where, params = self._where(any_of, text=text, match=match, postal_code=postal_code, city=city,
+                                    state=state, region=region, source=None)
+        sql = (f"SELECT s.path, COUNT(*), GROUP_CONCAT(DISTINCT a.page) "
+               f"FROM addresses a JOIN sources s ON s.id = a.source_id{where} "
+               f"GROUP BY a.source_id ORDER BY s.path")
+        return [(path, count, sorted(int(page) for page in pages.split(',')) if pages else [])
+                for path, count, pages in self._db.execute(sql, params)]
+
+    def stats(self) -> Dict[str, int]:
+        sources = self._db.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+        addresses = self._db.execute("SELECT COUNT(*) FROM addresses").fetchone()[0]
+        return {'sources': sources, 'addresses': addresses}
+
+    def flush(self) -> None:
+        """Commit buffered writes"""
+        if self._db is not None and self._pending_writes:
+            try:
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error writing address index: {str(e)}")
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+
+def _load(args) -> int:
+    with AddressIndex(args.index) as index, open(args.input, encoding='utf-8') as src:
+        records = (json.loads(line) for line in src if line.strip())
+        # A source repeated further down (e.g. re-emitted after a resumed run) replaces its earlier addresses
+        for source, group in groupby(records, key=lambda record: record.get('source', '')):
+            index._source_ids.pop(source, None)
+            index.add_records(group, source)
+        stats = index.stats()
+    print(f"{stats['addresses']} addresses from {stats['sources']} sources in {args.index}")
+    return 0
+
+
+def _query(args) -> int:
+    filters = {'text': args.text, 'match': args.match, 'postal_code': args.pin, 'city': args.city,
+               'state': args.state, 'region': args.region, 'any_of': args.any}
+    if not os.path.exists(args.index):
+        print(f"No address index at {args.index}", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    with AddressIndex(args.index) as index:
+        try:
+            if args.documents:
+                results = index.documents(**filters)
+            else:
+                results = index.search(source=args.source, limit=args.limit or None, **filters)
+        except (ValueError, sqlite3.OperationalError) as e:
+            print(f"Invalid query: {e}", file=sys.stderr)
+            return 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for result in results:
+        if args.documents:
+            path, count, pages = result
+            print(f"{path}\t{count} addresses\tpages {','.join(map(str, pages))}")
+        else:
+            print(json.dumps(result, ensure_ascii=False))
+    print(f"{len(results)} {'documents' if args.documents else 'addresses'} in {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Indexed address store: load batch_extract.py output and query it")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    load = sub.add_parser('load', help="Add a JSONL file written by batch_extract.py to an index")
+    load.add_argument('input', help="JSONL file written by batch_extract.py")
+    load.add_argument('--index', required=True, help="SQLite index file (created if missing)")
+
+    query = sub.add_parser('query', help="Print matching addresses as JSONL, or the documents containing them")
+    query.add_argument('index', help="SQLite index file")
+    query.add_argument('--pin', help="Postal code")
+    query.add_argument('--city')
+    query.add_argument('--state')
+    query.add_argument('--region')
+    query.add_argument('--text', help="Words that must appear in this order in the address")
+    query.add_argument('--match', help="Raw FTS5 query on the address text")
+    query.add_argument('--source', help="Only addresses from this document")
+    query.add_argument('--any', action='store_true', help="Match any of the filters instead of all of them")
+    query.add_argument('--documents', action='store_true',
+                       help="List the matching documents with their address counts and pages")
+    query.add_argument('--limit', type=int, default=100, help="Maximum addresses to print (0 for all)")
+    args = parser.parse_args(argv)
+
+    return _load(args) if args.command == 'load' else _query(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
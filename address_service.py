@@ -0,0 +1,517 @@
+"""Local asynchronous address extraction service with request micro-batching.
+
+Run it with
+
+    python address_service.py --port 8000 --workers 2
+
+Endpoints:
+
+* ``POST /extract``      JSON ``{"text": "..."}``; returns ``{"addresses": [...]}``
+* ``POST /extract/pdf``  raw PDF bytes as the request body
+* ``GET  /health``       readiness, queue depth and worker count
+
+Text requests that arrive within ``max_wait_ms`` of each other are grouped and
+run through ``extract_addresses_batch`` (one ``nlp.pipe`` call) in one of the
+preloaded worker processes. The queue is bounded: when it is full the HTTP
+server answers 503 with Retry-After instead of letting latency grow without
+limit. PDFs are bounded the same way, and an upload is refused before its body
+is read. The same machinery is available in-process as AsyncAddressExtractor:
+
+    async with AsyncAddressExtractor(workers=2) as service:
+        matches = await service.extract(text)
+
+Only the standard library is used, so the service can be load-tested in CI.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from Working_Parser import AddressMatch, IndianAddressExtractor, iter_addresses_from_pdf
+from pin_directory import PinDirectory
+from result_cache import ResultCache
+from rule_pack import RulePackSource
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 50 * 1024 * 1024
+# Seconds start() waits for every worker to load its model
+STARTUP_TIMEOUT = 120.0
+# Seconds a batch or PDF may run in a worker; a worker that dies never answers at all
+REQUEST_TIMEOUT = 300.0
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+            504: 'Gateway Timeout'}
+
+# Set once per worker process by _init_worker
+_worker_extractor: Optional[IndianAddressExtractor] = None
+_worker_min_confidence = 0.3
+_worker_rule_packs: Optional[RulePackSource] = None
+
+
+class ServiceOverloaded(Exception):
+    """Raised instead of queueing when the request queue is full"""
+
+
+class ServiceStartupError(RuntimeError):
+    """Raised by start() when a worker fails to initialize or is not ready in time"""
+
+
+class RequestTimeout(Exception):
+    """Raised when a worker does not answer within request_timeout, e.g. because it crashed"""
+
+
+class ExtractionError(RuntimeError):
+    """A request's text failed to extract in the worker; answered with 500, never as no addresses"""
+
+
+def _init_worker(min_confidence: float, pin_directory_path: Optional[str] = None,
+                 cache_path: Optional[str] = None, engine: str = 'spacy',
+                 rule_pack_path: Optional[str] = None, ready=None) -> None:
+    """Load the worker's extractor; with a ready queue, report None or the error that stopped it"""
+    global _worker_extractor, _worker_min_confidence, _worker_rule_packs
+    try:
+        pin_directory = PinDirectory.load(pin_directory_path) if pin_directory_path else None
+        cache = ResultCache(db_path=cache_path) if cache_path else None
+        _worker_extractor = IndianAddressExtractor(lazy_ner=True, pin_directory=pin_directory, cache=cache,
+                                                   engine=engine)
+        _worker_min_confidence = min_confidence
+        _worker_rule_packs = RulePackSource(rule_pack_path) if rule_pack_path else None
+    except Exception as e:
+        # The pool replaces a worker whose initializer raises, forever; start() has to be told
+        if ready is not None:
+            ready.put(f"{type(e).__name__}: {str(e)}")
+        raise
+    if ready is not None:
+        ready.put(None)
+
+
+def _extract_batch(texts: List[str]) -> List[Union[List[Tuple[AddressMatch, str]], ExtractionError]]:
+    """Extract every text in one batch; each match is paired with its formatted string.
+
+    A text that fails gets an ExtractionError in place of its matches.
+    """
+    if _worker_rule_packs is not None:
+        _worker_rule_packs.apply(_worker_extractor)
+    try:
+        batches = _worker_extractor.extract_addresses_batch(texts, _worker_min_confidence, return_exceptions=True)
+        return [ExtractionError(f"{type(matches).__name__}: {str(matches)}") if isinstance(matches, Exception)
+                else [(match, _worker_extractor.format_address(match)) for match in matches]
+                for matches in batches]
+    finally:
+        _flush_cache()
+
+
+def _extract_pdf(data: bytes) -> List[Dict]:
+    if _worker_rule_packs is not None:
+        _worker_rule_packs.apply(_worker_extractor)
+    try:
+        return list(iter_addresses_from_pdf(data, _worker_extractor, _worker_min_confidence))
+    finally:
+        _flush_cache()
+
+
+def _flush_cache() -> None:
+    """Write the request's new cache entries, so none are lost if the pool is terminated"""
+    if _worker_extractor.cache is not None:
+        _worker_extractor.cache.flush()
+
+
+def _match_record(match: AddressMatch, formatted: str) -> Dict:
+    return {
+        'formatted': formatted,
+        'raw': match.raw_text,
+        'confidence': match.confidence_score,
+        'region': match.region,
+        'rule_pack': match.rule_pack,
+        'components': match.components,
+        'char_start': match.char_start,
+        'char_end': match.char_end
+    }
+
+
+class AsyncAddressExtractor:
+    """Asyncio front end that micro-batches concurrent requests onto preloaded workers.
+
+    workers=0 runs the extractor in this process on a single background thread.
+    PDFs are not batched; at most max_pdf_queue of them wait for a worker.
+    """
+
+    def __init__(self, workers: int = 1, max_batch: int = 64, max_wait_ms: float = 5.0,
+                 max_queue: int = 1024, min_confidence: float = 0.3,
+                 pin_directory_path: Optional[str] = None, cache_path: Optional[str] = None,
+                 engine: str = 'spacy', rule_pack_path: Optional[str] = None,
+                 max_pdf_queue: int = 16, startup_timeout: float = STARTUP_TIMEOUT,
+                 request_timeout: Optional[float] = REQUEST_TIMEOUT):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.max_pdf_queue = max_pdf_queue
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        # PDF requests accepted and not yet answered
+        self._pdf_pending = 0
+        self._init_args = (min_confidence, pin_directory_path, cache_path, engine, rule_pack_path)
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._pool = None
+        self._thread: Optional[ThreadPoolExecutor] = None
+        self.stats = {'requests': 0, 'batches': 0, 'rejected': 0}
+
+    async def start(self) -> None:
+        """Start the workers and the batching task; returns once every worker has loaded its model.
+
+        Raises ServiceStartupError, with the workers stopped, if one fails to initialize
+        or they are not all ready within startup_timeout seconds.
+        """
+        loop = asyncio.get_running_loop()
+        if self.workers > 0:
+            ready = multiprocessing.Queue()
+            self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                              initargs=self._init_args + (ready,))
+            deadline = loop.time() + self.startup_timeout
+            for _ in range(self.workers):
+                try:
+                    error = await loop.run_in_executor(None, ready.get, True, max(deadline - loop.time(), 0))
+                except queue.Empty:
+                    error = f"workers not ready after {self.startup_timeout:g}s"
+                if error is not None:
+                    await self.close()
+                    raise ServiceStartupError(f"Worker failed to start: {error}")
+        else:
+            self._thread = ThreadPoolExecutor(max_workers=1)
+            await loop.run_in_executor(self._thread, _init_worker, *self._init_args)
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(max(self.workers, 1))
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+    async def close(self) -> None:
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._thread is not None:
+            self._thread.shutdown(wait=False)
+            self._thread = None
+
+    async def __aenter__(self) -> 'AsyncAddressExtractor':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def pdf_pending(self) -> int:
+        """PDF requests accepted and not yet answered"""
+        return self._pdf_pending
+
+    @property
+    def pdf_capacity(self) -> int:
+        """PDF requests accepted at once: one running per worker plus max_pdf_queue waiting"""
+        return max(self.workers, 1) + self.max_pdf_queue
+
+    async def extract(self, text: str, wait: bool = True) -> List[AddressMatch]:
+        """Async equivalent of IndianAddressExtractor.extract_addresses"""
+        return [match for match, _ in await self._enqueue(text, wait)]
+
+    async def extract_records(self, text: str, wait: bool = True) -> List[Dict]:
+        """Like extract, but as JSON-ready dicts that include the formatted address"""
+        return [_match_record(match, formatted) for match, formatted in await self._enqueue(text, wait)]
+
+    async def extract_pdf(self, data: bytes, wait: bool = True) -> List[Dict]:
+        """Async equivalent of iter_addresses_from_pdf for the bytes of a PDF.
+
+        wait=False raises ServiceOverloaded when pdf_capacity requests are already pending.
+        """
+        if not wait and self._pdf_pending >= self.pdf_capacity:
+            self.stats['rejected'] += 1
+            raise ServiceOverloaded(f"{self._pdf_pending} PDF requests already pending")
+        self._pdf_pending += 1
+        self.stats['requests'] += 1
+        try:
+            async with self._slots:
+                return await self._submit(_extract_pdf, data)
+        finally:
+            self._pdf_pending -= 1
+
+    async def _enqueue(self, text: str, wait: bool) -> List[Tuple[AddressMatch, str]]:
+        """Queue one text for the batcher; wait=False raises ServiceOverloaded when full"""
+        future = asyncio.get_running_loop().create_future()
+        if wait:
+            await self._queue.put((text, future))
+        else:
+            try:
+                self._queue.put_nowait((text, future))
+            except asyncio.QueueFull:
+                self.stats['rejected'] += 1
+                raise ServiceOverloaded(f"{self.max_queue} requests already queued")
+        self.stats['requests'] += 1
+        return await future
+
+    async def _submit(self, func, *args):
+        """Run func in a worker and return its result.
+
+        Raises RequestTimeout after request_timeout seconds: Pool.apply_async never
+        calls back when the worker process dies, and the caller's slot must be freed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._pool is None:
+            future = loop.run_in_executor(self._thread, func, *args)
+        else:
+            future = self._apply_async(loop, func, args)
+        try:
+            return await asyncio.wait_for(future, self.request_timeout)
+        except asyncio.TimeoutError:
+            raise RequestTimeout(f"no answer from the worker within {self.request_timeout:g}s")
+
+    def _apply_async(self, loop: asyncio.AbstractEventLoop, func, args: Tuple) -> 'asyncio.Future':
+        """Run func in the pool and return a future for its result"""
+        future = loop.create_future()
+
+        def resolve(result):
+            if not future.done():
+                future.set_result(result)
+
+        def reject(exc):
+            if not future.done():
+                future.set_exception(exc)
+
+        self._pool.apply_async(func, args,
+                               callback=lambda result: loop.call_soon_threadsafe(resolve, result),
+                               error_callback=lambda exc: loop.call_soon_threadsafe(reject, exc))
+        return future
+
+    async def _run_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            # While every worker is busy, requests pile up and make a bigger batch
+            await self._slots.acquire()
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.stats['batches'] += 1
+            asyncio.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[str, 'asyncio.Future']]) -> None:
+        try:
+            results = await self._submit(_extract_batch, [text for text, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            logger.warning(f"Error processing batch of {len(batch)} requests. Error: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+class AddressService:
+    """Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) over AsyncAddressExtractor"""
+
+    def __init__(self, extractor: AsyncAddressExtractor, host: str = '127.0.0.1', port: int = 8000):
+        self.extractor = extractor
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers = set()
+        # PDF uploads whose body is being read; they count against the PDF capacity
+        self._pdf_uploads = 0
+
+    async def start(self) -> None:
+        await self.extractor.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Report the real port when started with port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Address service listening on http://{self.host}:{self.port}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold their handlers open
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.extractor.close()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode('latin-1').split(maxsplit=2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version.strip() == 'HTTP/1.1'
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': f"body exceeds {MAX_BODY_BYTES} bytes"}, False)
+                    break
+                path = path.split('?', 1)[0]
+                is_pdf = method == 'POST' and path == '/extract/pdf'
+                # Refused before the body is read, so a burst of large uploads is not held in memory
+                if is_pdf and self._pdf_uploads + self.extractor.pdf_pending >= self.extractor.pdf_capacity:
+                    self.extractor.stats['rejected'] += 1
+                    await self._respond(writer, 503, {'error': "too many PDF requests pending"}, False,
+                                        {'Retry-After': '1'})
+                    break
+                self._pdf_uploads += is_pdf
+                try:
+                    body = await reader.readexactly(length) if length else b''
+                finally:
+                    self._pdf_uploads -= is_pdf
+
+                status, payload, extra_headers = await self._route(method, path, body)
+                await self._respond(writer, status, payload, keep_alive, extra_headers)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict, Dict[str, str]]:
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': "use GET"}, {}
+            return 200, {'status': 'ok', 'workers': self.extractor.workers, 'queued': self.extractor.queued,
+                         'pdf_pending': self.extractor.pdf_pending, **self.extractor.stats}, {}
+
+        if path not in ('/extract', '/extract/pdf'):
+            return 404, {'error': f"unknown path {path}"}, {}
+        if method != 'POST':
+            return 405, {'error': "use POST"}, {}
+
+        try:
+            if path == '/extract':
+                try:
+                    text = json.loads(body)['text']
+                    if not isinstance(text, str):
+                        raise TypeError("text must be a string")
+                except (ValueError, KeyError, TypeError) as e:
+                    return 400, {'error': f"expected a JSON object with a 'text' string: {str(e)}"}, {}
+                addresses = await self.extractor.extract_records(text, wait=False)
+            else:
+                addresses = await self.extractor.extract_pdf(body, wait=False)
+        except ServiceOverloaded as e:
+            return 503, {'error': str(e)}, {'Retry-After': '1'}
+        except RequestTimeout as e:
+            logger.warning(f"Error handling {path}. Error: {str(e)}")
+            return 504, {'error': str(e)}, {}
+        except Exception as e:
+            logger.warning(f"Error handling {path}. Error: {str(e)}")
+            return 500, {'error': str(e)}, {}
+
+        return 200, {'addresses': addresses}, {}
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool,
+                       extra_headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Length': str(len(body)),
+            'Connection': 'keep-alive' if keep_alive else 'close',
+            **(extra_headers or {}),
+        }
+        head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve Indian address extraction over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="Preloaded worker processes (0 runs in-process on one thread)")
+    parser.add_argument('--max-batch', type=int, default=64, help="Most requests run together in one batch")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="How long a batch waits for more requests before it runs")
+    parser.add_argument('--max-queue', type=int, default=1024, help="Queued requests before answering 503")
+    parser.add_argument('--max-pdf-queue', type=int, default=16,
+                        help="PDF requests waiting for a worker before answering 503")
+    parser.add_argument('--startup-timeout', type=float, default=STARTUP_TIMEOUT,
+                        help="Seconds to wait for the workers to load before giving up")
+    parser.add_argument('--request-timeout', type=float, default=REQUEST_TIMEOUT,
+                        help="Seconds a batch or PDF may take in a worker before the request fails")
+    parser.add_argument('--min-confidence', type=float, default=0.3)
+    parser.add_argument('--pin-directory', help="Compiled PIN directory from pin_directory.py build")
+    parser.add_argument('--cache', help="SQLite block result cache shared by all workers")
+    parser.add_argument('--engine', choices=['spacy', 'regex'], default='spacy')
+    parser.add_argument('--rule-pack', help="Rule pack JSON file, reloaded by the workers when it changes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    extractor = AsyncAddressExtractor(args.workers, args.max_batch, args.max_wait_ms, args.max_queue,
+                                      args.min_confidence, args.pin_directory, args.cache, args.engine,
+                                      args.rule_pack, args.max_pdf_queue, args.startup_timeout,
+                                      args.request_timeout)
+    service = AddressService(extractor, args.host, args.port)
+    try:
+        asyncio.run(service.serve_forever())
+    except ServiceStartupError as e:
+        logger.error(str(e))
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Columnar container for extracted addresses, with Arrow/Parquet and CSV export.
+
+AddressTable keeps one column per field instead of one object per address:
+numeric fields live in typed arrays, source files and regions are dictionary
+encoded, and component strings are shared with the matches they came from.
+Results can be handed to Arrow without building an intermediate dict per row,
+and a JSONL file written by batch_extract.py can be converted with
+
+    python address_table.py addresses.jsonl -o addresses.parquet
+
+pyarrow is only needed for to_arrow() and Parquet output.
+"""
+import argparse
+import csv
+import json
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+COMPONENT_FIELDS = ['building', 'street', 'area', 'city', 'state', 'postal_code']
+CSV_FIELDS = (['source', 'page', 'char_start', 'char_end', 'formatted', 'confidence', 'region', 'rule_pack',
+               'letterhead'] + COMPONENT_FIELDS + ['raw'])
+
+# Stored in the integer columns when a value is unknown; exported as null
+_MISSING = -1
+
+
+class AddressTable:
+    """Append-only table of addresses stored column by column"""
+
+    def __init__(self):
+        self.sources: List[str] = []
+        self.regions: List[str] = []
+        self.rule_packs: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+        self._region_ids: Dict[str, int] = {}
+        self._rule_pack_ids: Dict[str, int] = {}
+
+        self.source_id = array('i')
+        self.region_id = array('i')
+        self.rule_pack_id = array('i')
+        self.page = array('q')
+        self.char_start = array('q')
+        self.char_end = array('q')
+        self.confidence = array('d')
+        self.letterhead = array('b')
+        self.components: Dict[str, List[Optional[str]]] = {field: [] for field in COMPONENT_FIELDS}
+        self.formatted: List[str] = []
+        self.raw: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.confidence)
+
+    @staticmethod
+    def _encode(value: str, ids: Dict[str, int], values: List[str]) -> int:
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, raw: str, components: Dict[str, str], confidence: float, region: str,
+               formatted: str = '', source: str = '', page: Optional[int] = None,
+               char_start: Optional[int] = None, char_end: Optional[int] = None,
+               rule_pack: Optional[str] = None, letterhead: bool = False) -> None:
+        """Add one address"""
+        self.source_id.append(self._encode(source, self._source_ids, self.sources))
+        self.region_id.append(self._encode(region, self._region_ids, self.regions))
+        self.rule_pack_id.append(self._encode(rule_pack or '', self._rule_pack_ids, self.rule_packs))
+        self.page.append(_MISSING if page is None else page)
+        self.char_start.append(_MISSING if char_start is None else char_start)
+        self.char_end.append(_MISSING if char_end is None else char_end)
+        self.confidence.append(confidence)
+        self.letterhead.append(letterhead)
+        for field, column in self.components.items():
+            column.append(components.get(field))
+        self.formatted.append(formatted)
+        self.raw.append(raw)
+
+    def add_matches(self, matches: Iterable, extractor=None, source: str = '') -> None:
+        """Add AddressMatch objects, formatting them with extractor if one is given"""
+        for match in matches:
+            self.append(match.raw_text, match.components, match.confidence_score, match.region,
+                        extractor.format_address(match) if extractor is not None else '',
+                        source, None, match.char_start, match.char_end, match.rule_pack, match.letterhead)
+
+    def add_records(self, records: Iterable[Dict], source: str = '') -> None:
+        """Add record dicts as produced by iter_addresses_from_pdf/_text or batch_extract.py"""
+        for record in records:
+            self.append(record['raw'], record['components'], record['confidence'], record['region'],
+                        record.get('formatted', ''), record.get('source', source), record.get('page'),
+                        record.get('char_start'), record.get('char_end'), record.get('rule_pack'),
+                        record.get('letterhead', False))
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> 'AddressTable':
+        """Load a JSONL file written by batch_extract.py"""
+        table = cls()
+        with open(path, encoding='utf-8') as f:
+            table.add_records(json.loads(line) for line in f if line.strip())
+        return table
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """Yield flat rows in CSV_FIELDS order; None marks a missing value"""
+        def optional(value: int) -> Optional[int]:
+            return None if value == _MISSING else value
+
+        for i in range(len(self)):
+            row = {
+                'source': self.sources[self.source_id[i]],
+                'page': optional(self.page[i]),
+                'char_start': optional(self.char_start[i]),
+                'char_end': optional(self.char_end[i]),
+                'formatted': self.formatted[i],
+                'confidence': self.confidence[i],
+                'region': self.regions[self.region_id[i]],
+                'rule_pack': self.rule_packs[self.rule_pack_id[i]],
+                'letterhead': bool(self.letterhead[i]),
+            }
+            for field in COMPONENT_FIELDS:
+                row[field] = self.components[field][i]
+            row['raw'] = self.raw[i]
+            yield row
+
+    def write_csv(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.iter_rows())
+
+    def to_arrow(self):
+        """Build a pyarrow.Table.
+
+        Numeric columns are wrapped without copying, so this table cannot grow
+        (append raises BufferError) while the Arrow table is alive.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        def numeric(values: array, arrow_type):
+            if sys.byteorder != 'little':
+                return pa.array(values.tolist(), type=arrow_type)
+            return pa.Array.from_buffers(arrow_type, len(values), [None, pa.py_buffer(values)])
+
+        def optional(values: array):
+            column = numeric(values, pa.int64())
+            return pc.if_else(pc.equal(column, _MISSING), pa.scalar(None, pa.int64()), column)
+
+        def dictionary(codes: array, values: List[str]):
+            return pa.DictionaryArray.from_arrays(numeric(codes, pa.int32()), pa.array(values, type=pa.string()))
+
+        columns = {
+            'source': dictionary(self.source_id, self.sources),
+            'page': optional(self.page),
+            'char_start': optional(self.char_start),
+            'char_end': optional(self.char_end),
+            'formatted': pa.array(self.formatted, type=pa.string()),
+            'confidence': numeric(self.confidence, pa.float64()),
+            'region': dictionary(self.region_id, self.regions),
+            'rule_pack': dictionary(self.rule_pack_id, self.rule_packs),
+            'letterhead': pc.not_equal(numeric(self.letterhead, pa.int8()), 0),
+        }
+        for field in COMPONENT_FIELDS:
+            columns[field] = pa.array(self.components[field], type=pa.string())
+        columns['raw'] = pa.array(self.raw, type=pa.string())
+        return pa.table(columns)
+
+    def write_parquet(self, path: str, **kwargs) -> None:
+        """Write a Parquet file; extra keyword arguments go to pyarrow.parquet.write_table"""
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path, **kwargs)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert batch_extract.py JSONL output to Parquet or CSV")
+    parser.add_argument('input', help="JSONL file written by batch_extract.py")
+    parser.add_argument('-o', '--output', required=True, help="Output file (.parquet or .csv)")
+    parser.add_argument('--format', choices=['parquet', 'csv'],
+                        help="Output format (default: from the output file extension)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.output.lower().endswith('.csv') else 'parquet')
+    table = AddressTable.from_jsonl(args.input)
+    if fmt == 'csv':
+        table.write_csv(args.output)
+    else:
+        try:
+            table.write_parquet(args.output)
+        except ImportError:
+            print("Parquet output needs pyarrow (pip install pyarrow)", file=sys.stderr)
+            return 1
+    print(f"Wrote {len(table)} addresses to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
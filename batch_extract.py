@@ -0,0 +1,286 @@
+"""Command-line batch extraction of addresses from a corpus of PDF and text files.
+
+Example:
+    python batch_extract.py filings/ "scans/**/*.pdf" -o addresses.jsonl --workers 8
+
+Each worker process builds one IndianAddressExtractor and reuses it for every
+file it is given. Results are streamed to JSONL or CSV, one record per address.
+Finished files are appended to a manifest, so re-running the same command
+after an interruption skips them and appends to the existing output.
+"""
+import argparse
+import csv
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from Working_Parser import IndianAddressExtractor, iter_addresses_from_pdf, iter_addresses_from_text
+from address_clusters import AddressClusterIndex
+from address_index import AddressIndex
+from address_table import COMPONENT_FIELDS, CSV_FIELDS
+from pin_directory import PinDirectory
+from result_cache import ResultCache
+from rule_pack import RulePackSource
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = {'.pdf', '.txt'}
+# Extra output fields with --cluster-index
+CLUSTER_FIELDS = ['cluster_id', 'cluster_representative']
+
+# Set once per worker process by _init_worker
+_worker_extractor: Optional[IndianAddressExtractor] = None
+_worker_min_confidence = 0.3
+_worker_rule_packs: Optional[RulePackSource] = None
+
+
+def discover_files(inputs: Iterable[str]) -> List[str]:
+    """Expand directories, glob patterns and plain paths into a sorted list of supported files"""
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = (str(p) for p in Path(item).rglob('*'))
+        elif any(ch in item for ch in '*?['):
+            candidates = glob.iglob(item, recursive=True)
+        else:
+            candidates = [item]
+
+        for path in candidates:
+            if os.path.isfile(path) and Path(path).suffix.lower() in SUPPORTED_SUFFIXES:
+                found.add(os.path.abspath(path))
+
+    return sorted(found)
+
+
+def truncate_partial_line(path: str, chunk_size: int = 64 * 1024) -> None:
+    """Cut a file back to its last newline, dropping a line an interrupted run left half written"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - chunk_size)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b'\n')
+            if newline >= 0:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos < end:
+            logger.warning(f"Dropping {end - pos} bytes of an incomplete last line in {path}")
+            f.truncate(pos)
+
+
+def load_manifest(manifest_path: str) -> Set[str]:
+    """Return the set of source files already recorded as finished"""
+    done = set()
+    if not os.path.exists(manifest_path):
+        return done
+
+    with open(manifest_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A partially written last line from an interrupted run
+                continue
+            done.add(entry['source'])
+    return done
+
+
+def _init_worker(min_confidence: float, pin_directory_path: Optional[str] = None,
+                 cache_path: Optional[str] = None, engine: str = 'spacy',
+                 rule_pack_path: Optional[str] = None) -> None:
+    global _worker_extractor, _worker_min_confidence, _worker_rule_packs
+    pin_directory = PinDirectory.load(pin_directory_path) if pin_directory_path else None
+    cache = ResultCache(db_path=cache_path) if cache_path else None
+    _worker_extractor = IndianAddressExtractor(lazy_ner=True, pin_directory=pin_directory, cache=cache,
+                                               engine=engine)
+    _worker_min_confidence = min_confidence
+    _worker_rule_packs = RulePackSource(rule_pack_path) if rule_pack_path else None
+
+
+def _process_file(path: str) -> Tuple[str, List[Dict], Optional[str]]:
+    """Extract address records from one file using this worker's extractor"""
+    try:
+        if _worker_rule_packs is not None:
+            _worker_rule_packs.apply(_worker_extractor)
+        if Path(path).suffix.lower() == '.pdf':
+            records = list(iter_addresses_from_pdf(path, _worker_extractor, _worker_min_confidence))
+        else:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                text = f.read()
+            records = list(iter_addresses_from_text(text, _worker_extractor, _worker_min_confidence))
+        if _worker_extractor.cache is not None:
+            _worker_extractor.cache.flush()
+        return path, records, None
+
+    except Exception as e:
+        return path, [], str(e)
+
+
+class RecordWriter:
+    """Append address records to a JSONL or CSV file"""
+
+    def __init__(self, output_path: str, fmt: str, clustered: bool = False):
+        self.fmt = fmt
+        self.clustered = clustered
+        # Appending after a half-written record would corrupt the next one too
+        truncate_partial_line(output_path)
+        is_new = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self.file = open(output_path, 'a', encoding='utf-8', newline='')
+        if fmt == 'csv':
+            fieldnames = CSV_FIELDS + CLUSTER_FIELDS if clustered else CSV_FIELDS
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=fieldnames)
+            if is_new:
+                self.csv_writer.writeheader()
+
+    def write(self, source: str, records: List[Dict]) -> None:
+        for record in records:
+            if self.fmt == 'csv':
+                row = {
+                    'source': source,
+                    'page': record['page'],
+                    'char_start': record['char_start'],
+                    'char_end': record['char_end'],
+                    'formatted': record['formatted'],
+                    'confidence': record['confidence'],
+                    'region': record['region'],
+                    'rule_pack': record['rule_pack'],
+                    'letterhead': record['letterhead'],
+                    'raw': record['raw'],
+                }
+                for field in COMPONENT_FIELDS:
+                    row[field] = record['components'].get(field, '')
+                if self.clustered:
+                    for field in CLUSTER_FIELDS:
+                        row[field] = record[field]
+                self.csv_writer.writerow(row)
+            else:
+                self.file.write(json.dumps({'source': source, **record}, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def run(files: List[str], output_path: str, manifest_path: str, fmt: str = 'jsonl',
+        workers: int = 1, min_confidence: float = 0.3,
+        pin_directory_path: Optional[str] = None, cache_path: Optional[str] = None,
+        engine: str = 'spacy', cluster_index_path: Optional[str] = None,
+        rule_pack_path: Optional[str] = None, index_path: Optional[str] = None) -> Dict[str, int]:
+    """Process files not yet in the manifest and return counts of files and addresses.
+
+    With cluster_index_path every record also gets a near-duplicate cluster id and
+    representative from that (persistent) index, shared across runs. With
+    rule_pack_path workers use that rule pack, reloading it when the file changes.
+    With index_path the records are also added to that queryable AddressIndex.
+    """
+    done = load_manifest(manifest_path)
+    pending = [path for path in files if path not in done]
+    stats = {'skipped': len(files) - len(pending), 'processed': 0, 'failed': 0, 'addresses': 0}
+    logger.info(f"{len(pending)} files to process, {stats['skipped']} already done")
+
+    if not pending:
+        return stats
+
+    writer = RecordWriter(output_path, fmt, clustered=cluster_index_path is not None)
+    cluster_index = AddressClusterIndex(cluster_index_path) if cluster_index_path else None
+    address_index = AddressIndex(index_path) if index_path else None
+    pool = None
+    try:
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                        initargs=(min_confidence, pin_directory_path, cache_path, engine,
+                                                  rule_pack_path))
+            results = pool.imap_unordered(_process_file, pending)
+        else:
+            _init_worker(min_confidence, pin_directory_path, cache_path, engine, rule_pack_path)
+            results = map(_process_file, pending)
+
+        truncate_partial_line(manifest_path)
+        with open(manifest_path, 'a', encoding='utf-8') as manifest:
+            for path, records, error in results:
+                if error:
+                    # Not recorded in the manifest, so the file is retried on the next run
+                    logger.warning(f"Error processing {path}: {error}")
+                    stats['failed'] += 1
+                    continue
+
+                if cluster_index is not None:
+                    for record in records:
+                        assignment = cluster_index.add_record(record)
+                        record['cluster_id'] = assignment.cluster_id
+                        record['cluster_representative'] = assignment.representative
+                    cluster_index.flush()
+
+                if address_index is not None:
+                    address_index.add_records(records, path)
+                    address_index.flush()
+
+                # Output first, then the manifest entry: an interruption between the
+                # two can only re-emit this one file on resume, never lose it.
+                writer.write(path, records)
+                manifest.write(json.dumps({'source': path, 'addresses': len(records)}) + '\n')
+                manifest.flush()
+
+                stats['processed'] += 1
+                stats['addresses'] += len(records)
+
+        if pool:
+            pool.close()
+            pool.join()
+    finally:
+        if pool:
+            pool.terminate()
+        writer.close()
+        if cluster_index is not None:
+            cluster_index.close()
+        if address_index is not None:
+            address_index.close()
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract Indian addresses from a corpus of PDF and text files")
+    parser.add_argument('inputs', nargs='+', help="Files, directories or glob patterns")
+    parser.add_argument('-o', '--output', required=True, help="Output file (.jsonl or .csv)")
+    parser.add_argument('--format', choices=['jsonl', 'csv'],
+                        help="Output format (default: from the output file extension)")
+    parser.add_argument('--manifest', help="Checkpoint manifest (default: <output>.manifest)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument('--min-confidence', type=float, default=0.3)
+    parser.add_argument('--pin-directory', help="Compiled PIN directory from pin_directory.py build")
+    parser.add_argument('--cache', help="SQLite block result cache shared by all workers")
+    parser.add_argument('--engine', choices=['spacy', 'regex'], default='spacy',
+                        help="'regex' skips spaCy entirely (no NER city fallback)")
+    parser.add_argument('--cluster-index', help="SQLite near-duplicate cluster index (created if missing)")
+    parser.add_argument('--rule-pack', help="Rule pack JSON file, reloaded by the workers when it changes")
+    parser.add_argument('--index', help="SQLite address index to add the records to (see address_index.py)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+    manifest_path = args.manifest or args.output + '.manifest'
+
+    files = discover_files(args.inputs)
+    if not files:
+        print("No PDF or text files found", file=sys.stderr)
+        return 1
+
+    stats = run(files, args.output, manifest_path, fmt, args.workers, args.min_confidence,
+                args.pin_directory, args.cache, args.engine, args.cluster_index, args.rule_pack, args.index)
+    print(f"Processed {stats['processed']} files ({stats['skipped']} skipped, {stats['failed']} failed), "
+          f"{stats['addresses']} addresses written to {args.output}")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""City/state name lookup benchmark: exact gazetteer scan vs fuzzy index vs brute force.
+
+Builds a seeded set of place-name queries (exact names, aliases and misspellings
+with one or two edits) with their canonical answers, and measures for each
+lookup path how many queries per second it answers and how many it resolves
+correctly or wrongly. Some queries are real towns missing from the gazetteer
+("Kannur", "Nagaur"), whose only right answer is none, so "resolved_wrongly"
+also counts false corrections to a similar name. Prints one JSON object, e.g.
+
+    python benchmarks/bench_places.py --queries 20000 > places.json
+
+* exact: the gazetteer scan (known names and aliases only)
+* fuzzy: FuzzyPlaceIndex.lookup, cold (empty memo) and warm
+* brute_force: edit distance against every name, the scan the index avoids
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fuzzy_places import MIN_FUZZY_LENGTH, TWO_EDIT_LENGTH, FuzzyPlaceIndex, edit_distance  # noqa: E402
+from gazetteer import Gazetteer  # noqa: E402
+
+# Real towns that are not gazetteer names, several of them an edit or two from one
+# (Kannur/Kanpur, Nagaur/Nagpur); resolving them to anything is a false correction
+OTHER_TOWNS = [
+    "Kannur", "Nagaur", "Rajpur", "Rampur", "Karnal", "Nadiad", "Panipat", "Mathura", "Kottayam",
+    "Jalgaon", "Kolhapur", "Amravati", "Bhilwara", "Guntur", "Sangli", "Satara", "Tirupati",
+    "Bhilai", "Hassan", "Mandya", "Ambala", "Solapur", "Bikaner", "Darbhanga",
+]
+# Share of the queries drawn from OTHER_TOWNS
+OTHER_TOWN_SHARE = 0.1
+
+
+def _misspell(rnd: random.Random, name: str, edits: int) -> str:
+    """name with edits random deletions, insertions, substitutions or transpositions, keeping the first letter"""
+    word = name
+    for _ in range(edits):
+        i = rnd.randrange(1, len(word))
+        op = rnd.choice('dist')
+        if op == 'd':
+            word = word[:i] + word[i + 1:]
+        elif op == 'i':
+            word = word[:i] + rnd.choice(string.ascii_lowercase) + word[i:]
+        elif op == 's':
+            word = word[:i] + rnd.choice(string.ascii_lowercase) + word[i + 1:]
+        elif i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def make_queries(gazetteer: Gazetteer, n: int, seed: int = 42) -> List[Tuple[str, str, Optional[str]]]:
+    """(query, kind, canonical name) triples: a third exact names, the rest misspelled;
+    OTHER_TOWN_SHARE of them are towns outside the gazetteer, with no canonical name"""
+    rnd = random.Random(seed)
+    names = sorted({(key, entry.kind, entry.name) for key, entries in gazetteer.entries.items()
+                    for entry in entries if entry.kind in ('city', 'state')})
+    others = [town for town in OTHER_TOWNS if town.lower() not in gazetteer.entries]
+    queries = []
+    while len(queries) < n:
+        if rnd.random() < OTHER_TOWN_SHARE:
+            queries.append((rnd.choice(others), 'city', None))
+            continue
+        key, kind, canonical = rnd.choice(names)
+        query = key.title()
+        roll = rnd.random()
+        if roll > 1 / 3 and len(key) >= MIN_FUZZY_LENGTH:
+            query = _misspell(rnd, query, 2 if roll > 0.8 and len(key) >= TWO_EDIT_LENGTH else 1)
+        queries.append((query, kind, canonical))
+    return queries
+
+
+def _score(answers: List[Optional[Tuple]], queries: List[Tuple[str, str, Optional[str]]]) -> Dict[str, float]:
+    correct = wrong = false_corrections = 0
+    for entries, (_, kind, canonical) in zip(answers, queries):
+        if not entries:
+            continue
+        if any(entry.kind == kind and entry.name == canonical for entry in entries):
+            correct += 1
+        else:
+            wrong += 1
+            false_corrections += canonical is None
+    others = sum(canonical is None for _, _, canonical in queries)
+    return {'resolved_correctly': correct / len(queries), 'resolved_wrongly': wrong / len(queries),
+            'other_towns_resolved': false_corrections / others if others else 0.0}
+
+
+def _timed(queries: List[Tuple[str, str, Optional[str]]], lookup: Callable[[str], Optional[Tuple]]) -> Dict:
+    start = time.perf_counter()
+    answers = [lookup(query) for query, _, _ in queries]
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'lookups_per_s': len(queries) / elapsed, **_score(answers, queries)}
+
+
+def measure(n_queries: int = 20000, seed: int = 42, brute_force_queries: int = 2000) -> Dict:
+    gazetteer = Gazetteer()
+    queries = make_queries(gazetteer, n_queries, seed)
+
+    def exact(query: str) -> Optional[Tuple]:
+        hits = gazetteer.scan(query)
+        return next((hit.entries for hit in hits if hit.start == 0 and hit.end == len(query)), None)
+
+    index = FuzzyPlaceIndex(gazetteer)
+    names = list(index.names)
+
+    def brute_force(query: str) -> Optional[Tuple]:
+        word = query.lower()
+        distances = [(edit_distance(word, key, 2), key) for key in names]
+        best = min(distances)
+        return index.names[best[1]] if best[0] <= 2 else None
+
+    report = {'queries': n_queries, 'seed': seed, 'names': len(names),
+              'exact': _timed(queries, exact),
+              'fuzzy_cold': _timed(queries, index.lookup),
+              'fuzzy_warm': _timed(queries, index.lookup)}
+    sample = queries[:brute_force_queries]
+    report['brute_force'] = {'queries': len(sample), **_timed(sample, brute_force)}
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--brute-force-queries', type=int, default=2000,
+                        help="Queries for the (slow) brute-force baseline")
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.queries, args.seed, args.brute_force_queries), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
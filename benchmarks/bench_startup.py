@@ -0,0 +1,64 @@
+"""Cold-start benchmark for importing Working_Parser and constructing IndianAddressExtractor.
+
+Every sample runs in a fresh interpreter so that import and model-load caches do
+not carry over. Prints one JSON object, e.g.
+
+    python benchmarks/bench_startup.py --repeat 5 > startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter and prints its timings as JSON
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import Working_Parser
+t1 = time.perf_counter()
+extractor = Working_Parser.IndianAddressExtractor(lazy_ner={lazy_ner}, engine={engine!r})
+t2 = time.perf_counter()
+extractor.extract_addresses("Plot No 5, MIDC, Andheri (E), Mumbai 400093")
+t3 = time.perf_counter()
+print(json.dumps({{"import_s": t1 - t0, "construct_s": t2 - t1, "first_call_s": t3 - t2}}))
+"""
+
+
+def measure(lazy_ner: bool, repeat: int, engine: str = 'spacy') -> dict:
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _CHILD.format(lazy_ner=lazy_ner, engine=engine)],
+                             cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    result = {}
+    for key in samples[0]:
+        values = [s[key] for s in samples]
+        result[key] = {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+    result['total_median_s'] = statistics.median(sum(s.values()) for s in samples)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per configuration")
+    parser.add_argument('--engine', choices=['spacy', 'regex'], default='spacy',
+                        help="'regex' measures the spaCy-free engine only")
+    args = parser.parse_args(argv)
+
+    report = {'python': sys.version.split()[0], 'repeat': args.repeat, 'engine': args.engine}
+    if args.engine == 'regex':
+        report['regex'] = measure(False, args.repeat, 'regex')
+    else:
+        report['full_pipeline'] = measure(False, args.repeat)
+        report['lazy_ner'] = measure(True, args.repeat)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""Throughput, latency, memory and accuracy benchmark on a synthetic corpus.
+
+Runs offline on the seeded corpus from synthetic_corpus.py and prints one JSON
+report. Save a report from a known-good build and compare later runs against
+it to catch regressions:
+
+    python benchmarks/bench_suite.py -o baseline.json
+    python benchmarks/bench_suite.py --compare baseline.json --tolerance 0.15
+
+With --compare the exit status is 1 when any tracked metric is worse than the
+baseline by more than the tolerance (accuracy metrics by more than 0.01). It is
+also 1 whenever an adversarial block takes longer than --adversarial-ceiling.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_corpus import make_address, make_adversarial_blocks, make_corpus, write_pdf  # noqa: E402
+
+# Dotted report keys checked by --compare, and whether higher or lower is better
+TRACKED_METRICS = {
+    'segmentation.blocks_per_s': 'higher',
+    'components.blocks_per_s': 'higher',
+    'extract.blocks_per_s': 'higher',
+    'extract.latency_ms.p50': 'lower',
+    'extract.latency_ms.p99': 'lower',
+    'batch.blocks_per_s': 'higher',
+    'pdf.pages_per_s': 'higher',
+    'pdf_letterhead.skip_repeated.pages_per_s': 'higher',
+    'adversarial.max_block_s': 'lower',
+    'places.fuzzy_cold.lookups_per_s': 'higher',
+    'peak_rss_mb': 'lower',
+    'cold_start.total_median_s': 'lower',
+    'accuracy.text.precision': 'accuracy',
+    'accuracy.text.recall': 'accuracy',
+    'accuracy.pdf.precision': 'accuracy',
+    'accuracy.pdf.recall': 'accuracy',
+}
+ACCURACY_TOLERANCE = 0.01
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    """Fastest wall time of repeat calls"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def score(predicted: List[List[Dict[str, str]]], truth: List[List[Dict[str, str]]]) -> Dict[str, float]:
+    """Precision/recall of extracted addresses, matched to ground truth by PIN code within a document.
+
+    City, state and region accuracy are measured over the matched addresses.
+    """
+    tp = fp = fn = 0
+    correct = {'city': 0, 'state': 0, 'region': 0}
+    for doc_predicted, doc_truth in zip(predicted, truth):
+        unmatched = list(doc_truth)
+        for prediction in doc_predicted:
+            pin = prediction.get('postal_code', '').replace(' ', '')
+            match = next((t for t in unmatched if t['postal_code'] == pin), None)
+            if match is None:
+                fp += 1
+                continue
+            unmatched.remove(match)
+            tp += 1
+            for key in correct:
+                correct[key] += prediction.get(key, '').lower() == match[key].lower()
+        fn += len(unmatched)
+
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    result = {
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'true_positives': tp, 'false_positives': fp, 'false_negatives': fn,
+    }
+    for key, count in correct.items():
+        result[f'{key}_accuracy'] = count / tp if tp else 0.0
+    return result
+
+
+def run_suite(args) -> Dict:
+    from Working_Parser import IndianAddressExtractor, iter_addresses_from_pdf
+
+    construct_start = time.perf_counter()
+    extractor = IndianAddressExtractor(lazy_ner=args.lazy_ner, engine=args.engine)
+    report = {
+        'python': sys.version.split()[0],
+        'config': {'docs': args.docs, 'pdfs': args.pdfs, 'seed': args.seed, 'repeat': args.repeat,
+                   'engine': args.engine, 'lazy_ner': args.lazy_ner},
+        'construct_s': time.perf_counter() - construct_start,
+    }
+
+    documents = make_corpus(args.docs, args.seed)
+    texts = [doc.text for doc in documents]
+    truth = [[vars(a) for a in doc.addresses] for doc in documents]
+
+    # Segmentation and component extraction on their own
+    blocks = [block for text in texts for block in extractor._extract_address_block(text)]
+    elapsed = best_of(args.repeat, lambda: [extractor._extract_address_block(text) for text in texts])
+    report['segmentation'] = {'blocks': len(blocks), 'seconds': elapsed, 'blocks_per_s': len(blocks) / elapsed}
+    elapsed = best_of(args.repeat, lambda: [extractor._extract_components(block) for block in blocks])
+    report['components'] = {'blocks': len(blocks), 'seconds': elapsed, 'blocks_per_s': len(blocks) / elapsed}
+
+    # End to end, one document at a time
+    latencies, predicted = [], []
+    for text in texts:
+        start = time.perf_counter()
+        matches = extractor.extract_addresses(text)
+        latencies.append(time.perf_counter() - start)
+        predicted.append([{**m.components, 'region': m.region} for m in matches])
+    total = sum(latencies)
+    report['extract'] = {
+        'docs': len(texts), 'blocks': len(blocks), 'seconds': total,
+        'docs_per_s': len(texts) / total, 'blocks_per_s': len(blocks) / total,
+        'latency_ms': {'p50': percentile(latencies, 0.5) * 1000, 'p99': percentile(latencies, 0.99) * 1000,
+                       'max': max(latencies) * 1000, 'mean': statistics.mean(latencies) * 1000},
+    }
+    report['accuracy'] = {'text': score(predicted, truth)}
+
+    elapsed = best_of(args.repeat, lambda: extractor.extract_addresses_batch(texts))
+    report['batch'] = {'blocks': len(blocks), 'seconds': elapsed, 'blocks_per_s': len(blocks) / elapsed}
+
+    # Multi-page PDFs, streamed the way process_pdf_for_addresses does (model already loaded)
+    if args.pdfs:
+        pdf_docs = make_corpus(args.pdfs * args.docs_per_pdf, args.seed + 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths, pdf_truth, pages = [], [], 0
+            for i in range(args.pdfs):
+                chunk = pdf_docs[i * args.docs_per_pdf:(i + 1) * args.docs_per_pdf]
+                path = os.path.join(tmp, f'synthetic_{i}.pdf')
+                pages += write_pdf(chunk, path)
+                paths.append(path)
+                pdf_truth.append([vars(a) for doc in chunk for a in doc.addresses])
+
+            pdf_latencies, pdf_predicted = [], []
+            for path in paths:
+                start = time.perf_counter()
+                records = list(iter_addresses_from_pdf(path, extractor))
+                pdf_latencies.append(time.perf_counter() - start)
+                pdf_predicted.append([{**r['components'], 'region': r['region']} for r in records])
+
+            # The first PDF's documents under a letterhead and page number printed on every page
+            path = os.path.join(tmp, 'letterhead.pdf')
+            letterhead_pages = write_pdf(pdf_docs[:args.docs_per_pdf], path,
+                                         letterhead=make_address(random.Random(args.seed)))
+            report['pdf_letterhead'] = {'pages': letterhead_pages}
+            for mode, skip_repeated in (('parse_every_page', False), ('skip_repeated', True)):
+                run = lambda: list(iter_addresses_from_pdf(path, extractor, skip_repeated=skip_repeated))
+                elapsed = best_of(args.repeat, run)
+                with extractor.profile() as metrics:
+                    records = run()
+                stages = metrics.snapshot()['stages']
+                report['pdf_letterhead'][mode] = {
+                    'seconds': elapsed, 'pages_per_s': letterhead_pages / elapsed, 'addresses': len(records),
+                    'component_calls': stages.get('components', {}).get('calls', 0)}
+
+        total = sum(pdf_latencies)
+        report['pdf'] = {'files': len(paths), 'pages': pages, 'seconds': total, 'pages_per_s': pages / total,
+                         'latency_ms': {'p50': percentile(pdf_latencies, 0.5) * 1000,
+                                        'max': max(pdf_latencies) * 1000}}
+        report['accuracy']['pdf'] = score(pdf_predicted, pdf_truth)
+
+    # Long separator-free blocks; each must finish well under the ceiling
+    timings = [best_of(1, lambda: extractor._extract_components(block))
+               for block in make_adversarial_blocks(seed=args.seed)]
+    report['adversarial'] = {'blocks': len(timings), 'max_block_s': max(timings), 'ceiling_s': args.adversarial_ceiling,
+                             'within_ceiling': max(timings) <= args.adversarial_ceiling}
+
+    # City/state name lookups (exact scan vs fuzzy index), see bench_places.py
+    from bench_places import measure as measure_places
+    report['places'] = measure_places(seed=args.seed, brute_force_queries=200)
+
+    report['peak_rss_mb'] = peak_rss_mb()
+
+    if args.cold_start_repeat:
+        from bench_startup import measure
+        report['cold_start'] = measure(args.lazy_ner, args.cold_start_repeat, args.engine)
+    return report
+
+
+def _lookup(report: Dict, dotted: str):
+    value = report
+    for key in dotted.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Describe every tracked metric that regressed beyond the tolerance"""
+    regressions = []
+    for metric, better in TRACKED_METRICS.items():
+        current, previous = _lookup(report, metric), _lookup(baseline, metric)
+        if current is None or previous is None:
+            continue
+        if better == 'accuracy':
+            worse = current < previous - ACCURACY_TOLERANCE
+        elif better == 'higher':
+            worse = current < previous * (1 - tolerance)
+        else:
+            worse = current > previous * (1 + tolerance)
+        if worse:
+            regressions.append(f"{metric}: {previous:.4g} -> {current:.4g}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=300, help="Synthetic text documents")
+    parser.add_argument('--pdfs', type=int, default=3, help="Synthetic multi-page PDFs")
+    parser.add_argument('--docs-per-pdf', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per throughput measurement (best is kept)")
+    parser.add_argument('--engine', choices=['spacy', 'regex'], default='spacy')
+    parser.add_argument('--lazy-ner', action='store_true')
+    parser.add_argument('--cold-start-repeat', type=int, default=3,
+                        help="Fresh interpreters for the cold-start measurement (0 skips it)")
+    parser.add_argument('--adversarial-ceiling', type=float, default=1.0,
+                        help="Seconds allowed for any single adversarial block")
+    parser.add_argument('-o', '--output', help="Also write the report to this file")
+    parser.add_argument('--compare', help="Baseline report to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Allowed relative slowdown before a metric counts as a regression")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+    regressions = []
+    if not report['adversarial']['within_ceiling']:
+        regressions.append(f"adversarial.max_block_s: {report['adversarial']['max_block_s']:.3f}s "
+                           f"exceeds the {args.adversarial_ceiling}s ceiling")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('config') != report['config']:
+            print(f"warning: baseline was run with {baseline.get('config')}", file=sys.stderr)
+        regressions.extend(compare(report, baseline, args.tolerance))
+
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Seeded generator of synthetic Indian-address documents with ground truth.
+
+Documents mix addresses from every region with legal-boilerplate noise, in the
+layouts seen in filings: single-line, wrapped over two or three lines, PIN
+codes written as "400 001", state on its own line. The same seed always gives
+the same corpus, so benchmark and accuracy numbers are comparable across runs.
+
+    python benchmarks/synthetic_corpus.py --docs 200 --pdfs 5 -o corpus/
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+# (region, city, state, 3-digit PIN prefix); prefixes agree with the bundled PIN directory
+LOCATIONS = [
+    ('north_india', 'New Delhi', 'Delhi', 110), ('north_india', 'Gurgaon', 'Haryana', 122),
+    ('north_india', 'Noida', 'Uttar Pradesh', 201), ('north_india', 'Chandigarh', 'Chandigarh', 160),
+    ('north_india', 'Lucknow', 'Uttar Pradesh', 226), ('north_india', 'Kanpur', 'Uttar Pradesh', 208),
+    ('north_india', 'Varanasi', 'Uttar Pradesh', 221), ('north_india', 'Dehradun', 'Uttarakhand', 248),
+    ('north_india', 'Shimla', 'Himachal Pradesh', 171), ('north_india', 'Jammu', 'Jammu and Kashmir', 180),
+    ('north_india', 'Agra', 'Uttar Pradesh', 282), ('north_india', 'Ludhiana', 'Punjab', 141),
+    ('north_india', 'Amritsar', 'Punjab', 143),
+    ('south_india', 'Bangalore', 'Karnataka', 560), ('south_india', 'Chennai', 'Tamil Nadu', 600),
+    ('south_india', 'Hyderabad', 'Telangana', 500), ('south_india', 'Kochi', 'Kerala', 682),
+    ('south_india', 'Thiruvananthapuram', 'Kerala', 695), ('south_india', 'Mysuru', 'Karnataka', 570),
+    ('south_india', 'Coimbatore', 'Tamil Nadu', 641), ('south_india', 'Madurai', 'Tamil Nadu', 625),
+    ('south_india', 'Visakhapatnam', 'Andhra Pradesh', 530), ('south_india', 'Vijayawada', 'Andhra Pradesh', 520),
+    ('south_india', 'Mangalore', 'Karnataka', 575),
+    ('west_india', 'Mumbai', 'Maharashtra', 400), ('west_india', 'Pune', 'Maharashtra', 411),
+    ('west_india', 'Ahmedabad', 'Gujarat', 380), ('west_india', 'Vadodara', 'Gujarat', 390),
+    ('west_india', 'Panaji', 'Goa', 403), ('west_india', 'Jaipur', 'Rajasthan', 302),
+    ('west_india', 'Nagpur', 'Maharashtra', 440), ('west_india', 'Nashik', 'Maharashtra', 422),
+    ('west_india', 'Surat', 'Gujarat', 395), ('west_india', 'Rajkot', 'Gujarat', 360),
+    ('west_india', 'Jodhpur', 'Rajasthan', 342), ('west_india', 'Udaipur', 'Rajasthan', 313),
+    ('east_india', 'Kolkata', 'West Bengal', 700), ('east_india', 'Bhubaneswar', 'Odisha', 751),
+    ('east_india', 'Patna', 'Bihar', 800), ('east_india', 'Guwahati', 'Assam', 781),
+    ('east_india', 'Gangtok', 'Sikkim', 737), ('east_india', 'Shillong', 'Meghalaya', 793),
+    ('east_india', 'Agartala', 'Tripura', 799), ('east_india', 'Imphal', 'Manipur', 795),
+    ('east_india', 'Cuttack', 'Odisha', 753), ('east_india', 'Siliguri', 'West Bengal', 734),
+]
+
+REGION_TERMS = {
+    'north_india': ['Nagar', 'Vihar', 'Kunj', 'Puram', 'Chowk', 'Bazaar'],
+    'south_india': ['Layout', 'Colony', 'Nagar', 'Halli', 'Circle', 'Main'],
+    'west_india': ['Society', 'Wadi', 'Pada', 'Heights', 'Apartment', 'Villa'],
+    'east_india': ['Sarani', 'Para', 'Bagan', 'Path', 'Lane', 'Tola'],
+}
+
+NAMES = ['Ashoka', 'Prestige', 'Shanti', 'Ganga', 'Lotus', 'Crystal', 'Sai', 'Laxmi', 'Sunrise', 'Orchid',
+         'Kailash', 'Meghdoot', 'Nilgiri', 'Everest', 'Tulsi', 'Kaveri', 'Sagar', 'Himalaya', 'Vasant', 'Kamala']
+BUILDING_SUFFIXES = ['Towers', 'Chambers', 'Plaza', 'Complex', 'House', 'Bhavan', 'Building', 'Arcade', 'Centre']
+STREET_NAMES = ['MG', 'Station', 'Park', 'Lake View', 'Nehru', 'Gandhi', 'Residency', 'Church', 'Temple',
+                'Ring', 'Link', 'Hill', 'Mall', 'Civil Lines', 'Rajaji']
+STREET_SUFFIXES = ['Road', 'Street', 'Marg', 'Lane', 'Avenue', 'Salai']
+MARKERS = ['Registered Office:', 'Corporate Office:', 'Head Office:', 'Branch Office:', 'Address:',
+           'Plant:', 'Regional Office:', 'Office:']
+
+BOILERPLATE = [
+    "Pursuant to Section 149 of the Companies Act, 2013 the Board has appointed an Independent Director.",
+    "The decision of the tribunal shall be final and binding on all the parties to the proceedings.",
+    "Notice is hereby given that the Annual General Meeting will be held through video conferencing.",
+    "The Company shall indemnify the Trustee against all losses arising out of this Agreement.",
+    "This agreement shall be governed by and construed in accordance with the laws of India.",
+    "Members are requested to intimate changes, if any, in their registered email addresses.",
+    "The authorised share capital of the Company is Rs. 10,00,00,000 divided into equity shares.",
+    "Dates fixed for hearing are 12, March and 3, April, subject to the availability of the Bench.",
+    "CIN: L17110MH1973PLC019786 Tel: 022 2278 5000 Fax: 022 2278 5185",
+    "The Auditors have issued an unmodified opinion on the financial statements for the year.",
+    "Any dispute arising under this deed shall be referred to arbitration by a sole arbitrator.",
+    "Invoice no 452118 dated 14.02.2023 for an amount of Rs. 4,500 has been paid in full.",
+]
+
+
+@dataclass
+class TruthAddress:
+    """Ground truth for one generated address"""
+    text: str
+    postal_code: str
+    city: str
+    state: str
+    region: str
+
+
+@dataclass
+class SyntheticDocument:
+    text: str
+    addresses: List[TruthAddress] = field(default_factory=list)
+
+
+def _pin(rnd: random.Random, prefix: int) -> str:
+    return f"{prefix}{rnd.randint(1, 99):03d}"
+
+
+def _ordinal(n: int) -> str:
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+
+def make_address(rnd: random.Random) -> TruthAddress:
+    """One address in a randomly chosen layout"""
+    region, city, state, prefix = rnd.choice(LOCATIONS)
+    pin = _pin(rnd, prefix)
+    number = rnd.randint(1, 450)
+    building = f"{rnd.choice(NAMES)} {rnd.choice(BUILDING_SUFFIXES)}"
+    street = f"{rnd.choice(STREET_NAMES)} {rnd.choice(STREET_SUFFIXES)}"
+    area = f"{rnd.choice(NAMES)} {rnd.choice(REGION_TERMS[region])}"
+    marker = rnd.choice(MARKERS)
+    spaced_pin = f"{pin[:3]} {pin[3:]}"
+
+    layouts = [
+        f"{marker} {number}, {building}, {street}, {area}, {city} - {pin}",
+        f"{marker}\n{number}, {building}, {street},\n{area}, {city} {pin}\n{state}",
+        f"Plot No {number}, Sector {rnd.randint(1, 60)}, {area},\n{city}, {state} {pin}",
+        f"{number}/{rnd.randint(1, 20)}, {street}, {area}, {city} - {spaced_pin}",
+        f"Door No {number}, {building},\n{_ordinal(rnd.randint(1, 12))} Cross, {area}, {city} {pin}",
+        f"{_ordinal(rnd.randint(1, 14))} Floor, {building}, {street}, {city} {pin}, {state}",
+    ]
+    return TruthAddress(rnd.choice(layouts), pin, city, state, region)
+
+
+def make_document(rnd: random.Random, min_addresses: int = 1, max_addresses: int = 6,
+                  noise_ratio: float = 2.0) -> SyntheticDocument:
+    """Addresses interleaved with boilerplate paragraphs, separated by blank lines"""
+    addresses = [make_address(rnd) for _ in range(rnd.randint(min_addresses, max_addresses))]
+    paragraphs = [address.text for address in addresses]
+    for _ in range(int(len(addresses) * noise_ratio)):
+        sentences = rnd.sample(BOILERPLATE, rnd.randint(1, 3))
+        paragraphs.insert(rnd.randint(0, len(paragraphs)), ' '.join(sentences))
+    return SyntheticDocument('\n\n'.join(paragraphs), addresses)
+
+
+def make_corpus(n_docs: int, seed: int = 42) -> List[SyntheticDocument]:
+    rnd = random.Random(seed)
+    return [make_document(rnd) for _ in range(n_docs)]
+
+
+def make_adversarial_blocks(sizes: Tuple[int, ...] = (4_000, 16_000, 64_000), seed: int = 42) -> List[str]:
+    """Long separator-free blocks, like de-hyphenated PDF paragraphs, that punish backtracking"""
+    rnd = random.Random(seed)
+    words = [w.strip('.,:').lower() for sentence in BOILERPLATE for w in sentence.split()]
+    blocks = []
+    for size in sizes:
+        # Suffix keywords with no separators in between, and plain runs with no keyword at all
+        keyword_run = ' '.join(rnd.choice(words + STREET_SUFFIXES + BUILDING_SUFFIXES)
+                               for _ in range(size // 6))[:size]
+        plain_run = ('a ' * size)[:size]
+        blocks.extend([keyword_run, plain_run])
+    return blocks
+
+
+def write_pdf(documents: List[SyntheticDocument], path: str, lines_per_page: int = 60,
+              letterhead: Optional[TruthAddress] = None) -> int:
+    """Lay the documents out as a multi-page PDF; returns the page count.
+
+    With a letterhead, every page also gets it in the header and a "Page n of N"
+    footer, as in company filings.
+    """
+    import fitz  # PyMuPDF
+
+    lines = '\n\n'.join(doc.text for doc in documents).split('\n')
+    starts = range(0, len(lines), lines_per_page)
+    with fitz.open() as pdf:
+        for number, start in enumerate(starts, 1):
+            page = pdf.new_page()
+            body_top = 50
+            if letterhead is not None:
+                page.insert_text((50, 30), f"Registered Office: {letterhead.text}", fontsize=7)
+                page.insert_text((50, page.rect.height - 30), f"Page {number} of {len(starts)}", fontsize=7)
+                body_top = 130
+            page.insert_text((50, body_top), '\n'.join(lines[start:start + lines_per_page]), fontsize=8)
+        pdf.save(path)
+        return pdf.page_count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic address corpus with ground truth")
+    parser.add_argument('-o', '--output', required=True, help="Output directory")
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--pdfs', type=int, default=0, help="Also write this many multi-page PDFs")
+    parser.add_argument('--docs-per-pdf', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    documents = make_corpus(args.docs, args.seed)
+    with open(os.path.join(args.output, 'truth.jsonl'), 'w', encoding='utf-8') as truth:
+        for i, doc in enumerate(documents):
+            name = f"doc_{i:05d}.txt"
+            with open(os.path.join(args.output, name), 'w', encoding='utf-8') as f:
+                f.write(doc.text)
+            truth.write(json.dumps({'source': name, 'addresses': [asdict(a) for a in doc.addresses]}) + '\n')
+
+        pdf_docs = make_corpus(args.pdfs * args.docs_per_pdf, args.seed + 1)
+        for i in range(args.pdfs):
+            chunk = pdf_docs[i * args.docs_per_pdf:(i + 1) * args.docs_per_pdf]
+            name = f"pdf_{i:03d}.pdf"
+            write_pdf(chunk, os.path.join(args.output, name))
+            addresses = [asdict(a) for doc in chunk for a in doc.addresses]
+            truth.write(json.dumps({'source': name, 'addresses': addresses}) + '\n')
+
+    print(f"Wrote {args.docs} documents and {args.pdfs} PDFs to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
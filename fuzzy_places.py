@@ -0,0 +1,155 @@
+"""Fuzzy lookup of city and state names, for misspellings and OCR errors.
+
+A SymSpell-style index: every gazetteer name is stored under all the strings
+obtained by deleting up to max_distance characters from it. A token is looked
+up by generating its own deletions, so candidates come from a few dict lookups
+and only those candidates are checked with an edit distance; the gazetteer is
+never scanned:
+
+    index = FuzzyPlaceIndex(Gazetteer.default())
+    index.lookup("Mumbal")      # (GazetteerEntry('city', 'Mumbai', 'west_india'),)
+    index.lookup("Banglore")    # Bangalore
+
+Historical names and spelling variants ("Bombay", "Bengaluru") are exact
+gazetteer names already (see CITY_ALIASES); this index handles what is left.
+To keep ordinary words from turning into places, names shorter than
+MIN_FUZZY_LENGTH are exact-only, long names allow two edits, and a match must
+keep the first letter and be the single closest name. A word that extends a
+name ("Punjabi", "Bengali") is derived from it, not a misspelling of it.
+"""
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from gazetteer import Gazetteer, GazetteerEntry, GazetteerHit
+
+# Shorter names (and tokens) are only matched exactly
+MIN_FUZZY_LENGTH = 6
+# Names at least this long may be two edits away
+TWO_EDIT_LENGTH = 9
+DEFAULT_MAX_DISTANCE = 2
+# Memoized lookups kept per index before the memo is reset
+_MAX_MEMO = 100_000
+
+_WORD_PATTERN = re.compile(r'[A-Za-z]+')
+_PLACE_KINDS = ('city', 'state')
+
+
+def _allowed_distance(length: int, max_distance: int) -> int:
+    if length < MIN_FUZZY_LENGTH:
+        return 0
+    return min(max_distance, 2 if length >= TWO_EDIT_LENGTH else 1)
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """word with every combination of up to distance characters removed"""
+    found = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count as one), or limit + 1 if larger"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyPlaceIndex:
+    """Deletion index over the city and state names of a gazetteer"""
+
+    def __init__(self, gazetteer: Gazetteer, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.gazetteer = gazetteer
+        self.max_distance = max_distance
+        # Lowercased name -> its city/state entries
+        self.names: Dict[str, Tuple[GazetteerEntry, ...]] = {}
+        for key, entries in gazetteer.entries.items():
+            places = tuple(entry for entry in entries if entry.kind in _PLACE_KINDS)
+            if places:
+                self.names[key] = places
+        self.max_words = max((key.count(' ') + 1 for key in self.names), default=1)
+        self.max_length = max(map(len, self.names), default=0) + max_distance
+        # Words repeat across blocks far more than they vary, so lookups are memoized
+        self._memo: Dict[str, Optional[Tuple[GazetteerEntry, ...]]] = {}
+
+        self._deletions: Dict[str, List[str]] = {}
+        for key in self.names:
+            for deletion in _deletes(key, _allowed_distance(len(key), max_distance)):
+                self._deletions.setdefault(deletion, []).append(key)
+
+    def lookup(self, token: str) -> Optional[Tuple[GazetteerEntry, ...]]:
+        """Entries of the closest name to token, or None if there is none or several equally close"""
+        word = token.lower()
+        if word in self.names:
+            return self.names[word]
+        if word in self._memo:
+            return self._memo[word]
+        if len(self._memo) >= _MAX_MEMO:
+            self._memo = {}
+        entries = self._memo[word] = self._closest(word)
+        return entries
+
+    def _closest(self, word: str) -> Optional[Tuple[GazetteerEntry, ...]]:
+        distance = _allowed_distance(len(word), self.max_distance)
+        if distance == 0 or len(word) > self.max_length:
+            return None
+
+        best_distance, best = distance + 1, set()
+        for deletion in _deletes(word, distance):
+            for key in self._deletions.get(deletion, ()):
+                if key[0] != word[0] or key in best or word.startswith(key):
+                    continue
+                limit = min(distance, _allowed_distance(len(key), self.max_distance))
+                d = edit_distance(word, key, limit)
+                if d > limit or d > best_distance:
+                    continue
+                if d < best_distance:
+                    best_distance, best = d, set()
+                best.add(key)
+        if not best:
+            return None
+        # Several names at the same distance are fine only if they mean the same places
+        if len({self.names[key] for key in best}) > 1:
+            return None
+        return self.names[min(best)]
+
+    def resolve(self, text: str, hits: List[GazetteerHit]) -> Tuple[Optional[str], Optional[str]]:
+        """Canonical (city, state) named in text, from its exact gazetteer hits or, failing
+        that, from capitalized words (and runs of words) that are close to a known name"""
+        found = {'city': None, 'state': None}
+        for hit in hits:
+            for entry in hit.entries:
+                if entry.kind in found and found[entry.kind] is None:
+                    found[entry.kind] = entry.name
+        if (found['city'] is None or found['state'] is None) and self.max_distance > 0:
+            covered = [(hit.start, hit.end) for hit in hits]
+            words = [m for m in _WORD_PATTERN.finditer(text)
+                     if m.group()[0].isupper() and not any(s < m.end() and m.start() < e for s, e in covered)]
+            for i, first in enumerate(words):
+                for n in range(1, self.max_words + 1):
+                    run = words[i:i + n]
+                    if len(run) < n or (n > 1 and text[run[-2].end():run[-1].start()] != ' '):
+                        break
+                    name = text[first.start():run[-1].end()]
+                    if len(name) < MIN_FUZZY_LENGTH:
+                        continue
+                    for entry in self.lookup(name) or ():
+                        if found[entry.kind] is None:
+                            found[entry.kind] = entry.name
+                if found['city'] is not None and found['state'] is not None:
+                    break
+        return found['city'], found['state']
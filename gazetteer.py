@@ -0,0 +1,322 @@
+"""Place-name gazetteer: states, cities and regional locality terms.
+
+All place data used by the extractor lives here. The names are compiled once
+into a trie, and the trie is rendered as a single regular expression, so a
+scan walks it in C rather than trying each name in turn:
+
+    hits = Gazetteer.default().scan("12 MG Road, Rajajinagar, Bangalore 560010")
+    # [GazetteerHit(start=12, end=...), ...] for 'rajajinagar' (term) and 'bangalore' (city)
+
+Names match whole words. Regional terms such as "nagar" or "halli" may also end
+a longer word, since they are often fused into locality names ("Rajajinagar",
+"Bommanahalli"). Region lookups for a state or city value are dict lookups.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+REGIONAL_INFO = {
+    'north_india': {
+        'states': ['Delhi', 'Haryana', 'Punjab', 'Uttar Pradesh', 'Uttarakhand', 'Himachal Pradesh', 'Jammu and Kashmir', 'Leh', 'Ladakh'],
+        'cities': ['Delhi', 'New Delhi', 'Gurgaon', 'Noida', 'Chandigarh', 'Lucknow', 'Kanpur', 'Varanasi', 'Prayagraj',
+                  'Dehradun', 'Shimla', 'Srinagar', 'Jammu', 'Leh', 'Agra', 'Meerut', 'Ludhiana', 'Amritsar'],
+        'terms': ['chowk', 'bazaar', 'gali', 'mohalla', 'nagar', 'vihar', 'kunj', 'puram']
+    },
+    'south_india': {
+        'states': ['Karnataka', 'Tamil Nadu', 'Kerala', 'Andhra Pradesh', 'Telangana', 'Puducherry'],
+        'cities': ['Bangalore', 'Chennai', 'Hyderabad', 'Kochi', 'Thiruvananthapuram', 'Mysuru', 'Coimbatore',
+                  'Madurai', 'Visakhapatnam', 'Vijayawada', 'Mangalore', 'Kozhikode', 'Thrissur', 'Warangal'],
+        'terms': ['main', 'cross', 'circle', 'nilaya', 'halli', 'nagar', 'colony', 'layout']
+    },
+    'west_india': {
+        'states': ['Maharashtra', 'Gujarat', 'Goa', 'Rajasthan'],
+        'cities': ['Mumbai', 'Pune', 'Ahmedabad', 'Vadodara', 'Panaji', 'Jaipur', 'Nagpur', 'Nashik',
+                  'Surat', 'Rajkot', 'Margao', 'Jodhpur', 'Udaipur', 'Thane', 'Navi Mumbai', 'Borivali'],
+        'terms': ['society', 'pada', 'wadi', 'chawl', 'villa', 'apartment', 'heights', 'towers']
+    },
+    'east_india': {
+        'states': ['West Bengal', 'Odisha', 'Bihar', 'Assam', 'Sikkim', 'Meghalaya', 'Tripura',
+                  'Manipur', 'Nagaland', 'Arunachal Pradesh', 'Mizoram'],
+        'cities': ['Kolkata', 'Bhubaneswar', 'Patna', 'Guwahati', 'Gangtok', 'Shillong', 'Agartala',
+                  'Imphal', 'Kohima', 'Itanagar', 'Aizawl', 'Cuttack', 'Siliguri'],
+        'terms': ['para', 'sarani', 'bagan', 'ghat', 'tola', 'chowk', 'path', 'lane']
+    }
+}
+# Order in which regions win when a block has hits for several
+REGIONS = list(REGIONAL_INFO)
+
+# Terms that also count as the end of a longer word
+SUFFIX_TERMS = {'nagar', 'vihar', 'kunj', 'puram', 'halli', 'pada', 'wadi', 'bagan', 'ghat', 'tola', 'para'}
+
+# Canonical state name -> names and abbreviations used for it
+STATE_VARIANTS = {
+    "Maharashtra": ["Maharashtra", "MH", "Maha"],
+    "Delhi": ["Delhi", "New Delhi", "NCR", "DL", "National Capital Territory"],
+    "Karnataka": ["Karnataka", "KA", "Kar"],
+    "Tamil Nadu": ["Tamil Nadu", "Tamilnadu", "TN"],
+    "West Bengal": ["West Bengal", "WB", "Bengal"],
+    "Uttar Pradesh": ["Uttar Pradesh", "UP", "U.P.", "Purvanchal"],
+    "Gujarat": ["Gujarat", "GJ"],
+    "Rajasthan": ["Rajasthan", "RJ"],
+    "Madhya Pradesh": ["Madhya Pradesh", "MP", "M.P."],
+    "Andhra Pradesh": ["Andhra Pradesh", "AP"],
+    "Telangana": ["Telangana", "TG", "TS"],
+    "Bihar": ["Bihar", "BR"],
+    "Punjab": ["Punjab", "PB"],
+    "Haryana": ["Haryana", "HR"],
+    "Odisha": ["Odisha", "Orissa", "OD"],
+    "Kerala": ["Kerala", "KL"],
+    "Jharkhand": ["Jharkhand", "JH"],
+    "Assam": ["Assam", "AS"],
+    "Chhattisgarh": ["Chhattisgarh", "CG", "C.G."],
+    "Goa": ["Goa", "GA"],
+    "Puducherry": ["Puducherry", "Pondicherry", "PY"]
+}
+
+# Canonical city name -> historical names and spellings found in addresses
+CITY_ALIASES = {
+    "Mumbai": ["Bombay"],
+    "Bangalore": ["Bengaluru", "Bangaluru"],
+    "Kolkata": ["Calcutta"],
+    "Chennai": ["Madras"],
+    "Gurgaon": ["Gurugram"],
+    "Pune": ["Poona"],
+    "Vadodara": ["Baroda"],
+    "Thiruvananthapuram": ["Trivandrum"],
+    "Kochi": ["Cochin"],
+    "Mysuru": ["Mysore"],
+    "Mangalore": ["Mangaluru"],
+    "Kozhikode": ["Calicut"],
+    "Thrissur": ["Trichur"],
+    "Visakhapatnam": ["Vizag", "Vishakhapatnam"],
+    "Prayagraj": ["Allahabad"],
+    "Varanasi": ["Banaras", "Benares"],
+    "Panaji": ["Panjim"],
+    "Shimla": ["Simla"],
+    "Nashik": ["Nasik"],
+    "Margao": ["Madgaon"],
+    "Guwahati": ["Gauhati"],
+    "Vijayawada": ["Bezawada"],
+}
+
+# State of every gazetteer (and component-stage) city, used to check a city against a state or PIN code
+CITY_STATES = {
+    "Bandra": "Maharashtra",
+    "Delhi": "Delhi", "New Delhi": "Delhi", "Gurgaon": "Haryana", "Noida": "Uttar Pradesh",
+    "Chandigarh": "Chandigarh", "Lucknow": "Uttar Pradesh", "Kanpur": "Uttar Pradesh",
+    "Varanasi": "Uttar Pradesh", "Prayagraj": "Uttar Pradesh", "Dehradun": "Uttarakhand",
+    "Shimla": "Himachal Pradesh", "Srinagar": "Jammu and Kashmir", "Jammu": "Jammu and Kashmir",
+    "Leh": "Ladakh", "Agra": "Uttar Pradesh", "Meerut": "Uttar Pradesh", "Ludhiana": "Punjab",
+    "Amritsar": "Punjab",
+    "Bangalore": "Karnataka", "Chennai": "Tamil Nadu", "Hyderabad": "Telangana", "Kochi": "Kerala",
+    "Thiruvananthapuram": "Kerala", "Mysuru": "Karnataka", "Coimbatore": "Tamil Nadu",
+    "Madurai": "Tamil Nadu", "Visakhapatnam": "Andhra Pradesh", "Vijayawada": "Andhra Pradesh",
+    "Mangalore": "Karnataka", "Kozhikode": "Kerala", "Thrissur": "Kerala", "Warangal": "Telangana",
+    "Mumbai": "Maharashtra", "Pune": "Maharashtra", "Ahmedabad": "Gujarat", "Vadodara": "Gujarat",
+    "Panaji": "Goa", "Jaipur": "Rajasthan", "Nagpur": "Maharashtra", "Nashik": "Maharashtra",
+    "Surat": "Gujarat", "Rajkot": "Gujarat", "Margao": "Goa", "Jodhpur": "Rajasthan",
+    "Udaipur": "Rajasthan", "Thane": "Maharashtra", "Navi Mumbai": "Maharashtra", "Borivali": "Maharashtra",
+    "Kolkata": "West Bengal", "Bhubaneswar": "Odisha", "Patna": "Bihar", "Guwahati": "Assam",
+    "Gangtok": "Sikkim", "Shillong": "Meghalaya", "Agartala": "Tripura", "Imphal": "Manipur",
+    "Kohima": "Nagaland", "Itanagar": "Arunachal Pradesh", "Aizawl": "Mizoram", "Cuttack": "Odisha",
+    "Siliguri": "West Bengal",
+    "Bhopal": "Madhya Pradesh", "Indore": "Madhya Pradesh",
+}
+
+MAJOR_CITIES = [
+    "Mumbai", "Pune", "Delhi", "Bangalore", "Chennai", "Hyderabad",
+    "Kolkata", "Ahmedabad", "Jaipur", "Lucknow", "Surat", "Bhopal",
+    "Indore", "Nagpur", "Visakhapatnam", "Patna", "Chandigarh",
+    "Coimbatore", "Thane", "Vadodara", "Ludhiana", "Agra", "Nashik"
+]
+
+# Names the component stage takes as the city, in two tiers: a hit from the first
+# tier anywhere in the block beats one from the second
+COMPONENT_CITY_TIERS = [
+    ['Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune', 'Ahmedabad', 'Surat',
+     'Jaipur', 'Bandra', 'Washington', 'New York'],
+    # U.S.A. with any of the dots left out
+    [f'U{a}S{b}A{c}' for a in ('.', '') for b in ('.', '') for c in ('.', '')],
+]
+
+# Abbreviations shorter than this are too ambiguous to find in running text
+_MIN_STATE_VARIANT_LENGTH = 4
+
+# Memoized region lookups kept per gazetteer before the memo is reset
+_MAX_MEMO = 100_000
+
+
+class GazetteerEntry(NamedTuple):
+    kind: str  # 'state', 'city', 'term' or 'component_city'
+    name: str  # Canonical name (the state for a state variant)
+    region: Optional[str]
+    tier: int = 0  # Component city tier
+
+
+class GazetteerHit(NamedTuple):
+    start: int
+    end: int
+    entries: Tuple[GazetteerEntry, ...]
+
+
+def _trie_pattern(keys: List[str]) -> str:
+    """Regex source matching any key, longest first, laid out as a trie"""
+    trie: Dict = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def render(node: Dict) -> str:
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy: the longer key is tried first, the shorter one if the boundary check fails
+        return f'(?:{body})?' if '' in node else body
+
+    return render(trie)
+
+
+class Gazetteer:
+    """States, cities and regional terms compiled into one trie pattern"""
+
+    def __init__(self, regional_info: Dict = REGIONAL_INFO, state_variants: Dict = STATE_VARIANTS,
+                 major_cities: List[str] = MAJOR_CITIES, component_city_tiers: List[List[str]] = COMPONENT_CITY_TIERS,
+                 city_aliases: Dict = CITY_ALIASES, city_states: Dict = CITY_STATES):
+        self.regions = list(regional_info)
+        region_of_state = {}
+        entries: Dict[str, List[GazetteerEntry]] = {}
+
+        def add(name: str, entry: GazetteerEntry) -> None:
+            bucket = entries.setdefault(name.lower(), [])
+            if entry not in bucket:
+                bucket.append(entry)
+
+        for region, info in regional_info.items():
+            for state in info['states']:
+                add(state, GazetteerEntry('state', state, region))
+                region_of_state.setdefault(state, region)
+            for city in info['cities']:
+                add(city, GazetteerEntry('city', city, region))
+            for term in info['terms']:
+                add(term, GazetteerEntry('term', term, region))
+        for state, variants in state_variants.items():
+            for variant in variants:
+                if len(variant) >= _MIN_STATE_VARIANT_LENGTH:
+                    add(variant, GazetteerEntry('state', state, region_of_state.get(state)))
+        for city in major_cities:
+            if not any(entry.kind == 'city' for entry in entries.get(city.lower(), [])):
+                add(city, GazetteerEntry('city', city, None))
+        for city, aliases in city_aliases.items():
+            region = next((e.region for e in entries.get(city.lower(), []) if e.kind == 'city'), None)
+            for alias in aliases:
+                add(alias, GazetteerEntry('city', city, region))
+        for tier, names in enumerate(component_city_tiers):
+            for name in names:
+                add(name, GazetteerEntry('component_city', name, None, tier))
+
+        self.entries = {key: tuple(bucket) for key, bucket in entries.items()}
+        suffix_keys = [key for key, bucket in self.entries.items()
+                       if all(e.kind == 'term' and e.name in SUFFIX_TERMS for e in bucket)]
+        word_keys = [key for key in self.entries if key not in suffix_keys]
+        # Group 1: the longest whole-word key at each word start, as a lookahead so
+        # names inside a longer one ("delhi" in "new delhi") are found too.
+        # Group 2: a suffix term ending a word, anywhere.
+        self.pattern = re.compile(r'\b(?=(' + _trie_pattern(word_keys) + r')\b)|(' + _trie_pattern(suffix_keys) + r')\b')
+        # (text, hits) of the latest scan; the component and region stages scan the same block
+        self._last_scan: Tuple[str, List[GazetteerHit]] = ('', [])
+
+        # Region of each (kind, lowercased name) seen by region_of()
+        self._regions: Dict[Tuple[str, str], Optional[str]] = {}
+        for key, bucket in self.entries.items():
+            for entry in bucket:
+                if entry.kind in ('state', 'city') and entry.region:
+                    self._regions.setdefault((entry.kind, entry.name.lower()), entry.region)
+        self._base_regions = dict(self._regions)
+        self._city_states = {city.lower(): state for city, state in city_states.items()}
+
+    @classmethod
+    def default(cls) -> 'Gazetteer':
+        """Gazetteer built from the bundled place data"""
+        global _default
+        if _default is None:
+            _default = cls()
+        return _default
+
+    def scan(self, text: str) -> List[GazetteerHit]:
+        """Every gazetteer name in text, in order of position, in one pass"""
+        last_text, last_hits = self._last_scan
+        if text == last_text:
+            return last_hits
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to two; keep offsets aligned with text
+            lowered = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+        hits = []
+        entries = self.entries
+        for match in self.pattern.finditer(lowered):
+            start, end = match.span(1) if match.lastindex == 1 else match.span(2)
+            hits.append(GazetteerHit(start, end, entries[lowered[start:end]]))
+        self._last_scan = (text, hits)
+        return hits
+
+    @staticmethod
+    def component_city(text: str, hits: List[GazetteerHit]) -> Optional[str]:
+        """Text of the city the component stage takes: the first hit of the best tier"""
+        best = None
+        for hit in hits:
+            for entry in hit.entries:
+                if entry.kind == 'component_city' and (best is None or entry.tier < best[0]):
+                    best = (entry.tier, hit)
+        return text[best[1].start:best[1].end] if best else None
+
+    @staticmethod
+    def has_place(hits: List[GazetteerHit]) -> bool:
+        """Whether any hit is a known state or city"""
+        return any(entry.kind in ('state', 'city') for hit in hits for entry in hit.entries)
+
+    def _first_region(self, hits: List[GazetteerHit], kinds: Tuple[str, ...]) -> Optional[str]:
+        found = {entry.region for hit in hits for entry in hit.entries if entry.kind in kinds and entry.region}
+        return next((region for region in self.regions if region in found), None)
+
+    def region_of(self, kind: str, value: str) -> Optional[str]:
+        """Region of a state or city value.
+
+        Known names are a dict lookup; other values (e.g. "NCT of Delhi") are scanned
+        once for known names of that kind and the answer is memoized.
+        """
+        key = (kind, value.lower())
+        if key in self._regions:
+            return self._regions[key]
+        if len(self._regions) >= len(self._base_regions) + _MAX_MEMO:
+            self._regions = dict(self._base_regions)
+        region = self._regions[key] = self._first_region(self.scan(value), (kind,))
+        return region
+
+    @staticmethod
+    def place_names(hits: List[GazetteerHit], kind: str) -> List[str]:
+        """Canonical names of the 'city' or 'state' hits, in order of position"""
+        return [entry.name for hit in hits for entry in hit.entries if entry.kind == kind]
+
+    def canonical_state(self, value: str) -> str:
+        """Canonical name of a state value ("Orissa" -> "Odisha"); unknown values are returned as they are"""
+        entry = next((e for e in self.entries.get(value.lower(), ()) if e.kind == 'state'), None)
+        return entry.name if entry else value
+
+    def state_of_city(self, city: str) -> Optional[str]:
+        """State of a canonical city name, or None if unknown"""
+        return self._city_states.get(city.lower())
+
+    def region_of_terms(self, hits: List[GazetteerHit]) -> Optional[str]:
+        """First region (in REGIONS order) with a regional term among the hits"""
+        return self._first_region(hits, ('term',))
+
+    def names(self, kind: str) -> List[str]:
+        """Canonical names of one kind"""
+        return sorted({entry.name for bucket in self.entries.values() for entry in bucket if entry.kind == kind})
+
+
+_default: Optional[Gazetteer] = None
@@ -0,0 +1,212 @@
+"""Bulk normalization of a CSV or Parquet column holding one address per row.
+
+Example:
+    python normalize_table.py customers.parquet -o customers_parsed.parquet --column address --workers 8
+
+Rows are already segmented, so each value is parsed as a single block: no
+block segmentation, and the component, confidence and region stages run over
+whole chunks of rows (one nlp.pipe call per chunk for rows needing NER). The
+input is read chunk by chunk and at most a few chunks per worker are in flight,
+so memory stays bounded whatever the file size. The output keeps every input
+column, in the same row order, and adds the normalized columns below (empty
+when a row does not score as an address). A row that fails to parse, e.g. on
+an unexpected value, is left empty and counted as an error; the rest of its
+chunk is unaffected.
+
+Parquet input and output need pyarrow.
+"""
+import argparse
+import csv
+import logging
+import multiprocessing
+import os
+import sys
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Working_Parser import IndianAddressExtractor
+from address_table import COMPONENT_FIELDS
+from pin_directory import PinDirectory
+from result_cache import ResultCache
+from rule_pack import RulePackSource
+
+logger = logging.getLogger(__name__)
+
+NORMALIZED_FIELDS = ['formatted', 'confidence', 'region'] + COMPONENT_FIELDS + ['rule_pack']
+DEFAULT_CHUNK_SIZE = 10000
+# Chunks submitted per worker before waiting for the oldest one
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Set once per worker process by _init_worker
+_worker_extractor: Optional[IndianAddressExtractor] = None
+_worker_min_confidence = 0.3
+_worker_rule_packs: Optional[RulePackSource] = None
+
+
+def _init_worker(min_confidence: float, pin_directory_path: Optional[str] = None,
+                 cache_path: Optional[str] = None, engine: str = 'spacy',
+                 rule_pack_path: Optional[str] = None) -> None:
+    global _worker_extractor, _worker_min_confidence, _worker_rule_packs
+    pin_directory = PinDirectory.load(pin_directory_path) if pin_directory_path else None
+    cache = ResultCache(db_path=cache_path) if cache_path else None
+    _worker_extractor = IndianAddressExtractor(lazy_ner=True, pin_directory=pin_directory, cache=cache,
+                                               engine=engine)
+    _worker_min_confidence = min_confidence
+    _worker_rule_packs = RulePackSource(rule_pack_path) if rule_pack_path else None
+
+
+def _normalize_chunk(addresses: List[object]) -> Tuple[List[Optional[Tuple]], int]:
+    """Normalized values (in NORMALIZED_FIELDS order) per address, or None for non-addresses
+    and rows that failed, plus the number of failed rows"""
+    if _worker_rule_packs is not None:
+        _worker_rule_packs.apply(_worker_extractor)
+    matches = _worker_extractor.normalize_addresses(addresses, _worker_min_confidence, return_exceptions=True)
+    if _worker_extractor.cache is not None:
+        _worker_extractor.cache.flush()
+
+    rows = []
+    errors = 0
+    for match in matches:
+        if match is None or isinstance(match, Exception):
+            errors += match is not None
+            rows.append(None)
+            continue
+        rows.append((_worker_extractor.format_address(match), match.confidence_score, match.region,
+                     *(match.components.get(field) or None for field in COMPONENT_FIELDS), match.rule_pack))
+    return rows, errors
+
+
+def _ordered_results(chunks: Iterable[Tuple[List[object], object]], workers: int,
+                     init_args: Tuple) -> Iterator[Tuple[object, Tuple[List[Optional[Tuple]], int]]]:
+    """Yield (payload, (normalized rows, failed rows)) per chunk, in input order.
+
+    Unlike Pool.imap, which reads its whole input ahead, only a bounded number
+    of chunks are read and submitted ahead of the one being written.
+    """
+    if workers <= 1:
+        _init_worker(*init_args)
+        for addresses, payload in chunks:
+            yield payload, _normalize_chunk(addresses)
+        return
+
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=init_args)
+    try:
+        pending = deque()
+        for addresses, payload in chunks:
+            pending.append((payload, pool.apply_async(_normalize_chunk, (addresses,))))
+            if len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                payload, result = pending.popleft()
+                yield payload, result.get()
+        while pending:
+            payload, result = pending.popleft()
+            yield payload, result.get()
+        pool.close()
+        pool.join()
+    finally:
+        pool.terminate()
+
+
+def _iter_csv_chunks(reader: csv.DictReader, column: str,
+                     chunk_size: int) -> Iterator[Tuple[List[Optional[str]], List[Dict]]]:
+    chunk = []
+    for row in reader:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield [row[column] for row in chunk], chunk
+            chunk = []
+    if chunk:
+        yield [row[column] for row in chunk], chunk
+
+
+def normalize_csv(input_path: str, output_path: str, column: str = 'address',
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+                  init_args: Tuple = (0.3,)) -> Dict[str, int]:
+    stats = {'rows': 0, 'addresses': 0, 'errors': 0}
+    with open(input_path, encoding='utf-8', newline='') as src, \
+            open(output_path, 'w', encoding='utf-8', newline='') as dst:
+        reader = csv.DictReader(src)
+        if column not in (reader.fieldnames or []):
+            raise ValueError(f"Column '{column}' not found in {input_path}")
+        # Input columns named like a normalized field are replaced by it
+        fieldnames = [name for name in reader.fieldnames if name not in NORMALIZED_FIELDS] + NORMALIZED_FIELDS
+        writer = csv.DictWriter(dst, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+
+        chunks = _iter_csv_chunks(reader, column, chunk_size)
+        for rows, (normalized, errors) in _ordered_results(chunks, workers, init_args):
+            for row, values in zip(rows, normalized):
+                row.update(zip(NORMALIZED_FIELDS, values or ('',) * len(NORMALIZED_FIELDS)))
+                stats['addresses'] += values is not None
+            writer.writerows(rows)
+            stats['rows'] += len(rows)
+            stats['errors'] += errors
+    return stats
+
+
+def normalize_parquet(input_path: str, output_path: str, column: str = 'address',
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+                      init_args: Tuple = (0.3,)) -> Dict[str, int]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(input_path)
+    schema = source.schema_arrow
+    if column not in schema.names:
+        raise ValueError(f"Column '{column}' not found in {input_path}")
+    # Input columns named like a normalized field are replaced by it
+    output_schema = pa.schema([field for field in schema if field.name not in NORMALIZED_FIELDS] +
+                              [pa.field(name, pa.float64() if name == 'confidence' else pa.string())
+                               for name in NORMALIZED_FIELDS])
+
+    stats = {'rows': 0, 'addresses': 0, 'errors': 0}
+    chunks = ((batch.column(column).to_pylist(), batch) for batch in source.iter_batches(batch_size=chunk_size))
+    with pq.ParquetWriter(output_path, output_schema) as writer:
+        for batch, (normalized, errors) in _ordered_results(chunks, workers, init_args):
+            columns = dict(zip(schema.names, batch.columns))
+            for i, field in enumerate(output_schema.field(name) for name in NORMALIZED_FIELDS):
+                columns[field.name] = pa.array([values[i] if values else None for values in normalized],
+                                               type=field.type)
+            writer.write_batch(pa.RecordBatch.from_arrays([columns[name] for name in output_schema.names],
+                                                          schema=output_schema))
+            stats['rows'] += batch.num_rows
+            stats['addresses'] += sum(1 for values in normalized if values)
+            stats['errors'] += errors
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Parse a CSV/Parquet column of one address per row into components")
+    parser.add_argument('input', help="Input file (.csv or .parquet)")
+    parser.add_argument('-o', '--output', required=True, help="Output file, in the same format as the input")
+    parser.add_argument('--column', default='address', help="Column holding the addresses")
+    parser.add_argument('--format', choices=['csv', 'parquet'],
+                        help="Input/output format (default: from the input file extension)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument('--min-confidence', type=float, default=0.3)
+    parser.add_argument('--pin-directory', help="Compiled PIN directory from pin_directory.py build")
+    parser.add_argument('--cache', help="SQLite block result cache shared by all workers")
+    parser.add_argument('--engine', choices=['spacy', 'regex'], default='spacy',
+                        help="'regex' skips spaCy entirely (no NER city fallback)")
+    parser.add_argument('--rule-pack', help="Rule pack JSON file, reloaded by the workers when it changes")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('parquet' if args.input.lower().endswith('.parquet') else 'csv')
+    normalize = normalize_parquet if fmt == 'parquet' else normalize_csv
+    init_args = (args.min_confidence, args.pin_directory, args.cache, args.engine, args.rule_pack)
+    try:
+        stats = normalize(args.input, args.output, args.column, args.chunk_size, args.workers, init_args)
+    except ImportError:
+        print("Parquet input needs pyarrow (pip install pyarrow)", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(f"Normalized {stats['rows']} rows ({stats['addresses']} addresses, {stats['errors']} failed) "
+          f"to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
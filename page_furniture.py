@@ -0,0 +1,122 @@
+"""Running headers, footers and other text repeated on the pages of a PDF.
+
+Filings print the company letterhead, often with its registered office address,
+and the page number in the top or bottom margin of every page. Left in the page
+text, every copy is segmented, matched and scored again, only to be dropped by
+deduplication at the end.
+
+PageFurniture.detect samples pages of a document and looks at the text blocks
+fitz places in the top and bottom margins. A block found at the same distance
+from the page edge, with the same text (digits masked, so "Page 3 of 500"
+matches "Page 4 of 500"), on most sampled pages is furniture. page_text() then
+returns a page's text with every furniture block blanked out, plus the blocks
+it removed:
+
+    with fitz.open("filing.pdf") as pdf:
+        furniture = PageFurniture.detect(pdf)
+        text, removed = furniture.page_text(pdf[0])
+
+Blanking keeps the length and the line breaks, so character offsets into the
+page text are the same as for page.get_text().
+"""
+import math
+import re
+from collections import Counter
+from typing import FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+# Fraction of the page height, at the top and at the bottom, searched for furniture
+MARGIN = 0.15
+# Pages sampled by detect(); the letterhead is on every page, so a few suffice
+SAMPLE_PAGES = 12
+# A block is furniture if it is on at least this share of the sampled pages ...
+MIN_SHARE = 0.5
+# ... and on at least this many of them; shorter documents are left alone
+MIN_PAGES = 3
+# Distance from the page edge is compared in steps of this many points
+POSITION_STEP = 5
+
+_DIGITS_PATTERN = re.compile(r'\d+')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NOT_NEWLINE_PATTERN = re.compile(r'[^\n]')
+
+# fitz "blocks" tuples: (x0, y0, x1, y1, text, block_no, block_type); type 0 is text
+_TEXT_BLOCK = 0
+
+
+class FurnitureBlock(NamedTuple):
+    """A furniture block on one page: its text and [start, end) offsets in the page text"""
+    start: int
+    end: int
+    text: str
+
+
+def _key(block: Tuple, height: float) -> Optional[Tuple[str, int, str]]:
+    """(margin, distance from the page edge, masked text) of a text block lying entirely
+    within the top or bottom margin, or None"""
+    if block[6] != _TEXT_BLOCK:
+        return None
+    if block[3] <= height * MARGIN:
+        margin, distance = 'top', block[1]
+    elif block[1] >= height * (1 - MARGIN):
+        margin, distance = 'bottom', height - block[3]
+    else:
+        return None
+    text = _DIGITS_PATTERN.sub('#', _WHITESPACE_PATTERN.sub(' ', block[4]).strip().lower())
+    return margin, round(distance / POSITION_STEP), text
+
+
+class PageFurniture:
+    """Keys (margin, distance from the edge, masked text) of the blocks repeated across a document's pages"""
+
+    def __init__(self, keys: Iterable[Tuple[str, int, str]] = ()):
+        self.keys: FrozenSet[Tuple[str, int, str]] = frozenset(keys)
+        # Blocks of the pages read by detect(), used (once) instead of reading them again
+        self._sampled = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    @classmethod
+    def detect(cls, pdf, pages: Optional[range] = None, sample: int = SAMPLE_PAGES) -> 'PageFurniture':
+        """Furniture of the given 0-based pages (default: all), from up to sample pages spread across them"""
+        if pages is None:
+            pages = range(pdf.page_count)
+        if len(pages) < MIN_PAGES:
+            return cls()
+        sampled = pages[::max(1, len(pages) // sample)][:sample]
+
+        counts = Counter()
+        blocks_by_page = {}
+        for index in sampled:
+            page = pdf[index]
+            height = page.rect.height
+            blocks = blocks_by_page[index] = page.get_text('blocks')
+            counts.update({_key(block, height) for block in blocks} - {None})
+
+        needed = max(MIN_PAGES, math.ceil(len(sampled) * MIN_SHARE))
+        furniture = cls(key for key, pages_found in counts.items() if pages_found >= needed)
+        furniture._sampled = blocks_by_page
+        return furniture
+
+    def page_text(self, page) -> Tuple[str, List[FurnitureBlock]]:
+        """The page's text with furniture blanked out, and the furniture blocks found on it"""
+        blocks = self._sampled.pop(page.number, None)
+        if blocks is None:
+            if not self.keys:
+                return page.get_text(), []
+            blocks = page.get_text('blocks')
+        height = page.rect.height
+
+        parts: List[str] = []
+        removed: List[FurnitureBlock] = []
+        offset = 0
+        for block in blocks:
+            if block[6] != _TEXT_BLOCK:
+                continue
+            text = block[4]
+            if _key(block, height) in self.keys:
+                removed.append(FurnitureBlock(offset, offset + len(text), text))
+                text = _NOT_NEWLINE_PATTERN.sub(' ', text)
+            parts.append(text)
+            offset += len(text)
+        return ''.join(parts), removed
@@ -0,0 +1,255 @@
+"""Parallel address extraction for a single large PDF.
+
+The pages are split into contiguous ranges, and each worker process opens its
+own fitz document, extracts the text of its range and runs address extraction
+on it. Results are merged in page order, so the output is identical to
+process_pdf_for_addresses, including page numbers and character offsets:
+
+    from parallel_pdf import extract_pdf_parallel
+    addresses = extract_pdf_parallel("filing.pdf", workers=8)
+
+A block can run across a page break, so range boundaries are handled exactly:
+a worker also reads the page before its range (to know whether its first line
+continues an earlier block) and, after its range, only as far as needed to
+finish a block that started inside it. Each block is owned by the range
+containing its first line. Repeated headers and footers are detected once, for
+the whole document, and every worker skips them the same way.
+"""
+import math
+import multiprocessing
+import os
+import tempfile
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+from Working_Parser import IndianAddressExtractor, _dedupe_records, _iter_candidate_records, _iter_page_spans
+from page_furniture import FurnitureBlock, PageFurniture
+from pin_directory import PinDirectory
+from result_cache import ResultCache
+from rule_pack import RulePack, RulePackSource
+
+# Ranges smaller than this are not worth a task of their own
+MIN_PAGES_PER_RANGE = 25
+# Ranges per worker, so a worker that finishes early can pick up more work
+RANGES_PER_WORKER = 4
+
+# Set once per process by _init_worker; the extractor is only built when first needed
+_worker_options: Dict = {}
+_worker_extractor: Optional[IndianAddressExtractor] = None
+_worker_rule_packs: Optional[RulePackSource] = None
+
+
+def _init_worker(min_confidence: float = 0.3, pin_directory_path: Optional[str] = None,
+                 cache_path: Optional[str] = None, engine: str = 'spacy',
+                 rule_pack_path: Optional[str] = None) -> None:
+    global _worker_options, _worker_extractor, _worker_rule_packs
+    options = {'min_confidence': min_confidence, 'pin_directory_path': pin_directory_path,
+               'cache_path': cache_path, 'engine': engine}
+    if options != _worker_options:
+        _worker_options = options
+        _worker_extractor = None
+    # A different pack is swapped into the existing extractor; the model stays loaded
+    if rule_pack_path is None:
+        _worker_rule_packs = None
+    elif _worker_rule_packs is None or _worker_rule_packs.path != rule_pack_path:
+        _worker_rule_packs = RulePackSource(rule_pack_path)
+
+
+def _get_extractor() -> IndianAddressExtractor:
+    global _worker_extractor
+    if _worker_extractor is None:
+        options = _worker_options
+        pin_directory = PinDirectory.load(options['pin_directory_path']) if options.get('pin_directory_path') else None
+        cache = ResultCache(db_path=options['cache_path']) if options.get('cache_path') else None
+        _worker_extractor = IndianAddressExtractor(lazy_ner=True, pin_directory=pin_directory, cache=cache,
+                                                   engine=options.get('engine', 'spacy'))
+    if _worker_rule_packs is not None:
+        _worker_rule_packs.apply(_worker_extractor)
+    else:
+        _worker_extractor.use_rule_pack(RulePack.default())
+    return _worker_extractor
+
+
+def page_ranges(page_count: int, workers: int, min_pages: int = MIN_PAGES_PER_RANGE) -> List[Tuple[int, int]]:
+    """Split 0-based page indexes into contiguous [start, end) ranges"""
+    if page_count == 0:
+        return []
+    count = max(1, min(workers * RANGES_PER_WORKER, page_count // min_pages))
+    size = math.ceil(page_count / count)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _read_range(task: Tuple[str, int, int]) -> List[str]:
+    """Text of pages [start, end)"""
+    import fitz  # PyMuPDF
+
+    path, start, end = task
+    with fitz.open(path) as pdf:
+        return [pdf[index].get_text() for index in range(start, end)]
+
+
+def _extract_range(task: Tuple[str, int, int, FrozenSet]) -> Tuple[List[int], List[Dict]]:
+    """Candidate address records for blocks starting in pages [start, end).
+
+    The last task item holds the document's page furniture keys. Returns the text
+    length of each page in the range and the records, whose char_start/char_end
+    are relative to the start of the record's page.
+    """
+    import fitz  # PyMuPDF
+
+    path, start, end, furniture_keys = task
+    extractor = _get_extractor()
+    furniture = PageFurniture(furniture_keys)
+    lengths: List[int] = []
+    page_offsets: Dict[int, int] = {}  # page number -> offset of the page in the chunk stream
+
+    with fitz.open(path) as pdf:
+        def pages() -> Iterator[Tuple[int, str, List[FurnitureBlock]]]:
+            offset = 0
+            for index in range(max(start - 1, 0), pdf.page_count):
+                text, removed = furniture.page_text(pdf[index])
+                page_offsets[index + 1] = offset
+                offset += len(text) + 1
+                if start <= index < end:
+                    lengths.append(len(text))
+                yield index + 1, text, removed
+
+        def owned_spans():
+            for span in _iter_page_spans(extractor, pages()):
+                if span.page <= start:
+                    continue  # Starts on the lead-in page: belongs to the previous range
+                if span.page > end:
+                    break  # Every block starting in this range has been emitted
+                yield span
+
+        records = list(_iter_candidate_records(extractor, owned_spans(), _worker_options['min_confidence']))
+
+    for record in records:
+        page_offset = page_offsets[record['page']]
+        record['char_start'] -= page_offset
+        record['char_end'] -= page_offset
+    if extractor.cache is not None:
+        extractor.cache.flush()
+    return lengths, records
+
+
+class ParallelPdfExtractor:
+    """Pool of worker processes for extracting addresses (or text) from large PDFs.
+
+    Keep one around to reuse the workers, and their loaded models, across PDFs.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_confidence: float = 0.3,
+                 pin_directory_path: Optional[str] = None, cache_path: Optional[str] = None,
+                 engine: str = 'spacy', min_pages: int = MIN_PAGES_PER_RANGE,
+                 rule_pack_path: Optional[str] = None, skip_repeated: bool = True):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_pages = min_pages
+        self.skip_repeated = skip_repeated
+        self._init_args = (min_confidence, pin_directory_path, cache_path, engine, rule_pack_path)
+        self._pool = None
+
+    def __enter__(self) -> 'ParallelPdfExtractor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _map(self, func, tasks: List[Tuple]) -> Iterator:
+        """Results of func over tasks, in task order"""
+        if self.workers <= 1 or len(tasks) <= 1:
+            _init_worker(*self._init_args)
+            return map(func, tasks)
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=self._init_args)
+        return self._pool.imap(func, tasks)
+
+    def _tasks(self, path: str) -> List[Tuple[str, int, int]]:
+        import fitz  # PyMuPDF
+
+        with fitz.open(path) as pdf:
+            page_count = pdf.page_count
+        return [(path, start, end) for start, end in page_ranges(page_count, self.workers, self.min_pages)]
+
+    def _furniture_keys(self, path: str) -> FrozenSet:
+        """Keys of the headers and footers repeated across the document, detected once for all ranges"""
+        import fitz  # PyMuPDF
+
+        if not self.skip_repeated:
+            return frozenset()
+        with fitz.open(path) as pdf:
+            return PageFurniture.detect(pdf).keys
+
+    def extract(self, pdf: Union[str, bytes]) -> List[Dict]:
+        """Same records, in the same order, as process_pdf_for_addresses"""
+        return list(self.iter_extract(pdf))
+
+    def iter_extract(self, pdf: Union[str, bytes],
+                     progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Dict]:
+        """Yield the records of extract() range by range, as each range finishes.
+
+        progress, if given, is called with (pages done, page count) after each range.
+        """
+        with _pdf_file(pdf) as path:
+            yield from _dedupe_records(self._iter_candidates(path, progress))
+
+    def _iter_candidates(self, path: str, progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Dict]:
+        page_offset = 0  # Offset of the current page in the pages joined with "\n"
+        page_offsets: Dict[int, int] = {}
+        furniture_keys = self._furniture_keys(path)
+        tasks = [task + (furniture_keys,) for task in self._tasks(path)]
+        page_count = tasks[-1][2] if tasks else 0
+        for (_, start, end, _), (lengths, records) in zip(tasks, self._map(_extract_range, tasks)):
+            for page_no, length in enumerate(lengths, start + 1):
+                page_offsets[page_no] = page_offset
+                page_offset += length + 1
+            if progress is not None:
+                progress(end, page_count)
+            for record in records:
+                record['char_start'] += page_offsets[record['page']]
+                record['char_end'] += page_offsets[record['page']]
+                yield record
+
+    def read_pages(self, pdf: Union[str, bytes]) -> List[str]:
+        """Text of every page, in order"""
+        with _pdf_file(pdf) as path:
+            tasks = self._tasks(path)
+            return [text for texts in self._map(_read_range, tasks) for text in texts]
+
+
+class _pdf_file:
+    """Context manager giving a path for a PDF path or bytes (written to a temporary file)"""
+
+    def __init__(self, pdf: Union[str, bytes]):
+        self.pdf = pdf
+        self.tmp_path: Optional[str] = None
+
+    def __enter__(self) -> str:
+        if not isinstance(self.pdf, bytes):
+            return str(self.pdf)
+        fd, self.tmp_path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.pdf)
+        return self.tmp_path
+
+    def __exit__(self, *exc_info) -> None:
+        if self.tmp_path:
+            os.remove(self.tmp_path)
+
+
+def extract_pdf_parallel(pdf: Union[str, bytes], workers: Optional[int] = None,
+                         min_confidence: float = 0.3, **options) -> List[Dict]:
+    """Extract addresses from one PDF using a temporary pool of workers"""
+    with ParallelPdfExtractor(workers, min_confidence, **options) as extractor:
+        return extractor.extract(pdf)
+
+
+def read_pdf_pages(pdf: Union[str, bytes], workers: Optional[int] = None) -> List[str]:
+    """Text of every page, extracted in parallel for large PDFs"""
+    with ParallelPdfExtractor(workers) as extractor:
+        return extractor.read_pages(pdf)
@@ -0,0 +1,265 @@
+"""Offline PIN code directory used to validate postal codes and backfill state/city.
+
+Two sources are supported:
+
+* A bundled table of 3-digit sorting-district prefixes. It knows which prefixes
+  India Post has allocated and the state each one serves, and the city for
+  prefixes that cover a single metro. Where a sorting district straddles a state
+  border it resolves to the state with most of the district.
+* A full India Post directory (the data.gov.in "All India Pincode Directory"
+  CSV), compiled once with
+
+      python pin_directory.py build all_india_pincode.csv -o pincodes.bin
+
+  into a compact binary file. Loading memory-maps it and lookups are a binary
+  search, so a full directory costs milliseconds to load.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MAGIC = b'PINDIR1\0'
+HEADER = struct.Struct('<8sII')  # magic, range count, entry table size in bytes
+
+# (first prefix, last prefix, state) for every allocated 3-digit sorting district.
+# 0xx does not exist and 9xx is reserved for the Army Postal Service.
+_PREFIX_STATES = [
+    (110, 110, 'Delhi'),
+    (121, 136, 'Haryana'),
+    (140, 159, 'Punjab'),
+    (160, 160, 'Chandigarh'),
+    (171, 177, 'Himachal Pradesh'),
+    (180, 193, 'Jammu and Kashmir'),
+    (194, 194, 'Ladakh'),
+    (201, 245, 'Uttar Pradesh'),
+    (246, 246, 'Uttarakhand'),
+    (247, 247, 'Uttar Pradesh'),
+    (248, 249, 'Uttarakhand'),
+    (250, 262, 'Uttar Pradesh'),
+    (263, 263, 'Uttarakhand'),
+    (271, 285, 'Uttar Pradesh'),
+    (301, 345, 'Rajasthan'),
+    (360, 396, 'Gujarat'),
+    (400, 402, 'Maharashtra'),
+    (403, 403, 'Goa'),
+    (404, 445, 'Maharashtra'),
+    (450, 488, 'Madhya Pradesh'),
+    (490, 497, 'Chhattisgarh'),
+    (500, 509, 'Telangana'),
+    (515, 535, 'Andhra Pradesh'),
+    (560, 591, 'Karnataka'),
+    (600, 643, 'Tamil Nadu'),
+    (670, 695, 'Kerala'),
+    (700, 736, 'West Bengal'),
+    (737, 737, 'Sikkim'),
+    (738, 743, 'West Bengal'),
+    (744, 744, 'Andaman and Nicobar Islands'),
+    (751, 770, 'Odisha'),
+    (781, 788, 'Assam'),
+    (790, 792, 'Arunachal Pradesh'),
+    (793, 794, 'Meghalaya'),
+    (795, 795, 'Manipur'),
+    (796, 796, 'Mizoram'),
+    (797, 798, 'Nagaland'),
+    (799, 799, 'Tripura'),
+    (800, 813, 'Bihar'),
+    (814, 816, 'Jharkhand'),
+    (817, 821, 'Bihar'),
+    (822, 822, 'Jharkhand'),
+    (823, 824, 'Bihar'),
+    (825, 835, 'Jharkhand'),
+    (841, 855, 'Bihar'),
+]
+
+# Sorting districts that cover a single city. Prefixes shared by several cities
+# (e.g. 400 for Mumbai, Thane and Navi Mumbai) are deliberately left out.
+_PREFIX_CITIES = {
+    110: 'Delhi', 160: 'Chandigarh', 226: 'Lucknow', 302: 'Jaipur', 380: 'Ahmedabad',
+    395: 'Surat', 411: 'Pune', 440: 'Nagpur', 452: 'Indore', 462: 'Bhopal',
+    500: 'Hyderabad', 560: 'Bangalore', 600: 'Chennai', 700: 'Kolkata', 800: 'Patna',
+}
+
+
+@dataclass(frozen=True)
+class PinInfo:
+    """Directory entry for a PIN code; district is empty when unknown.
+
+    prefix_only entries come from the sorting-district table, whose state is that
+    of the whole district, so they are less certain than rows of a full directory.
+    """
+    district: str
+    state: str
+    prefix_only: bool = False
+
+
+class PinDirectory:
+    """Sorted, non-overlapping PIN ranges mapped to directory entries"""
+
+    def __init__(self, starts: Sequence[int], ends: Sequence[int], entry_ids: Sequence[int],
+                 entries: List[PinInfo]):
+        self.starts = starts
+        self.ends = ends
+        self.entry_ids = entry_ids
+        self.entries = entries
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Short digest of the directory contents, used to version cached results"""
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for column in (self.starts, self.ends, self.entry_ids):
+                digest.update(array('I', column).tobytes())
+            digest.update(json.dumps([[e.district, e.state, e.prefix_only] for e in self.entries]).encode('utf-8'))
+            self._fingerprint = digest.hexdigest()[:12]
+        return self._fingerprint
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def lookup(self, pin: str) -> Optional[PinInfo]:
+        """Return the entry for a 6-digit PIN code, or None if it is not allocated"""
+        if len(pin) != 6 or not pin.isdigit():
+            return None
+
+        code = int(pin)
+        idx = bisect_right(self.starts, code) - 1
+        if idx < 0 or code > self.ends[idx]:
+            return None
+        return self.entries[self.entry_ids[idx]]
+
+    @classmethod
+    def from_ranges(cls, ranges: List[Tuple[int, int, PinInfo]]) -> 'PinDirectory':
+        """Build a directory from (first PIN, last PIN, entry) tuples"""
+        ranges = sorted(ranges, key=lambda r: r[0])
+        entry_index: Dict[PinInfo, int] = {}
+        starts, ends, entry_ids = array('I'), array('I'), array('I')
+
+        for start, end, info in ranges:
+            entry_id = entry_index.setdefault(info, len(entry_index))
+            # Merge with the previous range when the PINs are contiguous and share an entry
+            if starts and ends[-1] + 1 == start and entry_ids[-1] == entry_id:
+                ends[-1] = end
+                continue
+            starts.append(start)
+            ends.append(end)
+            entry_ids.append(entry_id)
+
+        return cls(starts, ends, entry_ids, list(entry_index))
+
+    @classmethod
+    def bundled(cls) -> 'PinDirectory':
+        """Directory built from the bundled sorting-district prefix table"""
+        global _bundled
+        if _bundled is None:
+            ranges = []
+            for first, last, state in _PREFIX_STATES:
+                for prefix in range(first, last + 1):
+                    info = PinInfo(_PREFIX_CITIES.get(prefix, ''), state, prefix_only=True)
+                    ranges.append((prefix * 1000, prefix * 1000 + 999, info))
+            _bundled = cls.from_ranges(ranges)
+        return _bundled
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> 'PinDirectory':
+        """Compile an India Post directory CSV (pincode, district and state columns)"""
+        votes: Dict[int, Counter] = defaultdict(Counter)
+        with open(csv_path, encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            columns = {name.lower().replace(' ', ''): name for name in reader.fieldnames or []}
+            pin_col = columns.get('pincode')
+            district_col = columns.get('district') or columns.get('districtname')
+            state_col = columns.get('statename') or columns.get('state')
+            if not pin_col or not state_col:
+                raise ValueError(f"{csv_path}: expected pincode and statename columns, found {reader.fieldnames}")
+
+            for row in reader:
+                pin = (row.get(pin_col) or '').strip()
+                if len(pin) != 6 or not pin.isdigit():
+                    continue
+                district = (row.get(district_col) or '').strip().title() if district_col else ''
+                state = (row.get(state_col) or '').strip().title()
+                votes[int(pin)][PinInfo(district, state)] += 1
+
+        # Several post offices share a PIN; keep the entry most of them agree on
+        ranges = [(pin, pin, counter.most_common(1)[0][0]) for pin, counter in votes.items()]
+        return cls.from_ranges(ranges)
+
+    def save(self, path: str) -> None:
+        """Write the compact binary form read by load()"""
+        table = json.dumps([[e.district, e.state, e.prefix_only] for e in self.entries]).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self.starts), len(table)))
+            for column in (self.starts, self.ends, self.entry_ids):
+                values = array('I', column)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                f.write(values.tobytes())
+            f.write(table)
+
+    @classmethod
+    def load(cls, path: str) -> 'PinDirectory':
+        """Memory-map a file written by save(); the range arrays are not copied"""
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, table_size = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a PIN directory file")
+
+        view = memoryview(data)
+        offset = HEADER.size
+        columns = []
+        for _ in range(3):
+            raw = view[offset:offset + 4 * count]
+            if sys.byteorder == 'little':
+                columns.append(raw.cast('I'))
+            else:
+                swapped = array('I', raw.tobytes())
+                swapped.byteswap()
+                columns.append(swapped)
+            offset += 4 * count
+
+        table = json.loads(bytes(view[offset:offset + table_size]).decode('utf-8'))
+        # Files written before prefix_only was stored hold [district, state] rows
+        entries = [PinInfo(*row) for row in table]
+        return cls(columns[0], columns[1], columns[2], entries)
+
+
+_bundled: Optional[PinDirectory] = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile an India Post PIN code directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Compile a directory CSV into a binary index")
+    build.add_argument('csv_path')
+    build.add_argument('-o', '--output', required=True)
+    lookup = subparsers.add_parser('lookup', help="Look up PIN codes")
+    lookup.add_argument('pins', nargs='+')
+    lookup.add_argument('--directory', help="Compiled index (default: bundled prefix table)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        directory = PinDirectory.from_csv(args.csv_path)
+        directory.save(args.output)
+        print(f"Wrote {len(directory)} PIN ranges ({len(directory.entries)} districts) to {args.output}")
+    else:
+        directory = PinDirectory.load(args.directory) if args.directory else PinDirectory.bundled()
+        for pin in args.pins:
+            info = directory.lookup(pin)
+            print(f"{pin}: {info.district or '-'}, {info.state}" if info else f"{pin}: not found")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Per-stage timing and counters for IndianAddressExtractor.
+
+Attach a PipelineMetrics to an extractor to see where the time goes:
+
+    metrics = PipelineMetrics()
+    extractor = IndianAddressExtractor(metrics=metrics)
+    extractor.extract_addresses(text)
+    print(metrics.to_prometheus())
+
+    with extractor.profile() as profile:   # only this call
+        extractor.extract_addresses(text)
+    print(profile.snapshot())
+
+Attaching wraps the extractor's stage methods on that instance only, so an
+extractor without metrics runs the unmodified code. Stage times are exclusive:
+time spent in a nested stage (e.g. PDF text extraction pulled by segmentation)
+is only counted once, so the stages add up to the wall time of the call.
+A PipelineMetrics is not thread-safe; use one per extractor and thread.
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Extractor method -> stage it is timed under
+STAGE_METHODS = {
+    '_iter_block_spans': 'segmentation',
+    '_prefilter_score': 'prefilter',
+    '_match_components': 'components',
+    '_apply_ner_city': 'components',
+    '_finalize_components': 'components',
+    '_analyze_blocks_cached': 'cache',
+    '_calculate_confidence': 'confidence',
+    '_detect_region': 'region',
+    '_deduplicate_addresses': 'dedup',
+    'format_address': 'format',
+}
+
+# Called as hook(kind, name, value) with kind 'time' (seconds), 'count' or 'error'
+Hook = Callable[[str, str, float], None]
+
+
+class StageStats:
+    __slots__ = ('calls', 'seconds', 'max_seconds', 'errors')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.errors = 0
+
+
+class PipelineMetrics:
+    """Accumulates per-stage wall time, call and error counts, and pipeline counters"""
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self.counters = Counter()
+        self._hooks: List[Hook] = []
+        # Time spent in nested stages, one entry per stage currently running
+        self._child_time: List[float] = []
+
+    def add_hook(self, hook: Hook) -> None:
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self._hooks.remove(hook)
+
+    def _stage(self, stage: str) -> StageStats:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        return stats
+
+    def record_time(self, stage: str, seconds: float) -> None:
+        stats = self._stage(stage)
+        stats.calls += 1
+        stats.seconds += seconds
+        if seconds > stats.max_seconds:
+            stats.max_seconds = seconds
+        for hook in self._hooks:
+            hook('time', stage, seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+        for hook in self._hooks:
+            hook('count', name, n)
+
+    def record_error(self, stage: str) -> None:
+        self._stage(stage).errors += 1
+        for hook in self._hooks:
+            hook('error', stage, 1)
+
+    def _enter(self) -> float:
+        self._child_time.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, stage: str, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        nested = self._child_time.pop()
+        if self._child_time:
+            self._child_time[-1] += elapsed
+        self.record_time(stage, elapsed - nested)
+
+    def timed(self, stage: str, func: Callable, count: Optional[str] = None) -> Callable:
+        """Wrap func so each call is timed under stage; count also bumps a counter per call"""
+        def wrapper(*args, **kwargs):
+            if count:
+                self.count(count)
+            start = self._enter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                self.record_error(stage)
+                raise
+            finally:
+                self._exit(stage, start)
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def timed_iter(self, stage: str, items: Iterable, count: Optional[str] = None) -> Iterator:
+        """Yield from items, timing each step under stage; count bumps a counter per item"""
+        iterator = iter(items)
+        while True:
+            start = self._enter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._exit(stage, start)
+                return
+            except Exception:
+                self._exit(stage, start)
+                self.record_error(stage)
+                raise
+            self._exit(stage, start)
+            if count:
+                self.count(count)
+            yield item
+
+    def attach(self, extractor) -> 'PipelineMetrics':
+        """Instrument one extractor; detach() restores it"""
+        if getattr(extractor, 'metrics', None) is not None and extractor.metrics is not self:
+            raise ValueError("extractor already has metrics attached")
+
+        for name, stage in STAGE_METHODS.items():
+            method = getattr(type(extractor), name)
+            bound = method.__get__(extractor, type(extractor))
+            if name == '_iter_block_spans':
+                wrapped = lambda chunks, _f=bound: self.timed_iter('segmentation', _f(chunks), count='blocks_seen')
+            else:
+                wrapped = self.timed(stage, bound, count='ner_fallback' if name == '_apply_ner_city' else None)
+            setattr(extractor, name, wrapped)
+
+        if extractor.nlp is not None and not isinstance(extractor.nlp, _TimedModel):
+            extractor.nlp = _TimedModel(extractor.nlp, self)
+        extractor.metrics = self
+        return self
+
+    def detach(self, extractor) -> None:
+        for name in STAGE_METHODS:
+            extractor.__dict__.pop(name, None)
+        if isinstance(extractor.nlp, _TimedModel):
+            extractor.nlp = extractor.nlp.model
+        extractor.metrics = None
+
+    @contextmanager
+    def profile(self) -> Iterator['PipelineMetrics']:
+        """Collect everything recorded inside the with block into a separate PipelineMetrics"""
+        profile = PipelineMetrics()
+
+        def forward(kind: str, name: str, value: float) -> None:
+            if kind == 'time':
+                profile.record_time(name, value)
+            elif kind == 'count':
+                profile.count(name, value)
+            else:
+                profile.record_error(name)
+
+        self.add_hook(forward)
+        try:
+            yield profile
+        finally:
+            self.remove_hook(forward)
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.counters.clear()
+
+    def snapshot(self) -> Dict:
+        """JSON-ready view of all stages and counters"""
+        counters = dict(self.counters)
+        counters['blocks_rejected'] = counters.get('blocks_seen', 0) - counters.get('blocks_accepted', 0)
+        return {
+            'stages': {
+                stage: {'calls': s.calls, 'seconds': s.seconds, 'max_seconds': s.max_seconds, 'errors': s.errors}
+                for stage, s in sorted(self.stages.items())
+            },
+            'total_seconds': sum(s.seconds for s in self.stages.values()),
+            'counters': counters,
+        }
+
+    def to_prometheus(self, prefix: str = 'address_extractor') -> str:
+        """Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, samples: Dict[str, float], label: str) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for key, value in samples.items():
+                lines.append(f'{prefix}_{name}{{{label}="{key}"}} {value}')
+
+        stages = snapshot['stages']
+        family('stage_seconds_total', 'counter', "Exclusive wall time spent in each stage",
+               {k: v['seconds'] for k, v in stages.items()}, 'stage')
+        family('stage_calls_total', 'counter', "Calls (or iteration steps) per stage",
+               {k: v['calls'] for k, v in stages.items()}, 'stage')
+        family('stage_max_seconds', 'gauge', "Slowest single call per stage",
+               {k: v['max_seconds'] for k, v in stages.items()}, 'stage')
+        family('stage_errors_total', 'counter', "Exceptions raised per stage",
+               {k: v['errors'] for k, v in stages.items()}, 'stage')
+        family('events_total', 'counter', "Blocks seen/prefiltered/accepted/rejected and NER fallbacks",
+               snapshot['counters'], 'event')
+        return '\n'.join(lines) + '\n'
+
+
+class _TimedModel:
+    """Stands in for the spaCy pipeline, timing calls and pipe() under the 'spacy' stage"""
+
+    def __init__(self, model, metrics: PipelineMetrics):
+        self.model = model
+        self._call = metrics.timed('spacy', model)
+        self._metrics = metrics
+
+    def __call__(self, text):
+        return self._call(text)
+
+    def pipe(self, texts, **kwargs):
+        return self._metrics.timed_iter('spacy', self.model.pipe(texts, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
@@ -0,0 +1,105 @@
+"""Content-addressed cache for per-block extraction results.
+
+Entries live in an in-memory LRU and, optionally, in a SQLite file that several
+worker processes can share. Keys are digests of the entry kind, a version string
+and the block text, so changing the extractor rules or the spaCy model simply
+stops old entries from matching.
+
+Writes to the SQLite file are buffered and written in one short transaction, so
+a process never holds the write lock between puts. Any SQLite error is logged
+and treated as a miss (or a dropped write); it never fails an extraction.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional SQLite) cache with hit/miss counters"""
+
+    def __init__(self, max_entries: int = 100_000, db_path: Optional[str] = None,
+                 commit_every: int = 256):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.counters = Counter()
+        self._memory: 'OrderedDict[str, Any]' = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        # (key, JSON value) rows not yet written to the SQLite tier
+        self._pending: List[Tuple[str, str]] = []
+
+        if db_path:
+            # Autocommit; flush() opens and commits its own transaction
+            self._db = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @staticmethod
+    def make_key(kind: str, version: str, text: str) -> str:
+        return hashlib.sha1(f"{kind}\0{version}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        """Look up a key, promoting disk hits into memory; kind only labels the counters"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.counters[f'{kind}_hits'] += 1
+            return self._memory[key]
+
+        if self._db is not None:
+            try:
+                row = self._db.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+                value = None if row is None else json.loads(row[0])
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Error reading result cache: {str(e)}")
+                row = None
+            if row is not None:
+                self._remember(key, value)
+                self.counters[f'{kind}_disk_hits'] += 1
+                return value
+
+        self.counters[f'{kind}_misses'] += 1
+        return None
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Store a JSON-serializable value; the SQLite tier gets it at the next flush"""
+        self._remember(key, value)
+        if self._db is not None:
+            self._pending.append((key, json.dumps(value)))
+            if len(self._pending) >= self.commit_every:
+                self.flush()
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def flush(self) -> None:
+        """Write buffered entries to the SQLite tier in one short transaction"""
+        if self._db is None or not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", pending)
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing result cache, {len(pending)} entries dropped: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._memory), **self.counters}
+
+    def close(self) -> None:
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,246 @@
+"""Rule packs: the vocabulary and validation phrases the extractor runs with.
+
+A pack bundles the place data (regions, states, cities and their aliases,
+regional terms), the fuzzy place lookup settings, the address markers used by
+the prefilter and the phrases and cities used to validate a block. The bundled
+data is the "default" pack; a client pack is a JSON file whose keys replace the
+defaults, or whose "add" section extends them:
+
+    {
+      "name": "acme-logistics",
+      "version": "2026.10.1",
+      "add": {
+        "regional_info": {"west_india": {"cities": ["Bhiwandi", "Taloja"]}},
+        "address_markers": ["industrial estate"]
+      }
+    }
+
+A pack is compiled once (gazetteer trie, fuzzy place index, marker pattern,
+frozen sets) and not changed afterwards, so one pack can be shared by several
+extractors. Swap it in with extractor.use_rule_pack(pack); the spaCy model is
+kept. Workers can follow a pack file with RulePackSource, which reloads it when
+the file changes:
+
+    python rule_pack.py check acme.json
+"""
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from types import MappingProxyType
+from typing import Dict, List, Optional
+
+from fuzzy_places import DEFAULT_MAX_DISTANCE, FuzzyPlaceIndex
+from gazetteer import (CITY_ALIASES, CITY_STATES, COMPONENT_CITY_TIERS, MAJOR_CITIES, REGIONAL_INFO, STATE_VARIANTS,
+                       Gazetteer)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PACK_VERSION = "1"
+
+ADDRESS_MARKERS = [
+    "registered office", "corporate office", "branch office", "head office",
+    "regional office", "manufacturing unit", "plant", "warehouse", "godown",
+    "for correspondence", "residing at", "located at", "situated at",
+    "address:", "office:", "residence:", "unit:", "plot no", "door no",
+    "having its office at", "r/o", "s/o", "d/o", "w/o", "c/o",
+    "limited", "ltd", "towers", "plaza", "highway", "department", "division",
+    "mail stop", "floor", "building", "complex", "centre", "center",
+    "landmark", "near", "beside", "opposite", "adjacent to",
+    "next to", "behind", "front of", "above", "below", "cross", "junction",
+    "gali", "marg", "nagar", "colony", "society", "chowk", "road no"
+]
+
+# Blocks whose components contain one of these are legal boilerplate, not addresses
+SUSPICIOUS_PHRASES = [
+    'shall be final',
+    'are involved',
+    'difference is in',
+    'dates fixed for',
+    'hearing of a case',
+    'where the main',
+    'not be questioned'
+]
+
+# Cities accepted by validation even if shorter than two characters
+VALID_CITIES = [
+    'mumbai', 'delhi', 'bangalore', 'hyderabad', 'chennai',
+    'kolkata', 'pune', 'ahmedabad', 'surat', 'jaipur',
+    'bandra', 'u.s.a.', 'washington', 'new york',
+    'bandra-kurla', 'east', 'west'
+]
+
+# Data keys of a pack file, with the bundled defaults
+_DEFAULTS = {
+    'regional_info': REGIONAL_INFO,
+    'state_variants': STATE_VARIANTS,
+    'major_cities': MAJOR_CITIES,
+    'component_city_tiers': COMPONENT_CITY_TIERS,
+    'city_aliases': CITY_ALIASES,
+    'city_states': CITY_STATES,
+    # Most edits between a misspelled city/state and its name; 0 turns the fuzzy lookup off
+    'fuzzy_max_distance': DEFAULT_MAX_DISTANCE,
+    'address_markers': ADDRESS_MARKERS,
+    'suspicious_phrases': SUSPICIOUS_PHRASES,
+    'valid_cities': VALID_CITIES,
+}
+_REGION_KEYS = ('states', 'cities', 'terms')
+
+
+def _merge(base, extra):
+    """base extended by extra: dicts merged key by key, new list items appended"""
+    if isinstance(base, dict) and isinstance(extra, dict):
+        merged = dict(base)
+        for key, value in extra.items():
+            merged[key] = _merge(base[key], value) if key in base else copy.deepcopy(value)
+        return merged
+    if isinstance(base, list) and isinstance(extra, list):
+        return base + [item for item in extra if item not in base]
+    raise ValueError(f"Cannot extend {type(base).__name__} with {type(extra).__name__}")
+
+
+def _freeze(value):
+    """Read-only copy of nested dicts and lists"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class RulePack:
+    """Compiled, read-only rules; build with RulePack.default(), load() or from_dict()"""
+
+    def __init__(self, name: str = 'default', version: str = DEFAULT_PACK_VERSION, **data):
+        unknown = set(data) - set(_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown rule pack keys: {', '.join(sorted(unknown))}")
+        data = {key: copy.deepcopy(data[key]) if key in data else copy.deepcopy(default)
+                for key, default in _DEFAULTS.items()}
+        for region, info in data['regional_info'].items():
+            for key in _REGION_KEYS:
+                info.setdefault(key, [])
+
+        self.name = name
+        self.version = str(version)
+        # Carried by every result: which rules produced it
+        self.label = f"{self.name}@{self.version}"
+        # Digest of the rules themselves, so cached results follow content changes
+        # even when a pack is edited without bumping its version
+        self.fingerprint = hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+        self.regional_info = _freeze(data['regional_info'])
+        self.state_variants = _freeze(data['state_variants'])
+        self.major_cities = _freeze(data['major_cities'])
+        self.address_markers = _freeze(data['address_markers'])
+        self.suspicious_phrases = _freeze(data['suspicious_phrases'])
+        self.valid_cities = frozenset(city.lower() for city in data['valid_cities'])
+
+        if data == _DEFAULTS:
+            # The bundled data: share the process-wide gazetteer instead of compiling another
+            self.gazetteer = Gazetteer.default()
+        else:
+            self.gazetteer = Gazetteer(data['regional_info'], data['state_variants'], data['major_cities'],
+                                       data['component_city_tiers'], data['city_aliases'], data['city_states'])
+        self.places = FuzzyPlaceIndex(self.gazetteer, data['fuzzy_max_distance'])
+        self.marker_pattern = re.compile(
+            r'(?<!\w)(?:' + '|'.join(map(re.escape, self.address_markers)) + r')(?!\w)', re.I)
+
+    def __repr__(self) -> str:
+        return f"RulePack({self.label!r}, fingerprint={self.fingerprint!r})"
+
+    @classmethod
+    def default(cls) -> 'RulePack':
+        """Pack built from the bundled data, shared by every extractor that is not given one"""
+        global _default
+        if _default is None:
+            _default = cls()
+        return _default
+
+    @classmethod
+    def from_dict(cls, spec: Dict) -> 'RulePack':
+        """Pack from a parsed pack file"""
+        spec = dict(spec)
+        name = spec.pop('name', 'custom')
+        version = spec.pop('version', DEFAULT_PACK_VERSION)
+        for key, extra in spec.pop('add', {}).items():
+            if key not in _DEFAULTS:
+                raise ValueError(f"Unknown rule pack keys: {key}")
+            spec[key] = _merge(spec.get(key, _DEFAULTS[key]), extra)
+        return cls(name, version, **spec)
+
+    @classmethod
+    def load(cls, path: str) -> 'RulePack':
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+_default: Optional[RulePack] = None
+
+
+class RulePackSource:
+    """The current pack compiled from a file, reloaded when the file changes.
+
+    current() costs one os.stat every check_interval seconds. Replace the file
+    atomically (write a temporary file, then rename it over the pack) so a
+    reload never sees a half-written pack. A pack that fails to load is logged
+    and the previous one stays in use.
+    """
+
+    def __init__(self, path: str, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.pack = RulePack.load(path)
+        self._stamp = self._file_stamp()
+        self._checked_at = time.monotonic()
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def current(self) -> RulePack:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self.pack
+        self._checked_at = now
+        try:
+            stamp = self._file_stamp()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                self.pack = RulePack.load(self.path)
+                logger.info(f"Loaded rule pack {self.pack.label} from {self.path}")
+        except Exception as e:
+            logger.warning(f"Error reloading rule pack {self.path}, keeping {self.pack.label}. Error: {str(e)}")
+        return self.pack
+
+    def apply(self, extractor) -> None:
+        """Switch extractor to the current pack (a no-op while the file is unchanged)"""
+        extractor.use_rule_pack(self.current())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rule pack tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+    check = sub.add_parser('check', help="Compile a pack file and print its version and contents")
+    check.add_argument('path')
+    args = parser.parse_args(argv)
+
+    try:
+        pack = RulePack.load(args.path)
+    except (OSError, ValueError) as e:
+        print(f"Invalid rule pack {args.path}: {e}", file=sys.stderr)
+        return 1
+    gazetteer = pack.gazetteer
+    print(f"{pack.label} (fingerprint {pack.fingerprint}): {len(gazetteer.names('state'))} states, "
+          f"{len(gazetteer.names('city'))} cities, {len(gazetteer.names('term'))} terms, "
+          f"{len(pack.address_markers)} markers, {len(pack.suspicious_phrases)} suspicious phrases")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
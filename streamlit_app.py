@@ -1,28 +1,117 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
 import streamlit as st
 import fitz  # PyMuPDF for PDF extraction
-from Working_Parser import IndianAddressExtractor
-
-def extract_text_from_pdf(pdf_file):
-    """Extracts text from a PDF file using PyMuPDF (fitz)."""
-    try:
-        with fitz.open(stream=pdf_file.getvalue(), filetype="pdf") as doc:
-            text = "\n".join([page.get_text("text") for page in doc])
-        return text
-    except Exception as e:
-        st.error(f"Error extracting text from PDF: {e}")
-        return ""
-
-# Initialize address extractor
-extractor = IndianAddressExtractor()
-
-def extract_addresses(text):
-    """Extracts addresses from text using IndianAddressExtractor."""
-    try:
-        addresses = extractor.extract_addresses(text)
-        return addresses  # Return full AddressMatch objects
-    except Exception as e:
-        st.error(f"Error extracting addresses: {e}")
-        return []
+from Working_Parser import IndianAddressExtractor, iter_addresses_from_pdf, iter_addresses_from_text
+from parallel_pdf import MIN_PAGES_PER_RANGE, ParallelPdfExtractor
+
+# Finished results kept for reruns and other sessions, keyed on a hash of the input
+MAX_CACHED_RESULTS = 64
+
+@st.cache_resource
+def get_extractor():
+    """One extractor (and loaded model) shared by every session and rerun"""
+    return IndianAddressExtractor()
+
+@st.cache_resource
+def get_parallel_extractor():
+    """Worker pool for large PDFs, kept warm across uploads"""
+    return ParallelPdfExtractor()
+
+class ResultStore:
+    """Thread-safe LRU of extracted address records"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            records = self._results.get(key)
+            if records is not None:
+                self._results.move_to_end(key)
+            return records
+
+    def put(self, key, records):
+        with self._lock:
+            self._results[key] = records
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+@st.cache_resource
+def get_result_store():
+    return ResultStore(MAX_CACHED_RESULTS)
+
+def input_key(kind, data):
+    return f"{kind}:{hashlib.sha256(data).hexdigest()}"
+
+def iter_pdf_records(data, progress):
+    """Stream address records from PDF bytes; large PDFs are split across worker processes"""
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        page_count = doc.page_count
+    if page_count >= 2 * MIN_PAGES_PER_RANGE:
+        return get_parallel_extractor().iter_extract(data, progress=progress)
+    return iter_addresses_from_pdf(data, get_extractor(), progress=progress)
+
+def render_address(container, idx, record):
+    container.markdown(
+        f"""
+        **{idx}. Formatted Address:**
+        ``` 
+        {record['formatted']}
+        ```
+        **Confidence Score:** {record['confidence']:.2f}
+        **Region:** {record['region']}
+        **Letterhead:** {'Yes (repeated on every page)' if record.get('letterhead') else 'No'}
+        **Components:**
+        ``` 
+        {record['components']}
+        ```
+        ---
+        """
+    )
+
+def show_addresses(key, make_records, source):
+    """Render address records as they are found, reusing finished results for the same input.
+
+    make_records(progress) returns an iterator of records; progress takes (done, total) pages.
+    """
+    store = get_result_store()
+    records = store.get(key)
+    status = st.empty()
+    st.write("### Extracted Addresses")
+    container = st.container()
+
+    if records is None:
+        progress_bar = status.progress(0.0, text=f"Extracting addresses from {source}...")
+
+        def progress(done, total):
+            progress_bar.progress(done / total, text=f"Extracting addresses from {source}: page {done} of {total}")
+
+        records = []
+        try:
+            for record in make_records(progress):
+                records.append(record)
+                render_address(container, len(records), record)
+        except Exception as e:
+            status.error(f"Error extracting addresses: {e}")
+            return
+        store.put(key, records)
+    else:
+        for idx, record in enumerate(records, 1):
+            render_address(container, idx, record)
+
+    if records:
+        status.success(f"✅ Extracted {len(records)} addresses successfully!")
+        formatted_addresses = [record['formatted'] for record in records]
+        st.download_button("📥 Download Addresses", data="\n".join(formatted_addresses),
+                           file_name="addresses.txt", key=f"download-{key}")
+    else:
+        status.warning("⚠️ No valid Indian addresses found.")
 
 # Streamlit UI
 st.set_page_config(page_title="Indian Address Parser", layout="wide")
@@ -53,75 +142,16 @@ manual_text = st.text_area("Or paste text manually:")
 
 # Process uploaded PDF file
 if uploaded_file:
-    with st.spinner("Extracting addresses from PDF..."):
-        extracted_text = extract_text_from_pdf(uploaded_file)
-        if extracted_text.strip():
-            addresses = extract_addresses(extracted_text)
-        else:
-            addresses = []
-
-    if addresses:
-        st.success(f"✅ Extracted {len(addresses)} addresses successfully!")
-        st.write("### Extracted Addresses")
-
-        for idx, addr in enumerate(addresses, 1):
-            st.markdown(
-                f"""
-                **{idx}. Formatted Address:**
-                ``` 
-                {extractor.format_address(addr)}
-                ```
-                **Confidence Score:** {addr.confidence_score:.2f}
-                **Region:** {addr.region}
-                **Components:**
-                ``` 
-                {addr.components}
-                ```
-                ---
-                """
-            )
-
-        formatted_addresses = [extractor.format_address(addr) for addr in addresses]
-        st.download_button("📥 Download Addresses", data="\n".join(formatted_addresses), file_name="addresses.txt")
-    else:
-        st.warning("⚠️ No valid Indian addresses found.")
+    data = uploaded_file.getvalue()
+    show_addresses(input_key("pdf", data), lambda progress: iter_pdf_records(data, progress), "PDF")
 
-# Process pasted text with a submit button
+# Process pasted text with a submit button; the submitted text stays shown across reruns
 if manual_text:
-    submit_button = st.button("Submit")
-    if submit_button:
-        with st.spinner("Extracting addresses from text..."):
-            extracted_text = manual_text
-            if extracted_text.strip():
-                addresses = extract_addresses(extracted_text)
-            else:
-                addresses = []
-
-        if addresses:
-            st.success(f"✅ Extracted {len(addresses)} addresses successfully!")
-            st.write("### Extracted Addresses")
-
-            for idx, addr in enumerate(addresses, 1):
-                st.markdown(
-                    f"""
-                    **{idx}. Formatted Address:**
-                    ``` 
-                    {extractor.format_address(addr)}
-                    ```
-                    **Confidence Score:** {addr.confidence_score:.2f}
-                    **Region:** {addr.region}
-                    **Components:**
-                    ``` 
-                    {addr.components}
-                    ```
-                    ---
-                    """
-                )
-
-            formatted_addresses = [extractor.format_address(addr) for addr in addresses]
-            st.download_button("📥 Download Addresses", data="\n".join(formatted_addresses), file_name="addresses.txt")
-        else:
-            st.warning("⚠️ No valid Indian addresses found.")
+    if st.button("Submit"):
+        st.session_state["submitted_text"] = manual_text
+    if st.session_state.get("submitted_text") == manual_text and manual_text.strip():
+        show_addresses(input_key("text", manual_text.encode("utf-8")),
+                       lambda progress: iter_addresses_from_text(manual_text, get_extractor()), "text")
 
 # Added "Work In Progress" section
 st.write("### Work In Progress")
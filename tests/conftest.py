@@ -0,0 +1,42 @@
+"""Shared fixtures. Tests use the regex engine, so they run without a spaCy model."""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'benchmarks'))
+
+from Working_Parser import IndianAddressExtractor  # noqa: E402
+from synthetic_corpus import make_corpus  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def extractor():
+    return IndianAddressExtractor(engine='regex')
+
+
+@pytest.fixture(scope='session')
+def corpus():
+    return make_corpus(60, seed=7)
+
+
+@pytest.fixture(scope='session')
+def texts(corpus):
+    return [doc.text for doc in corpus]
+
+
+@pytest.fixture
+def poison(monkeypatch):
+    """Make an extractor's component matching fail on every block containing POISON"""
+    def apply(extractor):
+        match_components = extractor._match_components
+
+        def failing(text, *args, **kwargs):
+            if 'POISON' in text:
+                raise RuntimeError("bad block")
+            return match_components(text, *args, **kwargs)
+
+        monkeypatch.setattr(extractor, '_match_components', failing)
+    return apply
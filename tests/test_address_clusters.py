@@ -0,0 +1,18 @@
+"""Every add() to the cluster index, including exact repeats, survives close() and reopening."""
+from address_clusters import AddressClusterIndex
+
+
+def test_exact_repeat_persisted_on_close(tmp_path):
+    path = str(tmp_path / 'clusters.db')
+    with AddressClusterIndex(path) as index:
+        first = index.add("12, Gandhi Road, Pune 411001", confidence=0.5)
+        index.add("Plot No 5, MIDC, Andheri (E), Mumbai 400093", confidence=0.5)
+        index.flush()
+        # Exact repeat, more confident: joins the cluster and becomes its representative
+        repeat = index.add("12 Gandhi Road Pune 411001", confidence=0.9)
+        assert repeat.cluster_id == first.cluster_id
+        before = index.stats()
+
+    with AddressClusterIndex(path) as index:
+        assert index.stats() == before == {'clusters': 2, 'addresses': 3}
+        assert index.representative(first.cluster_id) == "12 Gandhi Road Pune 411001"
@@ -0,0 +1,25 @@
+"""State names inside street or building names do not set the block's state."""
+import pytest
+
+
+@pytest.mark.parametrize('text, city, state, region', [
+    ("12 Maha Lakshmi Road, Chennai", 'Chennai', None, 'south_india'),
+    ("45, Bengal Chemicals Road, Andheri East, Mumbai", 'Mumbai', None, 'west_india'),
+    ("Flat 2, Goa Street, Hyderabad", 'Hyderabad', None, 'south_india'),
+    ("Flat 2, Kerala House, Janpath, New Delhi", 'Delhi', 'Delhi', 'north_india'),
+    # Named state kept where it ends the address
+    ("Plot 4, Goa House, MG Road, Panaji, Goa 403001", 'Panaji', 'Goa', 'west_india'),
+    ("12, Gandhi Road, Pune, Maharashtra", 'Pune', 'Maharashtra', 'west_india'),
+])
+def test_state_in_street_name_ignored(extractor, text, city, state, region):
+    components = extractor._extract_components(text)
+    assert components.get('city') == city
+    assert components.get('state') == state
+    assert extractor._detect_region(text, components) == region
+
+
+def test_city_state_wins_without_pin(extractor):
+    # No PIN to arbitrate: the state of a known city beats a conflicting named state
+    components = extractor._match_components("Flat 9, MG Road, Mumbai, Goa")
+    assert components['city'] == 'Mumbai'
+    assert components['state'] == 'Maharashtra'
@@ -0,0 +1,59 @@
+"""Switches that skip work must not change extract_addresses output."""
+import dataclasses
+import importlib.util
+
+import pytest
+
+from pipeline_metrics import PipelineMetrics
+from Working_Parser import IndianAddressExtractor
+
+
+def _results(extractor, texts, min_confidence=0.3):
+    return [[dataclasses.astuple(match) for match in extractor.extract_addresses(text, min_confidence)]
+            for text in texts]
+
+
+@pytest.mark.parametrize('min_confidence', [0.0, 0.3, 0.6])
+def test_prefilter_keeps_output(extractor, texts, min_confidence):
+    unfiltered = IndianAddressExtractor(engine='regex', prefilter_threshold=None)
+    assert _results(extractor, texts, min_confidence) == _results(unfiltered, texts, min_confidence)
+
+
+def test_prefilter_skips_blocks(texts):
+    metrics = PipelineMetrics()
+    extractor = IndianAddressExtractor(engine='regex', metrics=metrics)
+    for text in texts:
+        extractor.extract_addresses(text)
+    assert metrics.snapshot()['counters']['blocks_prefiltered'] > 0
+
+
+def test_prefilter_keeps_batch_output(extractor, texts):
+    unfiltered = IndianAddressExtractor(engine='regex', prefilter_threshold=None)
+    batch = [[dataclasses.astuple(match) for match in matches] for matches in extractor.extract_addresses_batch(texts)]
+    assert batch == _results(unfiltered, texts)
+
+
+@pytest.mark.skipif(importlib.util.find_spec('en_core_web_sm') is None, reason='needs the en_core_web_sm model')
+def test_lazy_ner_keeps_output(texts):
+    full = IndianAddressExtractor()
+    lazy = IndianAddressExtractor(lazy_ner=True)
+    assert _results(lazy, texts) == _results(full, texts)
+
+
+def test_batch_failure_isolated_per_document(texts, poison):
+    extractor = IndianAddressExtractor(engine='regex', prefilter_threshold=None)
+    expected = _results(extractor, texts[:4])
+    poison(extractor)
+    batch = extractor.extract_addresses_batch(texts[:2] + ['12 POISON Road, Mumbai 400001'] + texts[2:4])
+    assert [[dataclasses.astuple(match) for match in matches] for matches in batch[:2] + batch[3:]] == expected
+    assert batch[2] == []
+
+
+def test_batch_returns_exceptions(texts, poison):
+    extractor = IndianAddressExtractor(engine='regex', prefilter_threshold=None)
+    poison(extractor)
+    batch = extractor.extract_addresses_batch([texts[0], '12 POISON Road, Mumbai 400001', None],
+                                              return_exceptions=True)
+    assert isinstance(batch[0], list) and batch[0]
+    assert isinstance(batch[1], RuntimeError)
+    assert isinstance(batch[2], Exception)
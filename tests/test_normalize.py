@@ -0,0 +1,54 @@
+"""Bulk normalization isolates bad values and failures to their own row."""
+import csv
+import dataclasses
+
+import normalize_table
+from Working_Parser import IndianAddressExtractor
+
+GOOD = "Plot No 5, MIDC Road, Andheri (E), Mumbai 400093"
+OTHER = "12, Gandhi Road, Pune 411001, Maharashtra"
+
+
+def _astuples(matches):
+    return [dataclasses.astuple(match) if match else None for match in matches]
+
+
+def test_unexpected_values_are_empty_rows(extractor):
+    matches = extractor.normalize_addresses([GOOD, None, float('nan'), 400093, GOOD.encode(), OTHER])
+    expected = _astuples(extractor.normalize_addresses([GOOD, OTHER]))
+    assert _astuples(matches[:1] + matches[-1:]) == expected
+    assert matches[1] is None and matches[2] is None
+    assert matches[4] is not None
+
+
+def test_cleaned_like_a_block(extractor):
+    match = extractor.normalize_addresses(["  Plot No 5 ,, MIDC Road,\n Andheri (E) , Mumbai 400093 , "])[0]
+    assert match.raw_text == extractor._extract_address_block("Plot No 5 ,, MIDC Road, Andheri (E) , Mumbai 400093 , ")[0]
+
+
+def test_failing_row_isolated(poison):
+    extractor = IndianAddressExtractor(engine='regex')
+    expected = _astuples(extractor.normalize_addresses([GOOD, OTHER]))
+    poison(extractor)
+    matches = extractor.normalize_addresses([GOOD, "12 POISON Road, Mumbai 400001", OTHER], return_exceptions=True)
+    assert _astuples([matches[0], matches[2]]) == expected
+    assert isinstance(matches[1], RuntimeError)
+
+
+def test_csv_counts_failed_rows(tmp_path, monkeypatch, poison):
+    source, target = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    with open(source, 'w', newline='') as f:
+        csv.writer(f).writerows([['id', 'address'], [1, GOOD], [2, ''], [3, "12 POISON Road, Mumbai 400001"], [4, OTHER]])
+
+    init_worker = normalize_table._init_worker
+
+    def poisoned_init(*args):
+        init_worker(*args)
+        poison(normalize_table._worker_extractor)
+
+    monkeypatch.setattr(normalize_table, '_init_worker', poisoned_init)
+    stats = normalize_table.normalize_csv(str(source), str(target), init_args=(0.3, None, None, 'regex'))
+    assert stats == {'rows': 4, 'addresses': 2, 'errors': 1}
+    with open(target, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [bool(row['formatted']) for row in rows] == [True, False, False, True]
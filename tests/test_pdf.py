@@ -0,0 +1,53 @@
+"""Parallel extraction and letterhead skipping return what a plain sequential read returns."""
+import pytest
+
+from synthetic_corpus import make_address, make_corpus, write_pdf
+
+pytest.importorskip('fitz')
+
+from parallel_pdf import ParallelPdfExtractor  # noqa: E402
+from Working_Parser import iter_addresses_from_pdf  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def pdf_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp('pdf') / 'corpus.pdf'
+    write_pdf(make_corpus(40, seed=5), str(path), lines_per_page=25)
+    return str(path)
+
+
+@pytest.fixture(scope='module')
+def letterhead_pdf_path(tmp_path_factory):
+    import random
+    path = tmp_path_factory.mktemp('pdf') / 'letterhead.pdf'
+    write_pdf(make_corpus(40, seed=6), str(path), letterhead=make_address(random.Random(6)))
+    return str(path)
+
+
+def _sequential(path, extractor, **kwargs):
+    return list(iter_addresses_from_pdf(path, extractor, **kwargs))
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_parallel_matches_sequential(pdf_path, extractor, workers):
+    with ParallelPdfExtractor(workers=workers, engine='regex', min_pages=1) as parallel:
+        assert parallel.extract(pdf_path) == _sequential(pdf_path, extractor)
+
+
+def test_parallel_matches_sequential_with_letterhead(letterhead_pdf_path, extractor):
+    with ParallelPdfExtractor(workers=2, engine='regex', min_pages=1) as parallel:
+        assert parallel.extract(letterhead_pdf_path) == _sequential(letterhead_pdf_path, extractor)
+
+
+def test_skip_repeated_keeps_addresses(letterhead_pdf_path, extractor):
+    skipped = _sequential(letterhead_pdf_path, extractor)
+    parsed = _sequential(letterhead_pdf_path, extractor, skip_repeated=False)
+    assert any(record['letterhead'] for record in skipped)
+    assert not any(record['letterhead'] for record in parsed)
+    # Raw text differs where an unskipped letterhead fused with the footer; the addresses do not
+    assert len(skipped) == len(parsed)
+    assert {record['formatted'] for record in skipped} == {record['formatted'] for record in parsed}
+
+
+def test_no_repeated_margins_unchanged(pdf_path, extractor):
+    assert _sequential(pdf_path, extractor) == _sequential(pdf_path, extractor, skip_repeated=False)
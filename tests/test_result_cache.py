@@ -0,0 +1,48 @@
+"""The shared SQLite tier never holds the write lock between puts, and its errors are misses."""
+import sqlite3
+import time
+
+from result_cache import ResultCache
+
+
+def test_unflushed_writes_do_not_block_other_writers(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    first = ResultCache(db_path=path)
+    second = ResultCache(db_path=path)
+    first.put('result', 'a', [1])
+
+    started = time.perf_counter()
+    second.put('result', 'b', [2])
+    second.flush()
+    assert time.perf_counter() - started < 1.0
+
+    first.flush()
+    third = ResultCache(db_path=path)
+    assert third.get('result', 'a') == [1]
+    assert third.get('result', 'b') == [2]
+    for cache in (first, second, third):
+        cache.close()
+
+
+def test_writes_reach_disk_every_commit_every_puts(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResultCache(db_path=path, commit_every=2)
+    cache.put('result', 'a', 1)
+    cache.put('result', 'b', 2)
+    assert ResultCache(db_path=path).get('result', 'b') == 2
+    cache.close()
+
+
+def test_sqlite_errors_are_misses(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = ResultCache(db_path=path)
+    with sqlite3.connect(path) as db:
+        db.execute("DROP TABLE cache")
+
+    assert cache.get('result', 'a') is None
+    cache.put('result', 'a', 1)
+    cache.flush()
+    # Still served from memory
+    assert cache.get('result', 'a') == 1
+    assert cache.stats()['result_misses'] == 1
+    cache.close()
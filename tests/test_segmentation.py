@@ -0,0 +1,76 @@
+"""Single-pass block segmentation gives the same blocks as the original line-list version."""
+import random
+import re
+
+import pytest
+
+# Original _extract_address_block, kept verbatim as the reference
+ADDRESS_INDICATORS = [
+    r'\b\d{6}\b',
+    r'\b\d+[A-Za-z]?,\s*[A-Za-z\s]+',
+    r'\b[A-Za-z]+[\s-]+(?:Complex|Plaza|Towers|Building|Street|Road|Lane|Avenue)\b',
+    r'(?:^|\s)(?:Floor|Level|Block|Sector|Phase)\s+[A-Za-z0-9-]+\b'
+]
+
+
+def reference_blocks(text):
+    blocks = []
+    current_block = []
+    lines = [line.strip() for line in text.split('\n')]
+    for line in lines:
+        if not line:
+            if current_block:
+                blocks.append(' '.join(current_block))
+                current_block = []
+            continue
+        has_address_indicator = any(re.search(pattern, line, re.I) for pattern in ADDRESS_INDICATORS)
+        if has_address_indicator and current_block and not any(re.search(pattern, current_block[-1], re.I)
+                                                               for pattern in ADDRESS_INDICATORS):
+            blocks.append(' '.join(current_block))
+            current_block = []
+        current_block.append(line)
+    if current_block:
+        blocks.append(' '.join(current_block))
+
+    cleaned_blocks = []
+    for block in blocks:
+        cleaned = re.sub(r'\s+', ' ', block)
+        cleaned = re.sub(r'[,\s]*,[,\s]*', ', ', cleaned)
+        cleaned = cleaned.strip(' ,')
+        if cleaned:
+            cleaned_blocks.append(cleaned)
+    return cleaned_blocks
+
+
+EDGE_CASES = [
+    '',
+    '\n\n\n',
+    '   \n\t\n',
+    'no newline at all',
+    '\n  leading blank lines\n',
+    'Floor 3\nSector 21, Noida 201301',
+    'Phase II\n  Level 4, Tower B\r\nAndheri (E), Mumbai 400 069\r\n\r\n',
+    ', , ,\n ,\n',
+    'Some text\n12, Gandhi Road\nPune 411001\n\nTrailing paragraph without indicators',
+]
+
+
+@pytest.mark.parametrize('text', EDGE_CASES)
+def test_edge_cases_match_reference(extractor, text):
+    assert extractor._extract_address_block(text) == reference_blocks(text)
+
+
+def test_corpus_matches_reference(extractor, texts):
+    for text in texts:
+        assert extractor._extract_address_block(text) == reference_blocks(text)
+
+
+def test_pages_match_reference_on_joined_text(extractor, texts):
+    # Blocks may run across chunk boundaries; chunks count as joined with "\n"
+    rnd = random.Random(3)
+    pages = [text[:rnd.randint(0, len(text))] for text in texts[:20]] + texts[20:40]
+    joined = '\n'.join(pages)
+    spans = list(extractor._iter_block_spans(enumerate(pages, 1)))
+    assert [span.text for span in spans] == reference_blocks(joined)
+    for span in spans:
+        assert reference_blocks(joined[span.start:span.end]) == [span.text]
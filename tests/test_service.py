@@ -0,0 +1,67 @@
+"""The service writes the shared cache after every request and answers failures with errors."""
+import asyncio
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+
+import pytest
+
+import address_service
+from address_service import AddressService, AsyncAddressExtractor, ExtractionError, RequestTimeout
+
+
+def test_shared_cache_written_after_each_batch(tmp_path, texts):
+    path = str(tmp_path / 'cache.db')
+
+    async def run():
+        async with AsyncAddressExtractor(workers=2, engine='regex', cache_path=path) as service:
+            results = await asyncio.gather(*(service.extract(text) for text in texts[:8]))
+            with sqlite3.connect(path) as db:
+                return results, db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    results, rows = asyncio.run(run())
+    assert all(results)
+    assert rows > 0
+
+
+def test_failed_text_is_an_error_not_empty(texts, poison):
+    async def run():
+        async with AsyncAddressExtractor(workers=0, engine='regex') as service:
+            poison(address_service._worker_extractor)
+            good, bad = await asyncio.gather(service.extract(texts[0]), service.extract('12 POISON Road, Mumbai 400001'),
+                                             return_exceptions=True)
+            status, payload, _ = await AddressService(service)._route(
+                'POST', '/extract', json.dumps({'text': '12 POISON Road, Mumbai 400001'}).encode())
+            return good, bad, status
+
+    good, bad, status = asyncio.run(run())
+    assert good
+    assert isinstance(bad, ExtractionError)
+    assert status == 500
+
+
+
+def _die(data):
+    os._exit(1)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason="patches the worker's task by forking")
+def test_dead_worker_fails_request_and_frees_slot(texts, monkeypatch):
+    # Stands in for a native crash on a malformed PDF; the forked worker inherits the patch
+    monkeypatch.setattr(address_service, '_extract_pdf', _die)
+
+    async def run():
+        async with AsyncAddressExtractor(workers=1, engine='regex', max_pdf_queue=0, request_timeout=2) as service:
+            started = time.perf_counter()
+            with pytest.raises(RequestTimeout):
+                await service.extract_pdf(b'%PDF-1.4', wait=False)
+            elapsed = time.perf_counter() - started
+            assert service.pdf_pending == 0
+            # The slot was released and the pool replaced the worker, so the service still answers
+            return elapsed, await asyncio.wait_for(service.extract(texts[0]), 10)
+
+    elapsed, matches = asyncio.run(run())
+    assert elapsed < 10
+    assert matches
@@ -0,0 +1,82 @@
+"""SuffixAnchoredPattern matches exactly what the original component regexes matched,
+and stays linear on long blocks without separators."""
+import random
+import re
+import time
+
+import pytest
+
+from synthetic_corpus import make_adversarial_blocks
+
+# The component regexes SuffixAnchoredPattern replaced, as they were before
+ORIGINAL_PATTERNS = {
+    ('building_patterns', 0): r'\b([A-Za-z0-9\s\.-]+(?:Tower|Chambers|Plaza|Bhavan|Centre|Complex|Towers|Society|Apartment|Edge|Building|House|Mall|Park|Villa|Heights|Exchange|Stock)s?)\b',
+    ('building_patterns', 2): r'\b([\w\s]+\s+Stock\s+Exchange)\b',
+    ('street_patterns', 0): r'\b([\w\s\.-]+(?:Street|Road|Lane|Avenue|Boulevard|Highway|Marg|Path|Way|Expressway|Cross|Main|Circle|Block|Towers)s?)\b',
+    ('area_patterns', 0): r'\b([A-Za-z\s()-]+(?:Area|Block|Sector|Phase|Colony|Nagar|Extension|Enclave|Complex|East|West|North|South|[EWNS])\b(?:\s*[\(\)][EWNS][)\)])?)',
+}
+
+# Ceiling for one adversarial block, as in benchmarks/bench_suite.py --adversarial-ceiling
+ADVERSARIAL_CEILING_S = 1.0
+
+_TOKENS = ['Tower', 'towers', 'Stock', 'Exchange', 'Street', 'Road', 'Marg', 'Main', 'Cross', 'Block',
+           'Nagar', 'Sector', 'Phase', 'East', 'W', 'N', '(E)', '(W)', 'Plaza', 'House', 'Park',
+           'Mumbai', 'Andheri', 'Gandhi', 'No.', '12', '4B', '400001', '_', '-', '.', ',', '/', ':',
+           '(', ')', ' ', '  ', '\n', 'é', 'Bandra-Kurla', 'Complex']
+
+
+def _fuzz_texts(n, seed=11):
+    rnd = random.Random(seed)
+    for _ in range(n):
+        parts = [rnd.choice(_TOKENS) for _ in range(rnd.randint(1, 25))]
+        yield ''.join(part + rnd.choice(['', ' ', ' ', ', ']) for part in parts)
+
+
+def _result(match):
+    return None if match is None else (match.span(1), match.group(1))
+
+
+@pytest.fixture(scope='module', params=sorted(ORIGINAL_PATTERNS), ids=lambda key: f'{key[0]}[{key[1]}]')
+def pattern_pair(request, extractor):
+    attribute, index = request.param
+    return getattr(extractor, attribute)[index], re.compile(ORIGINAL_PATTERNS[request.param], re.I)
+
+
+def test_matches_original_on_corpus_blocks(pattern_pair, extractor, texts):
+    anchored, original = pattern_pair
+    for text in texts:
+        for block in extractor._extract_address_block(text):
+            assert _result(anchored.search(block)) == _result(original.search(block)), block
+
+
+def test_matches_original_on_random_text(pattern_pair):
+    anchored, original = pattern_pair
+    for text in _fuzz_texts(3000):
+        assert _result(anchored.search(text)) == _result(original.search(text)), text
+
+
+def test_matches_original_on_short_adversarial_blocks(pattern_pair):
+    # Short enough for the original regexes to finish quickly
+    anchored, original = pattern_pair
+    for block in make_adversarial_blocks(sizes=(300, 1_000)):
+        assert _result(anchored.search(block)) == _result(original.search(block))
+
+
+def test_adversarial_blocks_within_ceiling(extractor):
+    for block in make_adversarial_blocks():
+        started = time.perf_counter()
+        extractor._extract_components(block)
+        elapsed = time.perf_counter() - started
+        assert elapsed <= ADVERSARIAL_CEILING_S, f"{len(block)}-char block took {elapsed:.2f}s"
+
+
+def test_adversarial_time_grows_linearly(extractor):
+    # 16x the text must cost far less than the 256x a quadratic scan would
+    small, large = (block for block in make_adversarial_blocks(sizes=(4_000, 64_000))[::2])
+    timings = []
+    for block in (small, large):
+        started = time.perf_counter()
+        for pattern in extractor.street_patterns[:1] + extractor.building_patterns[:1] + extractor.area_patterns[:1]:
+            pattern.search(block)
+        timings.append(time.perf_counter() - started)
+    assert timings[1] <= max(timings[0], 1e-3) * 64